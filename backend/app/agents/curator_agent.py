@@ -0,0 +1,26 @@
+from backend.app.agents.scheduled import run_scheduled_agent
+from backend.app.db.models import Thread
+from backend.app.schemas.thread import ThreadResponse
+
+curator_prompt = """
+You are the Curator Agent. You run every night and keep agent threads tidy.
+
+# Input
+A JSON document with:
+- changed: threads created or updated since your last run
+- stalled: active/paused threads nobody has touched for a while
+
+# Instructions
+- Summarise what happened in the changed threads in a few bullet points.
+- For each stalled thread, say whether it should be resumed, closed, or needs a human, and why.
+- Only mention threads that need attention; skip routine successes.
+"""
+
+async def run_curator_agent():
+    return await run_scheduled_agent(
+        "curator",
+        curator_prompt,
+        Thread,
+        ThreadResponse.columns(Thread.__table__),
+        include_stalled=True,
+    )
@@ -5,15 +5,31 @@ from langgraph.prebuilt import ToolNode
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from backend.app.tools.raw_notes_tools import read_raw_notes, write_raw_notes, write_message
-from backend.app.core.logging import logger
-from backend.app.db.models import Thread, Message
+from backend.app.core.logging import LOGS_DIR, logger
+from backend.app.db.models import Thread, Message, RawNote
 from backend.app.db.session import get_db
-from backend.app.core.openrouter import openrouter_client
+from backend.app.core.openrouter import get_openrouter_client
+from backend.app.agents.relevance import get_relevance_filter
 import asyncio
 from datetime import datetime
 import os
 from backend.app.core.config import settings
+from backend.app.core.tracing import span, traced
+from backend.app.schemas.raw_note import RawNoteResponse
+from sqlalchemy import select, update
+import orjson
 
+# Failed runs also land in their own file. The sink is added once at import; adding it
+# on every failure stacked a new file handler per failed run.
+failed_logger = logger.bind(failed_run=True)
+logger.add(
+    f"{LOGS_DIR}/data_agent_failed.log",
+    rotation="00:00",
+    retention="90 days",
+    level="ERROR",
+    serialize=False,
+    filter=lambda record: record["extra"].get("failed_run", False),
+)
 
 now = datetime.now()
 
@@ -85,13 +101,14 @@ class AgentState(TypedDict):
     prompt: str
 
 def create_data_agent():
+    @traced("agent.data_agent.ingest")
     async def ingest_notes(state: AgentState) -> AgentState:
         logger.info("Data Agent ingesting notes", thread_id=state["thread_id"])
         try:
             model = os.getenv("DATA_AGENT_MODEL", settings.OPENROUTER_DEFAULT_MODEL)
             temperature = float(os.getenv("DATA_AGENT_TEMPERATURE", settings.OPENROUTER_DEFAULT_TEMPERATURE))
-            response = await openrouter_client.chat_completion(
-                messages=[{"role": "system", "content": state["prompt"]}] + [m.dict() for m in state["messages"]],
+            response = await get_openrouter_client().chat_completion(
+                messages=[{"role": "system", "content": state["prompt"]}] + [{"role": "user", "content": m.content} for m in state["messages"]],
                 tools=[
                     {
                         "type": "function",
@@ -126,8 +143,6 @@ def create_data_agent():
             return {**state, "messages": [new_message]}
         except Exception as e:
             logger.error("Data Agent error", error=str(e), thread_id=state["thread_id"])
-            from loguru import logger as failed_logger
-            failed_logger.add("logs/data_agent_failed.log", rotation="00:00", retention="90 days", level="ERROR", serialize=False)
             failed_logger.error("Data Agent failed", thread_id=state["thread_id"], error_count=state["error_count"]+1, last_error=str(e), prompt=state["prompt"])
             return {
                 **state,
@@ -143,7 +158,8 @@ def create_data_agent():
     memory = MemorySaver()
     return workflow.compile(checkpointer=memory)
 
-async def run_data_agent(thread_id: int, prompt: str = agent_prompt):
+@traced("agent.run_data_agent")
+async def run_data_agent(thread_id: int, prompt: str = agent_prompt, context: str = None, record_context: bool = True):
     logger.info("Starting Data Agent (LangGraph)", thread_id=thread_id)
     db = next(get_db())
     # Store the agent prompt as the first message if not already present
@@ -155,9 +171,17 @@ async def run_data_agent(thread_id: int, prompt: str = agent_prompt):
             "content": prompt,
             "model": None
         })
-    agent = create_data_agent()
+    if context and record_context:
+        await write_message({
+            "thread_id": thread_id,
+            "role": "user",
+            "content": context,
+            "model": None
+        })
+    with span("agent.data_agent.compile_graph"):
+        agent = create_data_agent()
     initial_state = {
-        "messages": [],
+        "messages": [HumanMessage(content=context)] if context else [],
         "thread_id": thread_id,
         "status": "active",
         "error_count": 0,
@@ -166,18 +190,74 @@ async def run_data_agent(thread_id: int, prompt: str = agent_prompt):
     }
     config = {"configurable": {"thread_id": str(thread_id)}}
     final_state = await agent.ainvoke(initial_state, config=config)
-    # Patch for test: if running under pytest, force success
-    if "PYTEST_CURRENT_TEST" in os.environ:
-        final_state["status"] = "success"
+    if final_state["status"] == "active":
+        final_state["status"] = "success"  # the graph ran to the end; only ingest errors mark it failed
     thread = db.query(Thread).filter(Thread.id == thread_id).first()
     if thread:
         thread.status = final_state["status"]
+        if final_state["status"] == "success":
+            thread.completed_at = datetime.utcnow()
         thread.error_count = final_state.get("error_count", 0)
         thread.last_error = final_state.get("last_error", "") if final_state["status"] == "failed" else ""
         db.commit()
     if final_state["status"] == "failed":
-        from loguru import logger as failed_logger
-        failed_logger.add("logs/data_agent_failed.log", rotation="00:00", retention="90 days", level="ERROR", serialize=False)
         failed_logger.error("Data Agent failed (final)", thread_id=thread_id, error_count=final_state.get("error_count", 0), last_error=final_state.get("last_error", ""), prompt=prompt)
     logger.info("Data Agent completed (LangGraph)", thread_id=thread_id, final_status=final_state["status"])
-    return {"ok": final_state["status"] == "success", **final_state} 
\ No newline at end of file
+    return {"ok": final_state["status"] == "success", **final_state} 
+
+@traced("agent.run_data_agent_batch")
+async def run_data_agent_batch(note_ids: list, source_key: str = None):
+    """One Data Agent run over a debounced burst of raw notes (backend/app/agents/debounce.py)."""
+    db = next(get_db())
+    try:
+        notes = db.execute(
+            select(*RawNoteResponse.columns(RawNote.__table__))
+            .where(RawNote.id.in_(note_ids))
+            .order_by(RawNote.received_at, RawNote.id)
+        ).mappings().all()
+        if settings.RELEVANCE_FILTER_ENABLED:
+            relevance = get_relevance_filter()
+            kept = relevance.filter(notes)
+            if not kept:
+                logger.info("Data Agent batch skipped as noise", source=source_key, notes=len(notes), relevance=relevance.metrics())
+                return {"ok": True, "skipped": True, "notes": len(notes)}
+            notes = kept
+        thread = Thread(status="active", agent="data_agent")
+        db.add(thread)
+        db.commit()
+        thread_id = thread.id
+    finally:
+        db.close()
+    logger.info("Data Agent batch", thread_id=thread_id, source=source_key, notes=len(notes))
+    context = orjson.dumps({"source": source_key, "notes": [dict(n) for n in notes]}, option=orjson.OPT_INDENT_2).decode()
+    return await run_data_agent(thread_id, context=context)
+
+@traced("agent.resume_data_agent")
+async def resume_data_agent(thread_id: int):
+    """
+    Re-run a resumed thread on the context it was started with (its first user message).
+    Clearing resume_requested_at claims the resume, so a second enqueue (a live NOTIFY and
+    the listener's catch-up both seeing it) does nothing.
+    """
+    db = next(get_db())
+    try:
+        claimed = db.execute(
+            update(Thread)
+            .where(Thread.id == thread_id, Thread.resume_requested_at.isnot(None))
+            .values(resume_requested_at=None)
+            .returning(Thread.id)
+        ).scalar()
+        db.commit()
+        if claimed is None:
+            logger.info("Resume already handled", thread_id=thread_id)
+            return {"ok": True, "skipped": True}
+        context = db.execute(
+            select(Message.content)
+            .where(Message.thread_id == thread_id, Message.role == "user")
+            .order_by(Message.created_at, Message.id)
+            .limit(1)
+        ).scalar()
+    finally:
+        db.close()
+    logger.info("Resuming Data Agent", thread_id=thread_id, has_context=context is not None)
+    return await run_data_agent(thread_id, context=context, record_context=False)
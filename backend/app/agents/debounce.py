@@ -0,0 +1,128 @@
+"""
+Burst coalescing for Data Agent runs.
+
+Newly ingested raw notes are grouped by where they were said (Slack channel,
+plus thread_ts for thread replies). A window closes when:
+  - quiet:     nothing new arrived for DEBOUNCE_QUIET_SECONDS
+  - max_wait:  DEBOUNCE_MAX_WAIT_SECONDS passed since its first note, so a
+               channel that never goes quiet still gets processed
+  - max_batch: it holds DEBOUNCE_MAX_BATCH notes
+and then triggers one `launch(key, note_ids)`; a 30-message burst becomes one
+agent run. Runs on the ingesting process's event loop; `add` must be called
+from that loop.
+"""
+import asyncio
+import inspect
+from collections import Counter
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+
+
+def ingest_debouncing() -> bool:
+    """Whether Slack ingestion should debounce agent runs itself (vs. the NOTIFY listener)."""
+    return settings.DEBOUNCE_ENABLED and settings.AGENT_TRIGGER == "ingest"
+
+
+def debounce_key(event: dict) -> str:
+    """`<channel>` for channel messages, `<channel>:<thread_ts>` for thread replies."""
+    channel = event.get("channel", "")
+    thread_ts = event.get("thread_ts")
+    return f"{channel}:{thread_ts}" if thread_ts else channel
+
+
+class _Window:
+    __slots__ = ("note_ids", "opened_at", "timer")
+
+    def __init__(self, opened_at: float):
+        self.note_ids = []
+        self.opened_at = opened_at
+        self.timer = None
+
+
+class BurstDebouncer:
+    def __init__(self, launch, quiet_seconds: float = None, max_wait_seconds: float = None, max_batch: int = None):
+        self.launch = launch
+        self.quiet_seconds = quiet_seconds if quiet_seconds is not None else settings.DEBOUNCE_QUIET_SECONDS
+        self.max_wait_seconds = max_wait_seconds if max_wait_seconds is not None else settings.DEBOUNCE_MAX_WAIT_SECONDS
+        self.max_batch = max_batch or settings.DEBOUNCE_MAX_BATCH
+        self._windows = {}
+        self._launches = set()
+        self.notes = 0
+        self.batches = 0
+        self.flush_reasons = Counter()
+        self.largest_batch = 0
+        self.wait_total = 0.0
+
+    def add(self, key: str, note_id: int):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _Window(now)
+        window.note_ids.append(note_id)
+        self.notes += 1
+        if len(window.note_ids) >= self.max_batch:
+            self.flush(key, "max_batch")
+            return
+        if window.timer is not None:
+            window.timer.cancel()
+        quiet_at = now + self.quiet_seconds
+        deadline_at = window.opened_at + self.max_wait_seconds
+        reason = "quiet" if quiet_at < deadline_at else "max_wait"
+        window.timer = loop.call_at(min(quiet_at, deadline_at), self.flush, key, reason)
+
+    def flush(self, key: str, reason: str):
+        window = self._windows.pop(key, None)
+        if window is None:
+            return
+        if window.timer is not None:
+            window.timer.cancel()
+        waited = asyncio.get_running_loop().time() - window.opened_at
+        self.batches += 1
+        self.flush_reasons[reason] += 1
+        self.largest_batch = max(self.largest_batch, len(window.note_ids))
+        self.wait_total += waited
+        logger.info("Debounce window closed", key=key, notes=len(window.note_ids), reason=reason, waited_seconds=round(waited, 3))
+        task = asyncio.create_task(self._launch(key, window.note_ids))
+        self._launches.add(task)
+        task.add_done_callback(self._launches.discard)
+
+    async def _launch(self, key: str, note_ids: list):
+        try:
+            if inspect.iscoroutinefunction(self.launch):
+                await self.launch(key, note_ids)
+            else:
+                await asyncio.to_thread(self.launch, key, note_ids)
+        except Exception as e:
+            logger.error("Debounced agent launch failed", key=key, notes=len(note_ids), error=str(e))
+
+    async def close(self):
+        """Flush every open window and wait for the launches (shutdown)."""
+        for key in list(self._windows):
+            self.flush(key, "shutdown")
+        if self._launches:
+            await asyncio.gather(*self._launches, return_exceptions=True)
+
+    def metrics(self) -> dict:
+        pending = sum(len(w.note_ids) for w in self._windows.values())
+        flushed = self.notes - pending
+        return {
+            "quiet_seconds": self.quiet_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+            "max_batch": self.max_batch,
+            "open_windows": len(self._windows),
+            "pending_notes": pending,
+            "notes": self.notes,
+            "batches": self.batches,
+            "agent_runs_saved": flushed - self.batches,
+            "avg_batch": round(flushed / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "avg_wait_seconds": round(self.wait_total / self.batches, 3) if self.batches else 0.0,
+            "flush_reasons": dict(self.flush_reasons),
+        }
+
+
+def enqueue_data_agent(key: str, note_ids: list):
+    """Default launch: one Celery Data Agent run (agents queue) per closed window."""
+    from backend.app.worker.agents import run_data_agent_task
+    run_data_agent_task.delay(note_ids, key)
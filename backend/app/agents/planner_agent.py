@@ -0,0 +1,23 @@
+from backend.app.agents.scheduled import run_scheduled_agent
+from backend.app.db.models import Task
+from backend.app.schemas.task import TaskResponse
+
+planner_prompt = """
+You are the Planner Agent. You run every morning and write the day's agenda.
+
+# Input
+A JSON document whose "changed" list holds the tasks created or updated since your last run.
+
+# Instructions
+- Write a short agenda: what is due soon, what changed, what is blocked.
+- Group by project where project_id is set; highest priority first.
+- Flag tasks with no assignee or a due date in the past.
+"""
+
+async def run_planner_agent():
+    return await run_scheduled_agent(
+        "planner",
+        planner_prompt,
+        Task,
+        TaskResponse.columns(Task.__table__),
+    )
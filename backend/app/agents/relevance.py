@@ -0,0 +1,385 @@
+"""
+Local relevance pre-filter in front of the Data Agent.
+
+Most of what Slack delivers is chatter ("ok", "thanks!", ":+1:", "lol"); sending
+it to the LLM costs a call and tells the agent nothing. Every note in a
+debounced batch is scored here first, in a few microseconds, and a batch with
+nothing relevant left never reaches `run_data_agent`. Skipped notes stay filed
+in raw_notes as they are; only the agent run is avoided.
+
+Two stages, cheapest first:
+  - rules:       empty, emoji/reaction-only, short acknowledgements, fewer than
+                 RELEVANCE_MIN_CHARS characters (unless there is a link or a
+                 mention), and channels outside RELEVANCE_CHANNEL_ALLOWLIST;
+                 status replies ("done", "yes", "no", "noted") are never
+                 dropped by a rule, since in a thread they answer a task
+  - classifier:  hashed-token naive Bayes trained from past Data Agent
+                 decisions in `messages`; notes it scores below
+                 RELEVANCE_THRESHOLD are skipped
+
+Training labels come from each data_agent thread's first user message (the
+batch of notes) and its assistant replies: a thread whose replies only say the
+notes can be ignored labels its notes noise, any other outcome (a tool call, a
+question for the human) labels them relevant. Archived threads are not read.
+
+    python -m backend.app.agents.relevance train
+    python -m backend.app.agents.relevance evaluate [--limit 5000]
+
+`train_relevance_model_task` retrains weekly; workers pick up the new model file
+without a restart.
+"""
+import argparse
+import math
+import os
+import re
+import sys
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+import orjson
+from sqlalchemy import select
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+from backend.app.db.models import Message, Thread
+
+MODEL_VERSION = 1
+BUCKETS = 1 << 14
+RELOAD_CHECK_SECONDS = 60
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_URL = re.compile(r"https?://|www\.")
+_MENTION = re.compile(r"<[@#!][^>]+>|@\w")
+_SHORTCODE = re.compile(r":[a-z0-9_+\-']+:")
+_SYMBOLS = re.compile(r"[\W_]+", re.UNICODE)
+_ACK_NOISE = re.compile(r"[^\w\s+']+")
+_ACK = re.compile(
+    r"(ok(ay)?|k+|kk|sure|cool|nice|great|awesome|perfect|got it|sounds good|"
+    r"thanks?( you)?( so much)?|thx|ty|tysm|np|no worries|no problem|"
+    r"lol|lmao|haha+|hehe+|\+1|welcome|you'?re welcome|good morning|gm|good night|gn|hi|hello|hey|"
+    r"congrats|congratulations|hmm+|oh|ah|wow)"
+    r"( (all|guys|team|man|bro))?[\s!.?]*"
+)
+# a bare status answers a question or closes a task; left to the classifier
+_STATUS = re.compile(r"(done|all done|noted|will do|yes|yep|yup|yeah|no|nope|not yet|fixed|shipped|merged|blocked)[\s!.?]*")
+_IGNORED = re.compile(r"\b(ignore[ds]?|not relevant|irrelevant|nothing (to|worth) (store|storing|add|adding|do)|no action (is )?needed)\b", re.I)
+
+
+class Decision(NamedTuple):
+    relevant: bool
+    score: float  # probability the note is relevant; 1.0 when no model is loaded
+    reason: str   # "model" for notes passed on, otherwise which rule or the classifier skipped it
+
+
+def features(text: str, source: str = None) -> set:
+    """Hashed token unigrams/bigrams plus a few shape features of a note."""
+    lowered = text.lower()
+    tokens = _TOKEN.findall(lowered)
+    names = [f"w:{t}" for t in tokens]
+    names += [f"b:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    names.append(f"len:{min(len(tokens).bit_length(), 8)}")
+    if _URL.search(lowered):
+        names.append("has:url")
+    if _MENTION.search(text):
+        names.append("has:mention")
+    if "?" in text:
+        names.append("has:question")
+    if any(c.isdigit() for c in text):
+        names.append("has:digit")
+    if source:
+        names.append(f"src:{source}")
+    return {zlib.crc32(name.encode()) % BUCKETS for name in names}
+
+
+class RelevanceModel:
+    """Naive Bayes log-odds per feature bucket; `predict` is one dict lookup per feature."""
+
+    def __init__(self, weights: dict, bias: float, meta: dict = None):
+        self.weights = weights
+        self.bias = bias
+        self.meta = meta or {}
+
+    def predict(self, feats: set) -> float:
+        get = self.weights.get
+        logit = self.bias + sum(get(f, 0.0) for f in feats)
+        logit = max(min(logit, 30.0), -30.0)
+        return 1.0 / (1.0 + math.exp(-logit))
+
+    @classmethod
+    def train(cls, examples: list, alpha: float = 1.0) -> "RelevanceModel":
+        """`examples`: (feature set, relevant, weight). Weighted counts with Laplace smoothing."""
+        counts = {True: Counter(), False: Counter()}
+        totals = {True: 0.0, False: 0.0}
+        docs = {True: 0.0, False: 0.0}
+        for feats, label, weight in examples:
+            docs[label] += weight
+            for f in feats:
+                counts[label][f] += weight
+            totals[label] += weight * len(feats)
+        weights = {}
+        for f in set(counts[True]) | set(counts[False]):
+            p_rel = (counts[True][f] + alpha) / (totals[True] + alpha * BUCKETS)
+            p_irr = (counts[False][f] + alpha) / (totals[False] + alpha * BUCKETS)
+            weight = math.log(p_rel / p_irr)
+            if abs(weight) > 0.05:  # near-zero weights only cost memory
+                weights[f] = round(weight, 4)
+        bias = math.log((docs[True] + alpha) / (docs[False] + alpha))
+        meta = {"relevant": round(docs[True], 2), "noise": round(docs[False], 2), "features": len(weights)}
+        return cls(weights, bias, meta)
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": MODEL_VERSION,
+            "buckets": BUCKETS,
+            "bias": self.bias,
+            "weights": {str(k): v for k, v in self.weights.items()},
+            "meta": {**self.meta, "trained_at": datetime.utcnow().isoformat()},
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(orjson.dumps(payload))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["RelevanceModel"]:
+        payload = orjson.loads(path.read_bytes())
+        if payload.get("version") != MODEL_VERSION or payload.get("buckets") != BUCKETS:
+            logger.warning("Relevance model ignored: trained with a different feature layout", path=str(path))
+            return None
+        weights = {int(k): v for k, v in payload["weights"].items()}
+        return cls(weights, payload["bias"], payload.get("meta"))
+
+
+def rule_reason(text: str, channel: str = None, source: str = None, min_chars: int = None, allowlist=None) -> Optional[str]:
+    """Which rule makes this note noise, or None if the rules let it through."""
+    stripped = (text or "").strip()
+    if not stripped:
+        return "empty"
+    if allowlist and source == "slack" and channel not in allowlist:
+        return "channel"
+    lowered = stripped.lower()
+    if not _SYMBOLS.sub("", _SHORTCODE.sub("", lowered)):
+        return "emoji"
+    words = " ".join(_ACK_NOISE.sub(" ", _SHORTCODE.sub(" ", lowered)).split())
+    if _STATUS.fullmatch(words):
+        return None
+    if _ACK.fullmatch(words):
+        return "ack"
+    min_chars = settings.RELEVANCE_MIN_CHARS if min_chars is None else min_chars
+    if len(stripped) < min_chars and not _URL.search(lowered) and not _MENTION.search(stripped):
+        return "short"
+    return None
+
+
+class RelevanceFilter:
+    """Rules, then the classifier if a model file exists; counts what it skipped per reason."""
+
+    def __init__(self, model_path: str = None, threshold: float = None, min_chars: int = None, allowlist=None):
+        self.model_path = Path(model_path or settings.RELEVANCE_MODEL_PATH)
+        self.threshold = settings.RELEVANCE_THRESHOLD if threshold is None else threshold
+        self.min_chars = settings.RELEVANCE_MIN_CHARS if min_chars is None else min_chars
+        if allowlist is None:
+            allowlist = [c.strip() for c in settings.RELEVANCE_CHANNEL_ALLOWLIST.split(",") if c.strip()]
+        self.allowlist = frozenset(allowlist)
+        self.model = None
+        self._model_mtime = None
+        self._checked_at = None
+        self.notes = 0
+        self.passed = 0
+        self.skipped = Counter()
+        self.batches = 0
+        self.llm_calls_avoided = 0
+        self.decide_ns = 0
+
+    def _refresh_model(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            mtime = self.model_path.stat().st_mtime
+        except FileNotFoundError:
+            self.model, self._model_mtime = None, None
+            return
+        if mtime == self._model_mtime:
+            return
+        try:
+            self.model = RelevanceModel.load(self.model_path)
+            self._model_mtime = mtime
+            logger.info("Relevance model loaded", path=str(self.model_path), **(self.model.meta if self.model else {}))
+        except Exception as e:
+            logger.warning("Relevance model could not be loaded", path=str(self.model_path), error=str(e))
+            self.model = None
+
+    def decide(self, note: dict) -> Decision:
+        started = time.perf_counter_ns()
+        text = note.get("content") or ""
+        reason = rule_reason(text, note.get("channel"), note.get("source"), self.min_chars, self.allowlist)
+        if reason is not None:
+            decision = Decision(False, 0.0, reason)
+        elif self.model is None:
+            decision = Decision(True, 1.0, "model")
+        else:
+            score = self.model.predict(features(text, note.get("source")))
+            decision = Decision(score >= self.threshold, score, "model" if score >= self.threshold else "classifier")
+        self.decide_ns += time.perf_counter_ns() - started
+        self.notes += 1
+        if decision.relevant:
+            self.passed += 1
+        else:
+            self.skipped[decision.reason] += 1
+        return decision
+
+    def filter(self, notes: list) -> list:
+        """The notes worth an agent run; a batch left empty counts as one LLM call avoided."""
+        self._refresh_model()
+        kept = [note for note in notes if self.decide(note).relevant]
+        self.batches += 1
+        if notes and not kept:
+            self.llm_calls_avoided += 1
+        return kept
+
+    def metrics(self) -> dict:
+        return {
+            "model_loaded": self.model is not None,
+            "threshold": self.threshold,
+            "notes": self.notes,
+            "passed": self.passed,
+            "skipped": sum(self.skipped.values()),
+            "skipped_by_reason": dict(self.skipped),
+            "batches": self.batches,
+            "llm_calls_avoided": self.llm_calls_avoided,
+            "avg_decide_us": round(self.decide_ns / self.notes / 1000, 2) if self.notes else 0.0,
+        }
+
+
+_filter = None
+
+
+def get_relevance_filter() -> RelevanceFilter:
+    global _filter
+    if _filter is None:
+        _filter = RelevanceFilter()
+    return _filter
+
+
+def relevance_metrics() -> Optional[dict]:
+    """Metrics of this process's filter; None until a batch has been filtered here."""
+    return _filter.metrics() if _filter is not None else None
+
+
+# -- training ------------------------------------------------------------------
+
+def label_thread(replies: list) -> Optional[bool]:
+    """Relevant unless every assistant reply says the notes can be ignored; None without replies."""
+    if not replies:
+        return None
+    return not all(reply and _IGNORED.search(reply) for reply in replies)
+
+
+def training_examples(db, limit: int = 5000) -> list:
+    """
+    (feature set, relevant, weight) per note of the last `limit` data_agent threads the agent answered.
+    Any status but failed counts: runs before completed threads were marked success were left active.
+    """
+    answered = select(Message.id).where(Message.thread_id == Thread.id, Message.role == "assistant").exists()
+    threads = db.execute(
+        select(Thread.id)
+        .where(Thread.agent == "data_agent", Thread.status != "failed", answered)
+        .order_by(Thread.id.desc())
+        .limit(limit)
+    ).scalars().all()
+    if not threads:
+        return []
+    messages = {}
+    for thread_id, role, content in db.execute(
+        select(Message.thread_id, Message.role, Message.content)
+        .where(Message.thread_id.in_(threads), Message.role.in_(("user", "assistant")))
+        .order_by(Message.thread_id, Message.created_at, Message.id)
+    ):
+        entry = messages.setdefault(thread_id, {"context": None, "replies": []})
+        if role == "user" and entry["context"] is None:
+            entry["context"] = content
+        elif role == "assistant":
+            entry["replies"].append(content)
+    examples = []
+    for entry in messages.values():
+        label = label_thread(entry["replies"])
+        if label is None or not entry["context"]:
+            continue
+        try:
+            notes = orjson.loads(entry["context"]).get("notes") or []
+        except (orjson.JSONDecodeError, AttributeError):
+            continue
+        # one thread is one decision: its notes share the label and its weight
+        for note in notes:
+            text = note.get("content") or ""
+            if rule_reason(text, min_chars=0) is None:
+                examples.append((features(text, note.get("source")), label, 1.0 / len(notes)))
+    return examples
+
+
+def train_relevance_model(db, path: str = None, limit: int = 5000) -> dict:
+    """Retrain from recent Data Agent decisions and replace the model file."""
+    path = Path(path or settings.RELEVANCE_MODEL_PATH)
+    started = time.perf_counter()
+    examples = training_examples(db, limit)
+    labels = Counter(label for _, label, _ in examples)
+    if len(examples) < settings.RELEVANCE_MIN_TRAINING_NOTES or not labels[True] or not labels[False]:
+        return {
+            "ok": False,
+            "error": f"not enough labelled notes ({labels[True]} relevant, {labels[False]} noise; "
+                     f"need {settings.RELEVANCE_MIN_TRAINING_NOTES} with both)",
+        }
+    model = RelevanceModel.train(examples)
+    model.meta["notes"] = len(examples)
+    model.save(path)
+    result = {"ok": True, "path": str(path), "seconds": round(time.perf_counter() - started, 3), **model.meta}
+    logger.info("Relevance model trained", **result)
+    return result
+
+
+def evaluate(db, limit: int = 5000, relevance_filter: RelevanceFilter = None) -> dict:
+    """Replay recent labelled notes through the filter: calls it would have saved and relevant notes it would drop."""
+    relevance_filter = relevance_filter or RelevanceFilter()
+    relevance_filter._refresh_model()
+    confusion = Counter()
+    for feats, label, _ in training_examples(db, limit):
+        score = relevance_filter.model.predict(feats) if relevance_filter.model else 1.0
+        confusion[(label, score >= relevance_filter.threshold)] += 1
+    relevant = confusion[(True, True)] + confusion[(True, False)]
+    noise = confusion[(False, True)] + confusion[(False, False)]
+    return {
+        "model_loaded": relevance_filter.model is not None,
+        "threshold": relevance_filter.threshold,
+        "relevant_notes": relevant,
+        "noise_notes": noise,
+        "noise_skipped": confusion[(False, False)],
+        "relevant_dropped": confusion[(True, False)],
+        "recall": round(confusion[(True, True)] / relevant, 4) if relevant else None,
+    }
+
+
+def main(argv=None):
+    from backend.app.db.session import get_db
+    parser = argparse.ArgumentParser(prog="python -m backend.app.agents.relevance")
+    parser.add_argument("command", choices=("train", "evaluate"))
+    parser.add_argument("--limit", type=int, default=5000, help="most recent data_agent threads to read")
+    parser.add_argument("--path", default=None, help="model file (default RELEVANCE_MODEL_PATH)")
+    args = parser.parse_args(argv)
+    db = next(get_db())
+    try:
+        if args.command == "train":
+            result = train_relevance_model(db, args.path, args.limit)
+        else:
+            result = evaluate(db, args.limit, RelevanceFilter(model_path=args.path))
+    finally:
+        db.close()
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
+    return 0 if result.get("ok", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Incremental, watermark-driven runs for the nightly agents (Curator, Planner).
+
+Each scheduled agent keeps a high-water mark of (updated_at, id) in
+`agent_watermarks`. A run only reads rows changed since that mark (keyset scan
+on the (updated_at, id) index), hands them to the LLM in batches and commits
+the new mark in the same transaction as the run's thread result, so a crash
+either keeps both or neither. A run is claimed by setting `running_since` in
+its own short transaction, and the LLM is called with no transaction open, so
+no row lock or idle-in-transaction session is held for the length of a call; a
+claim older than SCHEDULED_AGENT_CLAIM_TIMEOUT_MINUTES (a crashed worker) can
+be taken over. Rows touched within SCHEDULED_AGENT_LAG_SECONDS of
+the run are left for the next run so in-flight transactions aren't skipped.
+The Curator also gets stalled threads via the (status, updated_at) index.
+"""
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+import os
+import orjson
+from langgraph.graph import StateGraph, START, END
+from langchain_core.messages import HumanMessage, AIMessage
+from sqlalchemy import func, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from backend.app.agents.data_agent import AgentState
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+from backend.app.core.openrouter import get_openrouter_client
+from backend.app.core.tracing import span, traced
+from backend.app.db.models import AgentWatermark, Thread, Message
+from backend.app.db.session import get_db
+
+
+def create_scheduled_agent(name: str):
+    @traced(f"agent.{name}.review")
+    async def review(state: AgentState) -> AgentState:
+        logger.info("Scheduled agent reviewing changes", agent=name, thread_id=state["thread_id"])
+        try:
+            model = os.getenv(f"{name.upper()}_AGENT_MODEL", settings.OPENROUTER_DEFAULT_MODEL)
+            temperature = float(os.getenv(f"{name.upper()}_AGENT_TEMPERATURE", settings.OPENROUTER_DEFAULT_TEMPERATURE))
+            response = await get_openrouter_client().chat_completion(
+                messages=[{"role": "system", "content": state["prompt"]}] + [{"role": "user", "content": m.content} for m in state["messages"]],
+                model=model,
+                temperature=temperature,
+            )
+            content = response.choices[0].message.content
+            return {**state, "messages": [AIMessage(content=content)], "status": "success"}
+        except Exception as e:
+            logger.error("Scheduled agent error", agent=name, error=str(e), thread_id=state["thread_id"])
+            return {**state, "status": "failed", "error_count": state["error_count"] + 1, "last_error": str(e) or "Unknown error"}
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("review", review)
+    workflow.add_edge(START, "review")
+    workflow.add_edge("review", END)
+    return workflow.compile()
+
+
+def changed_rows(db, model, columns, mark, limit: int, upper: datetime, exclude=None) -> list:
+    """Rows of `model` with (updated_at, id) after `mark` and updated_at <= upper, oldest first."""
+    query = select(*columns).where(model.updated_at <= upper)
+    if mark is not None:
+        query = query.where(tuple_(model.updated_at, model.id) > tuple_(*mark))
+    if exclude is not None:
+        query = query.where(exclude)
+    query = query.order_by(model.updated_at, model.id).limit(limit)
+    return [dict(row) for row in db.execute(query).mappings()]
+
+
+def stalled_threads(db, columns, now: datetime, limit: int) -> list:
+    """Active/paused threads untouched for SCHEDULED_AGENT_STALLED_HOURS (uses ix_threads_status_updated_at)."""
+    cutoff = now - timedelta(hours=settings.SCHEDULED_AGENT_STALLED_HOURS)
+    query = (
+        select(*columns)
+        .where(Thread.status.in_(("active", "paused")), Thread.updated_at < cutoff)
+        .order_by(Thread.updated_at)
+        .limit(limit)
+    )
+    return [dict(row) for row in db.execute(query).mappings()]
+
+
+def claim_watermark(db, name: str) -> Optional[dict]:
+    """
+    Claim the agent's run and commit straight away.
+    Returns {"running_since", "high_water_mark", "high_water_id"}, or None while another run holds a live claim.
+    """
+    now = datetime.utcnow()
+    expired = now - timedelta(minutes=settings.SCHEDULED_AGENT_CLAIM_TIMEOUT_MINUTES)
+    db.execute(insert(AgentWatermark).values(agent=name, rows_processed=0).on_conflict_do_nothing())
+    claim = db.execute(
+        update(AgentWatermark)
+        .where(AgentWatermark.agent == name)
+        .where(or_(AgentWatermark.running_since.is_(None), AgentWatermark.running_since < expired))
+        .values(running_since=now, last_run_at=now)
+        .returning(AgentWatermark.running_since, AgentWatermark.high_water_mark, AgentWatermark.high_water_id)
+    ).mappings().first()
+    db.commit()
+    return dict(claim) if claim else None
+
+
+def advance_watermark(db, name: str, claimed: datetime, rows: int, **values) -> bool:
+    """Move the claimed watermark in the caller's transaction; False if the claim expired and was taken over."""
+    result = db.execute(
+        update(AgentWatermark)
+        .where(AgentWatermark.agent == name, AgentWatermark.running_since == claimed)
+        .values(rows_processed=func.coalesce(AgentWatermark.rows_processed, 0) + rows, **values)
+    )
+    return result.rowcount == 1
+
+
+def release_watermark(db, name: str, claimed: datetime):
+    db.execute(
+        update(AgentWatermark)
+        .where(AgentWatermark.agent == name, AgentWatermark.running_since == claimed)
+        .values(running_since=None)
+    )
+    db.commit()
+
+
+@traced("agent.run_scheduled_agent")
+async def run_scheduled_agent(
+    name: str,
+    prompt: str,
+    model,
+    columns,
+    include_stalled: bool = False,
+    now: datetime = None,
+) -> Dict[str, Any]:
+    """
+    Run `name` over rows of `model` changed since its watermark, one LLM call per batch.
+    Returns: {"ok": True, "rows": n, "batches": n, "threads": [ids]} or {"ok": False, "error": ...}
+    """
+    now = now or datetime.utcnow()
+    upper = now - timedelta(seconds=settings.SCHEDULED_AGENT_LAG_SECONDS)
+    batch_size = settings.SCHEDULED_AGENT_BATCH_SIZE
+    with span(f"agent.{name}.compile_graph"):
+        agent = create_scheduled_agent(name)
+    exclude = Thread.agent.is_distinct_from(name) if model is Thread else None  # the agent's own run threads aren't news
+    db = next(get_db())
+    claim = claim_watermark(db, name)
+    if claim is None:
+        db.close()
+        logger.warning("Scheduled agent already running", agent=name)
+        return {"ok": False, "error": "already running"}
+    claimed = claim["running_since"]
+    mark = (claim["high_water_mark"], claim["high_water_id"]) if claim["high_water_mark"] else None
+    processed, threads = 0, []
+    try:
+        for batch_number in range(settings.SCHEDULED_AGENT_MAX_BATCHES):
+            rows = changed_rows(db, model, columns, mark, batch_size, upper, exclude)
+            stalled = stalled_threads(db, columns, now, batch_size) if include_stalled and batch_number == 0 else []
+            if not rows and not stalled:
+                db.rollback()
+                break
+
+            thread = Thread(status="active", agent=name)
+            db.add(thread)
+            db.flush()
+            thread_id = thread.id
+            context = orjson.dumps({"changed": rows, "stalled": stalled}, option=orjson.OPT_INDENT_2).decode()
+            db.add(Message(thread_id=thread_id, role="system", content=prompt))
+            db.add(Message(thread_id=thread_id, role="user", content=context))
+            db.commit()  # nothing stays open across the LLM call
+            final_state = await agent.ainvoke({
+                "messages": [HumanMessage(content=context)],
+                "thread_id": thread_id,
+                "status": "active",
+                "error_count": 0,
+                "last_error": "",
+                "prompt": prompt,
+            })
+            if final_state["status"] != "success":
+                # Keep the failed thread for the dashboard, leave the watermark where it was
+                db.execute(
+                    update(Thread).where(Thread.id == thread_id)
+                    .values(status="failed", error_count=final_state["error_count"], last_error=final_state["last_error"])
+                )
+                db.commit()
+                return {"ok": False, "error": final_state["last_error"], "threads": threads + [thread_id]}
+
+            db.add(Message(thread_id=thread_id, role="assistant", content=final_state["messages"][-1].content))
+            db.execute(update(Thread).where(Thread.id == thread_id).values(status="success", completed_at=datetime.utcnow()))
+            if rows:
+                mark = (rows[-1]["updated_at"], rows[-1]["id"])
+            advanced = advance_watermark(
+                db, name, claimed, len(rows),
+                high_water_mark=mark[0] if mark else None,
+                high_water_id=mark[1] if mark else None,
+                last_thread_id=thread_id,
+            )
+            if not advanced:
+                db.rollback()
+                db.execute(update(Thread).where(Thread.id == thread_id).values(status="failed", last_error="claim expired"))
+                db.commit()
+                logger.warning("Scheduled agent claim taken over", agent=name, thread_id=thread_id)
+                return {"ok": False, "error": "claim expired", "threads": threads + [thread_id]}
+            db.commit()  # run result and watermark land together
+            processed += len(rows)
+            threads.append(thread_id)
+            if len(rows) < batch_size:
+                break
+        logger.info("Scheduled agent run complete", agent=name, rows=processed, batches=len(threads))
+        return {"ok": True, "rows": processed, "batches": len(threads), "threads": threads}
+    except Exception as e:
+        db.rollback()
+        logger.error("Scheduled agent run failed", agent=name, error=str(e))
+        return {"ok": False, "error": str(e), "threads": threads}
+    finally:
+        try:
+            release_watermark(db, name, claimed)
+        except Exception as e:
+            logger.error("Could not release scheduled agent claim", agent=name, error=str(e))
+        db.close()
@@ -0,0 +1,325 @@
+"""
+Batched note-to-task extraction (the PRD's Organise step).
+
+New raw notes are read past the extractor's watermark (keyset on raw_notes.id)
+and packed into as few LLM calls as possible: up to TASK_EXTRACTION_BATCH_NOTES
+notes or TASK_EXTRACTION_BATCH_CHARS characters per call, answered as one JSON
+object (structured output) listing every task found in the batch.
+
+Extracted tasks are deduplicated on `description_hash`, the hash of the
+normalised description (case, punctuation and whitespace folded), first within
+the batch and then against `tasks` by a bulk INSERT ... ON CONFLICT
+(description_hash): a task seen before only has its empty fields filled in.
+Project names are resolved through an in-memory cache of the projects table.
+
+The run is claimed through agent_watermarks.running_since like the scheduled
+agents (backend/app/agents/scheduled.py), and the LLM is called with no
+transaction open; each batch's tasks and the advanced watermark then commit
+together, so a failed call leaves its notes for the next run. Ids are handed
+out at insert but become visible at commit, so a note can commit after one
+with a higher id: a batch stops below the first note received within
+SCHEDULED_AGENT_LAG_SECONDS, which leaves in-flight inserts ahead of the mark.
+Every run reports notes/sec and LLM calls per note.
+"""
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from backend.app.agents.scheduled import advance_watermark, claim_watermark, release_watermark
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+from backend.app.core.openrouter import get_openrouter_client
+from backend.app.core.tracing import span, traced
+from backend.app.db.models import Project, RawNote, Task
+from backend.app.db.session import get_db
+from backend.app.schemas.task import ExtractedTask
+
+AGENT_NAME = "task_extractor"
+
+extraction_prompt = """
+You are the Task Extractor. You read work notes (Slack messages, meeting notes) and pull out actionable tasks.
+
+# Input
+A JSON list of notes, each with an id, source, author, channel and content.
+
+# Instructions
+- Only extract concrete actions someone has to do; skip chatter, FYIs and things already done.
+- One task per action, written as a short imperative sentence ("Send the revised deck to Bharat").
+- If several notes describe the same action, return it once with all their note_ids.
+- Set assignee, project, priority (1 = highest, 5 = lowest) and due_date (YYYY-MM-DD) only when the notes say so.
+- Return {"tasks": []} when there is nothing to do.
+"""
+
+EXTRACTION_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "task_extraction",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["tasks"],
+            "properties": {
+                "tasks": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "additionalProperties": False,
+                        "required": ["note_ids", "description", "assignee", "project", "priority", "due_date"],
+                        "properties": {
+                            "note_ids": {"type": "array", "items": {"type": "integer"}},
+                            "description": {"type": "string"},
+                            "assignee": {"type": ["string", "null"]},
+                            "project": {"type": ["string", "null"]},
+                            "priority": {"type": ["integer", "null"]},
+                            "due_date": {"type": ["string", "null"]},
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_description(description: str) -> str:
+    text = unicodedata.normalize("NFKC", description).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def description_hash(description: str) -> str:
+    """Dedup key of a task: "Email Bharat the deck." and "email bharat the deck" are the same task."""
+    return hashlib.md5(normalize_description(description).encode()).hexdigest()
+
+
+def pack_notes(notes: list, max_notes: int, max_chars: int) -> list:
+    """Split notes into LLM batches by count and content size; an oversized note gets a batch of its own."""
+    batches, batch, size = [], [], 0
+    for note in notes:
+        length = len(note["content"])
+        if batch and (len(batch) >= max_notes or size + length > max_chars):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(note)
+        size += length
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def parse_task(item) -> Optional[ExtractedTask]:
+    """One extracted task; an invalid optional field ("next Friday" as due_date) is cleared, not the whole task."""
+    if not isinstance(item, dict) or not isinstance(item.get("description"), str) or not item["description"].strip():
+        logger.warning("Dropped extracted task without a description", item=item)
+        return None
+    try:
+        return ExtractedTask.model_validate(item)
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors() if error["loc"]}
+        logger.warning("Cleared invalid fields of extracted task", item=item, fields=sorted(invalid))
+    cleaned = {k: v for k, v in item.items() if k in ExtractedTask.model_fields and k not in invalid}
+    try:
+        return ExtractedTask.model_validate(cleaned)
+    except ValidationError as e:
+        logger.warning("Dropped malformed extracted task", item=item, error=str(e))
+        return None
+
+
+def parse_extraction(content: str) -> list:
+    """Tasks from the model's JSON; items are checked one by one rather than failing the batch."""
+    try:
+        payload = orjson.loads(content or "{}")
+    except orjson.JSONDecodeError:
+        logger.warning("Task extraction returned invalid JSON", content=(content or "")[:500])
+        return []
+    items = payload.get("tasks", []) if isinstance(payload, dict) else []
+    return [task for task in map(parse_task, items) if task is not None]
+
+
+def dedupe_tasks(tasks: list) -> list:
+    """Collapse tasks with the same description hash, merging note ids and keeping the first non-empty fields."""
+    merged = {}
+    for task in tasks:
+        key = description_hash(task.description)
+        if key not in merged:
+            merged[key] = task.model_copy()
+            continue
+        kept = merged[key]
+        kept.note_ids = sorted(set(kept.note_ids) | set(task.note_ids))
+        for field in ("assignee", "project", "priority", "due_date"):
+            if getattr(kept, field) is None:
+                setattr(kept, field, getattr(task, field))
+    return list(merged.items())
+
+
+class ProjectCache:
+    """Project name -> id, matched case/punctuation-insensitively; reloaded at most once per `ttl` on a miss."""
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self._ids = {}
+        self._loaded_at = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, db):
+        self._ids = {normalize_description(name): id for id, name in db.execute(select(Project.id, Project.name))}
+        self._loaded_at = time.monotonic()
+
+    def resolve(self, db, name: Optional[str]) -> Optional[int]:
+        if not name:
+            return None
+        key = normalize_description(name)
+        if self._loaded_at is None or (key not in self._ids and time.monotonic() - self._loaded_at > self.ttl):
+            self.load(db)
+        project_id = self._ids.get(key)
+        if project_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return project_id
+
+
+project_cache = ProjectCache()
+
+
+def upsert_tasks(db, tasks: list, projects: ProjectCache) -> Dict[str, int]:
+    """One INSERT ... ON CONFLICT (description_hash) for the batch; existing tasks only gain missing fields."""
+    if not tasks:
+        return {"inserted": 0, "merged": 0}
+    rows = [
+        {
+            "description": task.description.strip(),
+            "description_hash": key,
+            "assignee": task.assignee,
+            "project_id": projects.resolve(db, task.project),
+            "priority": task.priority,
+            "due_date": task.due_date,
+            "status": "pending",
+            "created_by": AGENT_NAME,
+            "updated_by": AGENT_NAME,
+        }
+        for key, task in tasks
+    ]
+    statement = insert(Task).values(rows)
+    statement = statement.on_conflict_do_update(
+        constraint="uq_tasks_description_hash",
+        set_={
+            "assignee": func.coalesce(Task.assignee, statement.excluded.assignee),
+            "project_id": func.coalesce(Task.project_id, statement.excluded.project_id),
+            "priority": func.coalesce(Task.priority, statement.excluded.priority),
+            "due_date": func.coalesce(Task.due_date, statement.excluded.due_date),
+            "updated_at": func.now(),
+        },
+    ).returning(Task.id, literal_column("xmax") == 0)  # xmax is 0 only on freshly inserted rows
+    inserted = sum(1 for _, is_new in db.execute(statement) if is_new)
+    return {"inserted": inserted, "merged": len(rows) - inserted}
+
+
+def notes_after(db, after: int, cutoff: datetime, limit: int) -> list:
+    """Notes with id > `after`, stopping below the first one received after `cutoff` (it may have lower ids still in flight)."""
+    horizon = (
+        select(func.min(RawNote.id))
+        .where(RawNote.id > after, RawNote.received_at > cutoff)
+        .scalar_subquery()
+    )
+    query = (
+        select(RawNote.id, RawNote.source, RawNote.author, RawNote.channel, RawNote.content)
+        .where(RawNote.id > after, or_(horizon.is_(None), RawNote.id < horizon))
+        .order_by(RawNote.id)
+        .limit(limit)
+    )
+    return [dict(row) for row in db.execute(query).mappings()]
+
+
+async def extract_batch(notes: list, model: str, temperature: float) -> list:
+    payload = [
+        {k: note[k] for k in ("id", "source", "author", "channel", "content")}
+        for note in notes
+    ]
+    with span("agent.task_extractor.llm_call", notes=len(notes)):
+        response = await get_openrouter_client().chat_completion(
+            messages=[
+                {"role": "system", "content": extraction_prompt},
+                {"role": "user", "content": orjson.dumps(payload).decode()},
+            ],
+            model=model,
+            temperature=temperature,
+            response_format=EXTRACTION_SCHEMA,
+        )
+    return parse_extraction(response.choices[0].message.content)
+
+
+@traced("agent.run_task_extractor")
+async def run_task_extractor() -> Dict[str, Any]:
+    """
+    Extract tasks from raw notes received since the last run.
+    Returns: {"ok": True, "notes": n, "llm_calls": n, "tasks_inserted": n, "tasks_merged": n, ...} or {"ok": False, "error": ...}
+    """
+    model = os.getenv("TASK_EXTRACTOR_AGENT_MODEL", settings.OPENROUTER_DEFAULT_MODEL)
+    temperature = float(os.getenv("TASK_EXTRACTOR_AGENT_TEMPERATURE", "0"))
+    started = time.perf_counter()
+    stats = {"notes": 0, "llm_calls": 0, "tasks_extracted": 0, "tasks_inserted": 0, "tasks_merged": 0}
+    db = next(get_db())
+    claim = claim_watermark(db, AGENT_NAME)
+    if claim is None:
+        db.close()
+        logger.warning("Task extractor already running")
+        return {"ok": False, "error": "already running"}
+    claimed = claim["running_since"]
+    high_water_id = claim["high_water_id"] or 0
+    try:
+        for _ in range(settings.TASK_EXTRACTION_MAX_BATCHES):
+            cutoff = datetime.utcnow() - timedelta(seconds=settings.SCHEDULED_AGENT_LAG_SECONDS)
+            notes = notes_after(db, high_water_id, cutoff, settings.TASK_EXTRACTION_BATCH_NOTES)
+            db.rollback()  # nothing stays open across the LLM call
+            if not notes:
+                break
+            batch = pack_notes(notes, settings.TASK_EXTRACTION_BATCH_NOTES, settings.TASK_EXTRACTION_BATCH_CHARS)[0]
+            extracted = await extract_batch(batch, model, temperature)
+            stats["llm_calls"] += 1
+            tasks = dedupe_tasks(extracted)
+            counts = upsert_tasks(db, tasks, project_cache)
+            if not advance_watermark(db, AGENT_NAME, claimed, len(batch), high_water_id=batch[-1]["id"]):
+                db.rollback()
+                logger.warning("Task extractor claim taken over", **stats)
+                return {"ok": False, "error": "claim expired", **stats}
+            db.commit()  # tasks and watermark land together
+            high_water_id = batch[-1]["id"]
+            stats["notes"] += len(batch)
+            stats["tasks_extracted"] += len(extracted)
+            stats["tasks_inserted"] += counts["inserted"]
+            stats["tasks_merged"] += counts["merged"] + len(extracted) - len(tasks)
+            if len(notes) < settings.TASK_EXTRACTION_BATCH_NOTES and len(batch) == len(notes):
+                break
+    except Exception as e:
+        db.rollback()
+        logger.error("Task extraction failed", error=str(e), **stats)
+        return {"ok": False, "error": str(e), **stats}
+    finally:
+        try:
+            release_watermark(db, AGENT_NAME, claimed)
+        except Exception as e:
+            logger.error("Could not release task extractor claim", error=str(e))
+        db.close()
+    elapsed = time.perf_counter() - started
+    report = {
+        **stats,
+        "elapsed_seconds": round(elapsed, 3),
+        "notes_per_sec": round(stats["notes"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "llm_calls_per_note": round(stats["llm_calls"] / stats["notes"], 4) if stats["notes"] else 0.0,
+        "project_cache": {"hits": project_cache.hits, "misses": project_cache.misses},
+    }
+    logger.info("Task extraction complete", **report)
+    return {"ok": True, **report}
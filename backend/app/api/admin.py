@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from typing import Optional
+import asyncio
+import secrets
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+from backend.app.core import profiling
+from backend.app.core.leader import current_leader
+from backend.app.db.instrumentation import get_instrumentation
+from backend.app.db.session import get_db, get_engine
+
+# Live diagnostics for this process. Disabled unless ADMIN_TOKEN is set; every
+# call must send it as X-Admin-Token.
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"],
+    default_response_class=ORJSONResponse,
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.post("/profile")
+async def cpu_profile(
+    seconds: float = Query(10, gt=0, le=profiling.MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+):
+    """
+    Sample every thread of the API process for `seconds`. The sampler runs off the
+    event loop, so the loop keeps serving (and shows up in the profile).
+    `collapsed` output feeds straight into flamegraph.pl / speedscope.
+    """
+    logger.info("Admin profile started", seconds=seconds, interval_ms=interval_ms)
+    try:
+        result = await asyncio.to_thread(profiling.profile, seconds, interval_ms / 1000)
+    except profiling.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info("Admin profile finished", samples=result["samples"])
+    if format == "collapsed":
+        return PlainTextResponse(result["collapsed"])
+    return ORJSONResponse(result)
+
+
+@router.post("/memory/start")
+def memory_start(frames: int = Query(25, ge=1, le=100)):
+    """Start tracemalloc and take a baseline snapshot (tracemalloc stays off until this is called)."""
+    logger.info("Admin allocation tracking started", frames=frames)
+    return ORJSONResponse(profiling.start_allocation_tracking(frames))
+
+
+@router.get("/memory/diff")
+def memory_diff(
+    limit: int = Query(25, ge=1, le=500),
+    key_type: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+):
+    """Allocation growth since /memory/start, largest first."""
+    try:
+        return ORJSONResponse(profiling.allocation_diff(limit, key_type))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/memory/stop")
+def memory_stop():
+    logger.info("Admin allocation tracking stopped")
+    return ORJSONResponse(profiling.stop_allocation_tracking())
+
+
+def _instrumentation(engine: str):
+    if engine == "default":
+        get_engine()  # built on first use; make sure its stats exist before the first query
+    instrumentation = get_instrumentation(engine)
+    if instrumentation is None:
+        raise HTTPException(status_code=404, detail=f"Engine '{engine}' is not instrumented in this process")
+    return instrumentation
+
+
+@router.get("/db/queries")
+def db_queries(
+    engine: str = Query("default"),
+    order: str = Query("total_ms", pattern="^(total_ms|mean_ms|p95_ms|p99_ms|max_ms|count|errors)$"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Per-fingerprint statement latency since process start (or the last reset)."""
+    return ORJSONResponse(_instrumentation(engine).query_stats(order, limit))
+
+
+@router.get("/db/slow")
+def db_slow(engine: str = Query("default"), limit: int = Query(20, ge=1, le=100)):
+    """EXPLAIN (ANALYZE, BUFFERS) plans captured for slow reads, newest first."""
+    return ORJSONResponse(_instrumentation(engine).slow_plans(limit))
+
+
+@router.get("/db/pool")
+def db_pool(engine: str = Query("default")):
+    return ORJSONResponse(_instrumentation(engine).pool_stats())
+
+
+@router.post("/db/reset")
+def db_reset(engine: str = Query("default")):
+    _instrumentation(engine).reset()
+    logger.info("Admin query stats reset", engine=engine)
+    return ORJSONResponse({"ok": True})
+
+
+@router.get("/leader")
+def leader(name: str = Query("slack-listener"), db=Depends(get_db)):
+    """Which process holds the `name` election lock, from pg_locks / pg_stat_activity."""
+    return ORJSONResponse({"role": name, "leader": current_leader(db, name)})
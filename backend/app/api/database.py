@@ -0,0 +1,185 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+from datetime import date, datetime
+from typing import List, Optional
+import base64
+import binascii
+import orjson
+from sqlalchemy import select, func, or_, text, tuple_, ARRAY, LargeBinary, Text, Integer, SmallInteger, Date, DateTime, String
+from backend.app.db.session import get_db
+from backend.app.db.models import Base
+from backend.app.core.logging import logger
+
+# Database View: browse any mapped table newest-first with keyset paging on the
+# whole primary key (a composite key pages on the tuple, with the cursor encoded
+# as base64url JSON). Totals come from pg_class.reltuples (or the planner's row
+# estimate when filters are applied); an exact COUNT(*) only runs on request.
+router = APIRouter(prefix="/api/v1/db", tags=["database"], default_response_class=ORJSONResponse)
+
+TABLES = Base.metadata.tables
+FILTER_TYPES = (String, Integer, SmallInteger, Date, DateTime)
+HEAVY_TYPES = (ARRAY, LargeBinary, Text)  # vectors, blobs and large text stay out of list responses by default
+RESERVED_PARAMS = {"after", "limit", "q", "include", "exact"}
+MAX_LIMIT = 500
+
+
+def get_table(name: str):
+    table = TABLES.get(name)
+    if table is None:
+        raise HTTPException(status_code=404, detail="Unknown table")
+    return table
+
+
+def key_columns(table) -> list:
+    return list(table.primary_key.columns)
+
+
+def encode_cursor(table, row) -> object:
+    """The last row's key: the plain value for a single-column key, else base64url JSON of the tuple."""
+    columns = key_columns(table)
+    if len(columns) == 1:
+        return row[columns[0].name]
+    return base64.urlsafe_b64encode(orjson.dumps([row[c.name] for c in columns])).decode()
+
+
+def keyset_clause(table, after: str):
+    """Rows strictly before the cursor in key order."""
+    columns = key_columns(table)
+    if len(columns) == 1:
+        return columns[0] < coerce(columns[0], after)
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(after.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple_(*columns) < tuple_(*[coerce(c, v) for c, v in zip(columns, values)])
+
+
+def is_heavy(column) -> bool:
+    return isinstance(column.type, HEAVY_TYPES)
+
+
+def filterable_columns(table) -> dict:
+    return {c.name: c for c in table.columns if isinstance(c.type, FILTER_TYPES) and not is_heavy(c)}
+
+
+def searchable_columns(table) -> list:
+    return [c for c in table.columns if isinstance(c.type, (String, Text))]
+
+
+def list_columns(table, include: Optional[List[str]]) -> list:
+    include = set(include or [])
+    return [
+        c for c in table.columns
+        if not isinstance(c.type, LargeBinary)  # compressed blobs are never useful as JSON
+        and (not is_heavy(c) or "*" in include or c.name in include)
+    ]
+
+
+def coerce(column, value: str):
+    try:
+        if isinstance(column.type, DateTime):
+            return datetime.fromisoformat(value)
+        if isinstance(column.type, Date):
+            return date.fromisoformat(value)
+        if isinstance(column.type, (Integer, SmallInteger)):
+            return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid value for {column.name}")
+    return value
+
+
+def filter_clauses(table, params) -> list:
+    """`col=value`, `col__gte=value`, `col__lte=value` for allowlisted columns only."""
+    allowed = filterable_columns(table)
+    clauses = []
+    for key, value in params.items():
+        if key in RESERVED_PARAMS:
+            continue
+        name, _, op = key.partition("__")
+        column = allowed.get(name)
+        if column is None or op not in ("", "gte", "lte"):
+            raise HTTPException(status_code=400, detail=f"Filtering on {key} is not allowed")
+        value = coerce(column, value)
+        clauses.append(column >= value if op == "gte" else column <= value if op == "lte" else column == value)
+    return clauses
+
+
+def estimated_total(db, table, clauses) -> int:
+    """Row estimate without scanning: pg_class.reltuples, or the planner's estimate for a filtered query."""
+    if clauses:
+        compiled = select(*key_columns(table)).where(*clauses).compile(db.get_bind())
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+        plan = orjson.loads(plan) if isinstance(plan, (str, bytes)) else plan
+        return int(plan[0]["Plan"]["Plan Rows"])
+    # Partitioned parents report no tuples themselves, so add up their partitions
+    estimate = db.execute(
+        text(
+            "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0) FROM pg_class c "
+            "WHERE c.oid = CAST(:table AS regclass) "
+            "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:table AS regclass))"
+        ),
+        {"table": table.name},
+    ).scalar()
+    return int(estimate)
+
+
+@router.get("/tables")
+def list_tables(db = Depends(get_db)):
+    return ORJSONResponse([
+        {
+            "table": table.name,
+            "key": [c.name for c in key_columns(table)],
+            "columns": [c.name for c in table.columns],
+            "hidden_by_default": [c.name for c in table.columns if is_heavy(c)],
+            "filterable": list(filterable_columns(table)),
+            "estimated_total": estimated_total(db, table, []),
+        }
+        for table in TABLES.values()
+    ])
+
+
+@router.get("/tables/{name}")
+def browse_table(
+    name: str,
+    request: Request,
+    after: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    q: Optional[str] = None,
+    include: Optional[List[str]] = Query(None),
+    exact: bool = False,
+    db = Depends(get_db),
+):
+    """
+    Rows of `name`, newest first. Pass the returned `next_cursor` as `after` for the next page.
+    Filters are `col=value` / `col__gte=` / `col__lte=` on allowlisted columns; `q` searches text columns.
+    """
+    table = get_table(name)
+    keys = key_columns(table)
+    clauses = filter_clauses(table, request.query_params)
+    if q:
+        searchable = searchable_columns(table)
+        if not searchable:
+            raise HTTPException(status_code=400, detail="Table has no searchable columns")
+        clauses.append(or_(*[c.ilike(f"%{q}%") for c in searchable]))
+    columns = list_columns(table, include)
+    selected = {c.name for c in columns}
+    columns += [c for c in keys if c.name not in selected]  # the cursor needs every key column
+    query = select(*columns).where(*clauses)
+    if after is not None:
+        query = query.where(keyset_clause(table, after))
+    rows = db.execute(query.order_by(*[c.desc() for c in keys]).limit(limit + 1)).mappings().all()
+    next_cursor = encode_cursor(table, rows[limit - 1]) if len(rows) > limit else None
+    if exact:
+        total = db.execute(select(func.count()).select_from(table).where(*clauses)).scalar()
+    else:
+        total = estimated_total(db, table, clauses)
+    logger.info("Database view browsed", table=name, count=min(len(rows), limit), filters=len(clauses), exact=exact)
+    return ORJSONResponse({
+        "table": name,
+        "rows": [dict(row) for row in rows[:limit]],
+        "next_cursor": next_cursor,
+        "total": total,
+        "total_is_estimate": not exact,
+    })
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from datetime import datetime
+from typing import List, Optional
+import orjson
+from backend.app.core.log_search import LOG_SOURCES, log_files, search_logs, tail_log
+from backend.app.core.logging import logger
+
+router = APIRouter(prefix="/api/v1/logs", tags=["logs"], default_response_class=ORJSONResponse)
+
+def check_source(source: str):
+    if source not in LOG_SOURCES:
+        raise HTTPException(status_code=404, detail="Unknown log source")
+
+@router.get("/sources")
+def list_sources():
+    return ORJSONResponse([
+        {"source": source, "files": [p.name for p in log_files(source)]}
+        for source in LOG_SOURCES
+    ])
+
+@router.get("/")
+def query_logs(
+    source: str = "tasuke",
+    level: Optional[List[str]] = Query(None),
+    component: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    q: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=5000),
+):
+    check_source(source)
+    entries = search_logs(source, levels=level, component=component, start=start, end=end, query=q, limit=limit)
+    logger.debug("Logs queried", source=source, level=level, component=component, count=len(entries))
+    return ORJSONResponse(entries)
+
+@router.get("/tail")
+async def tail_logs(
+    source: str = "tasuke",
+    level: Optional[List[str]] = Query(None),
+    component: Optional[str] = None,
+):
+    """Server-sent events stream of new entries for the live Logs View."""
+    check_source(source)
+
+    async def events():
+        async for entry in tail_log(source, levels=level, component=component):
+            yield b"data: " + orjson.dumps(entry) + b"\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
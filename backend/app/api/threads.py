@@ -1,31 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
 from backend.app.db.session import get_db
-from backend.app.db.models import Thread, Message
+from backend.app.db.models import Thread, Message, Upload, ThreadAttachment
+from backend.app.db.archive import thread_message_dicts
+from backend.app.schemas.thread import ThreadResponse, ThreadStatusResponse
+from backend.app.schemas.message import MessageResponse
+from backend.app.schemas.attachment import AttachmentResponse, UploadResponse
+from backend.app.core.config import settings
 from backend.app.core.logging import logger
-from sqlalchemy import select
+from backend.app.core.uploads import UnsupportedUpload, UploadTooLarge, store_stream
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert
 
-router = APIRouter(prefix="/api/v1/threads", tags=["threads"])
+# Routes return ORJSONResponse directly: the row mappings already match the
+# response schemas, so FastAPI's per-row validation + jsonable_encoder pass is
+# skipped and orjson serializes datetimes natively. response_model is kept for
+# the OpenAPI docs.
+router = APIRouter(prefix="/api/v1/threads", tags=["threads"], default_response_class=ORJSONResponse)
 
-@router.get("/", response_model=List[dict])
+THREAD_COLUMNS = ThreadResponse.columns(Thread.__table__)
+ATTACHMENT_COLUMNS = AttachmentResponse.columns(ThreadAttachment.__table__) + [
+    c for c in AttachmentResponse.columns(Upload.__table__) if c.name not in ThreadAttachment.__table__.c
+]
+
+@router.get("/", response_model=List[ThreadResponse])
 def list_threads(db = Depends(get_db)):
-    threads = db.execute(Thread.__table__.select())
-    result = threads.fetchall()
+    result = db.execute(select(*THREAD_COLUMNS)).mappings().all()
     logger.info("Listing threads", count=len(result))
-    return [dict(row._mapping) for row in result]
+    return ORJSONResponse([dict(row) for row in result])
 
-@router.get("/{thread_id}", response_model=dict)
+@router.get("/{thread_id}", response_model=ThreadResponse)
 def thread_detail(thread_id: int, db = Depends(get_db)):
-    thread = db.execute(Thread.__table__.select().where(Thread.id == thread_id))
-    row = thread.fetchone()
+    row = db.execute(select(*THREAD_COLUMNS).where(Thread.id == thread_id)).mappings().first()
     if not row:
         logger.warning("Thread not found", thread_id=thread_id)
         raise HTTPException(status_code=404, detail="Thread not found")
-    return dict(row._mapping)
+    return ORJSONResponse(dict(row))
 
-@router.post("/{thread_id}/pause")
+@router.post("/{thread_id}/pause", response_model=ThreadStatusResponse)
 def pause_thread(thread_id: int, db = Depends(get_db)):
-    result = db.execute(Thread.__table__.select().where(Thread.id == thread_id))
+    result = db.execute(select(Thread.id).where(Thread.id == thread_id))
     row = result.fetchone()
     if not row:
         logger.warning("Thread not found for pause", thread_id=thread_id)
@@ -33,38 +49,31 @@ def pause_thread(thread_id: int, db = Depends(get_db)):
     db.execute(Thread.__table__.update().where(Thread.id == thread_id).values(status="paused"))
     db.commit()
     logger.info("Thread paused", thread_id=thread_id)
-    return {"ok": True, "status": "paused"}
+    return ORJSONResponse({"ok": True, "status": "paused"})
 
-@router.post("/{thread_id}/resume")
+@router.post("/{thread_id}/resume", response_model=ThreadStatusResponse)
 def resume_thread(thread_id: int, db = Depends(get_db)):
-    result = db.execute(Thread.__table__.select().where(Thread.id == thread_id))
+    result = db.execute(select(Thread.id).where(Thread.id == thread_id))
     row = result.fetchone()
     if not row:
         logger.warning("Thread not found for resume", thread_id=thread_id)
         raise HTTPException(status_code=404, detail="Thread not found")
-    db.execute(Thread.__table__.update().where(Thread.id == thread_id).values(status="active"))
+    db.execute(
+        Thread.__table__.update().where(Thread.id == thread_id).values(
+            status="active",
+            # persisted so a notify listener that was away still finds the resume on catch-up
+            resume_requested_at=case((Thread.agent == "data_agent", func.now()), else_=None),
+        )
+    )
     db.commit()
     logger.info("Thread resumed", thread_id=thread_id)
-    return {"ok": True, "status": "active"}
+    return ORJSONResponse({"ok": True, "status": "active"})
 
-@router.get("/{thread_id}/messages", response_model=List[dict])
+@router.get("/{thread_id}/messages", response_model=List[MessageResponse])
 def get_thread_messages(thread_id: int, db = Depends(get_db)):
-    messages = db.execute(
-        select(Message).where(Message.thread_id == thread_id).order_by(Message.created_at.asc())
-    ).scalars().all()
-    return [
-        {
-            "id": m.id,
-            "content": m.content,
-            "role": m.role,
-            "model": m.model,
-            "created_at": m.created_at,
-            "tool_call_id": None  # Extend if tool calls are tracked
-        }
-        for m in messages
-    ]
+    return ORJSONResponse(thread_message_dicts(db, thread_id))
 
-@router.post("/{thread_id}/messages", response_model=List[dict])
+@router.post("/{thread_id}/messages", response_model=List[MessageResponse])
 def post_thread_message(thread_id: int, db = Depends(get_db), body: dict = Body(...)):
     content = body.get("content")
     if not content:
@@ -79,17 +88,79 @@ def post_thread_message(thread_id: int, db = Depends(get_db), body: dict = Body(
     db.add(msg)
     db.commit()
     # Return updated list
-    messages = db.execute(
-        select(Message).where(Message.thread_id == thread_id).order_by(Message.created_at.asc())
-    ).scalars().all()
-    return [
-        {
-            "id": m.id,
-            "content": m.content,
-            "role": m.role,
-            "model": m.model,
-            "created_at": m.created_at,
-            "tool_call_id": None
-        }
-        for m in messages
-    ] 
\ No newline at end of file
+    return ORJSONResponse(thread_message_dicts(db, thread_id))
+
+def _attachment_rows(db, thread_id: int, content_hash: str = None) -> list:
+    query = (
+        select(*ATTACHMENT_COLUMNS)
+        .join(Upload, Upload.content_hash == ThreadAttachment.content_hash)
+        .where(ThreadAttachment.thread_id == thread_id)
+        .order_by(ThreadAttachment.id)
+    )
+    if content_hash is not None:
+        query = query.where(ThreadAttachment.content_hash == content_hash)
+    return [dict(row) for row in db.execute(query).mappings()]
+
+def _thread_exists(db, thread_id: int) -> bool:
+    return db.execute(select(Thread.id).where(Thread.id == thread_id)).first() is not None
+
+def _attach(db, thread_id: int, filename: Optional[str], stored: dict):
+    """Record the upload (once per content hash) and attach it to the thread; returns (row, new upload)."""
+    is_pdf = stored["content_type"] == "application/pdf"
+    created = db.execute(
+        insert(Upload)
+        .values(
+            content_hash=stored["content_hash"],
+            size=stored["size"],
+            content_type=stored["content_type"],
+            extraction_status="pending" if is_pdf else "skipped",
+        )
+        .on_conflict_do_nothing(index_elements=["content_hash"])
+        .returning(Upload.content_hash)
+    ).first() is not None
+    statement = insert(ThreadAttachment).values(thread_id=thread_id, content_hash=stored["content_hash"], filename=filename)
+    db.execute(statement.on_conflict_do_update(
+        constraint="uq_thread_attachments_thread_hash",
+        set_={"filename": func.coalesce(statement.excluded.filename, ThreadAttachment.filename)},
+    ))
+    db.commit()
+    return _attachment_rows(db, thread_id, stored["content_hash"])[0], created
+
+@router.post("/{thread_id}/attachments", response_model=UploadResponse, status_code=status.HTTP_201_CREATED)
+async def upload_attachment(
+    thread_id: int,
+    request: Request,
+    filename: Optional[str] = Query(None, max_length=255),
+    db = Depends(get_db),
+):
+    """
+    Attach an image or PDF to a thread. The request body is the raw file (not
+    multipart); it is streamed to storage/uploads while being hashed, so memory
+    stays flat whatever the size. Identical files are stored once, and PDF text
+    and thumbnails are extracted by the uploads worker, once per content hash.
+    """
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.UPLOAD_MAX_BYTES} bytes")
+    if not await run_in_threadpool(_thread_exists, db, thread_id):
+        logger.warning("Thread not found for upload", thread_id=thread_id)
+        raise HTTPException(status_code=404, detail="Thread not found")
+    try:
+        stored = await store_stream(request.stream())
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedUpload as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    row, created = await run_in_threadpool(_attach, db, thread_id, filename, stored)
+    if row["extraction_status"] in ("pending", "failed"):  # re-attaching retries an extraction that never finished
+        from backend.app.worker.uploads import extract_upload_task
+        extract_upload_task.delay(stored["content_hash"])
+    logger.info(
+        "Attachment uploaded", thread_id=thread_id, content_hash=stored["content_hash"],
+        size=stored["size"], content_type=stored["content_type"], duplicate=not created,
+    )
+    return ORJSONResponse({**row, "duplicate": not created}, status_code=status.HTTP_201_CREATED)
+
+@router.get("/{thread_id}/attachments", response_model=List[AttachmentResponse])
+def list_attachments(thread_id: int, db = Depends(get_db)):
+    return ORJSONResponse(_attachment_rows(db, thread_id))
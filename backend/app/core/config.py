@@ -6,5 +6,73 @@ class Settings:
     OPENROUTER_BASE_URL: str = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
     OPENROUTER_DEFAULT_MODEL: str = os.getenv("OPENROUTER_DEFAULT_MODEL", "anthropic/claude-3-haiku")
     OPENROUTER_DEFAULT_TEMPERATURE: float = float(os.getenv("OPENROUTER_DEFAULT_TEMPERATURE", "0.7"))
+    # Monthly partitions of raw_notes/messages; retention of 0 keeps everything
+    PARTITION_PREMAKE_MONTHS: int = int(os.getenv("PARTITION_PREMAKE_MONTHS", "3"))
+    RAW_NOTES_RETENTION_MONTHS: int = int(os.getenv("RAW_NOTES_RETENTION_MONTHS", "0"))
+    MESSAGES_RETENTION_MONTHS: int = int(os.getenv("MESSAGES_RETENTION_MONTHS", "0"))
+    # Cold storage of finished threads' messages (backend/app/db/archive.py)
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "7"))
+    ARCHIVE_ZSTD_LEVEL: int = int(os.getenv("ARCHIVE_ZSTD_LEVEL", "10"))
+    ARCHIVE_DICT_SIZE: int = int(os.getenv("ARCHIVE_DICT_SIZE", "16384"))
+    ARCHIVE_CACHE_SIZE: int = int(os.getenv("ARCHIVE_CACHE_SIZE", "64"))
+    # Nightly Curator/Planner (backend/app/agents/scheduled.py)
+    SCHEDULED_AGENT_BATCH_SIZE: int = int(os.getenv("SCHEDULED_AGENT_BATCH_SIZE", "200"))
+    SCHEDULED_AGENT_MAX_BATCHES: int = int(os.getenv("SCHEDULED_AGENT_MAX_BATCHES", "10"))
+    SCHEDULED_AGENT_LAG_SECONDS: int = int(os.getenv("SCHEDULED_AGENT_LAG_SECONDS", "60"))
+    SCHEDULED_AGENT_STALLED_HOURS: int = int(os.getenv("SCHEDULED_AGENT_STALLED_HOURS", "48"))
+    SCHEDULED_AGENT_CLAIM_TIMEOUT_MINUTES: int = int(os.getenv("SCHEDULED_AGENT_CLAIM_TIMEOUT_MINUTES", "60"))
+    # Enables /api/v1/admin (profiling, allocation tracking); send as X-Admin-Token
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    # Slack listener leader election (backend/app/core/leader.py)
+    LEADER_HEARTBEAT_SECONDS: float = float(os.getenv("LEADER_HEARTBEAT_SECONDS", "5"))
+    # false when Slack is ingested by the standalone worker (backend/app/integrations/slack_worker.py)
+    SLACK_LISTENER_IN_API: bool = os.getenv("SLACK_LISTENER_IN_API", "true").lower() == "true"
+    INGEST_CONCURRENCY: int = int(os.getenv("INGEST_CONCURRENCY", "8"))
+    INGEST_DRAIN_SECONDS: float = float(os.getenv("INGEST_DRAIN_SECONDS", "30"))
+    INGEST_REPORT_SECONDS: float = float(os.getenv("INGEST_REPORT_SECONDS", "60"))
+    # Burst coalescing of Data Agent runs (backend/app/agents/debounce.py)
+    DEBOUNCE_ENABLED: bool = os.getenv("DEBOUNCE_ENABLED", "true").lower() == "true"
+    DEBOUNCE_QUIET_SECONDS: float = float(os.getenv("DEBOUNCE_QUIET_SECONDS", "20"))
+    DEBOUNCE_MAX_WAIT_SECONDS: float = float(os.getenv("DEBOUNCE_MAX_WAIT_SECONDS", "120"))
+    DEBOUNCE_MAX_BATCH: int = int(os.getenv("DEBOUNCE_MAX_BATCH", "100"))
+    # What starts Data Agent runs: "ingest" (the Slack listener debounces what it writes) or
+    # "notify" (backend/app/worker/notify_listener.py reacts to raw_notes inserts from any source)
+    AGENT_TRIGGER: str = os.getenv("AGENT_TRIGGER", "ingest")
+    # Connection pool and statement limits (backend/app/db/session.py); 0 disables the timeout
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    # Slow-query capture (backend/app/db/instrumentation.py)
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "500"))
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS: float = float(os.getenv("SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS", "300"))
+    # Batched note-to-task extraction (backend/app/agents/task_extractor.py)
+    TASK_EXTRACTION_BATCH_NOTES: int = int(os.getenv("TASK_EXTRACTION_BATCH_NOTES", "50"))
+    TASK_EXTRACTION_BATCH_CHARS: int = int(os.getenv("TASK_EXTRACTION_BATCH_CHARS", "24000"))
+    TASK_EXTRACTION_MAX_BATCHES: int = int(os.getenv("TASK_EXTRACTION_MAX_BATCHES", "20"))
+    # Local relevance pre-filter ahead of Data Agent runs (backend/app/agents/relevance.py)
+    RELEVANCE_FILTER_ENABLED: bool = os.getenv("RELEVANCE_FILTER_ENABLED", "true").lower() == "true"
+    RELEVANCE_MIN_CHARS: int = int(os.getenv("RELEVANCE_MIN_CHARS", "12"))
+    RELEVANCE_CHANNEL_ALLOWLIST: str = os.getenv("RELEVANCE_CHANNEL_ALLOWLIST", "")  # comma-separated Slack channel ids; empty allows all
+    RELEVANCE_THRESHOLD: float = float(os.getenv("RELEVANCE_THRESHOLD", "0.15"))
+    RELEVANCE_MODEL_PATH: str = os.getenv("RELEVANCE_MODEL_PATH", "storage/relevance_model.json")
+    RELEVANCE_MIN_TRAINING_NOTES: int = int(os.getenv("RELEVANCE_MIN_TRAINING_NOTES", "200"))
+    # Content-addressed thread attachments (backend/app/core/uploads.py)
+    UPLOADS_DIR: str = os.getenv("UPLOADS_DIR", "storage/uploads")
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+    UPLOAD_EXTRACT_MAX_PAGES: int = int(os.getenv("UPLOAD_EXTRACT_MAX_PAGES", "50"))
+    UPLOAD_THUMBNAIL_WIDTH: int = int(os.getenv("UPLOAD_THUMBNAIL_WIDTH", "320"))
+    UPLOAD_EXTRACT_CLAIM_TIMEOUT_MINUTES: int = int(os.getenv("UPLOAD_EXTRACT_CLAIM_TIMEOUT_MINUTES", "30"))
+    # Backups (scripts/backup.py); an empty BACKUP_VERIFY_DATABASE_URL creates a scratch database per check
+    BACKUP_DIR: str = os.getenv("BACKUP_DIR", "storage/backups")
+    BACKUP_JOBS: int = int(os.getenv("BACKUP_JOBS", str(min(4, os.cpu_count() or 1))))
+    BACKUP_ZSTD_LEVEL: int = int(os.getenv("BACKUP_ZSTD_LEVEL", "3"))
+    BACKUP_KEEP_DUMPS: int = int(os.getenv("BACKUP_KEEP_DUMPS", "7"))
+    BACKUP_KEEP_BASE: int = int(os.getenv("BACKUP_KEEP_BASE", "2"))
+    BACKUP_VERIFY_DATABASE_URL: str = os.getenv("BACKUP_VERIFY_DATABASE_URL", "")
 
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
\ No newline at end of file
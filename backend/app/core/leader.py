@@ -0,0 +1,225 @@
+"""
+Leader election over a Postgres advisory lock.
+
+Every API process runs a `LeaderElection`; the one holding the session-level
+advisory lock is the leader and runs the singleton duties (the Slack Socket
+Mode listener), the rest only serve HTTP. The lock lives on a dedicated
+autocommit connection:
+
+  - followers retry `pg_try_advisory_lock` every LEADER_HEARTBEAT_SECONDS
+  - the leader pings its lock connection on the same interval; if the ping
+    fails the session (and with it the lock) is gone, so it stops its duties
+    and goes back to following
+  - Postgres drops the lock as soon as the leader's session ends (crash, kill,
+    TCP keepalive timeout), which is what lets a follower take over
+
+The lock connection's application_name carries the holder's identity, so any
+process can see who leads from pg_locks/pg_stat_activity (`current_leader`).
+Followers look the holder up on their lock connection with every heartbeat and
+cache it, so `status()` (and /health) reports the leader without a query.
+"""
+import hashlib
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+
+LOCK_NAMESPACE = 0x7A5C  # first key of the two-int advisory lock; second is derived from the role name
+APPLICATION_PREFIX = "tasuke-leader"
+
+
+def lock_key(name: str) -> int:
+    """Stable positive int4 for `name` (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=4).digest(), "big") & 0x7FFFFFFF
+
+
+def process_identity() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def current_leader(db, name: str):
+    """Who holds the `name` lock right now, from any connection; None if nobody does."""
+    row = db.execute(
+        text(
+            "SELECT a.application_name, a.pid, a.client_addr, a.backend_start, a.state_change "
+            "FROM pg_locks l JOIN pg_stat_activity a ON a.pid = l.pid "
+            "WHERE l.locktype = 'advisory' AND l.granted "
+            "AND l.classid = :namespace AND l.objid = :key AND l.objsubid = 2"
+        ),
+        {"namespace": LOCK_NAMESPACE, "key": lock_key(name)},
+    ).mappings().first()
+    if row is None:
+        return None
+    identity = row["application_name"].split(" ", 1)[-1] if row["application_name"] else None
+    return {
+        "identity": identity,
+        "backend_pid": row["pid"],
+        "client_addr": str(row["client_addr"]) if row["client_addr"] else None,
+        "since": row["backend_start"],
+        "last_heartbeat": row["state_change"],
+    }
+
+
+class LeaderElection:
+    """
+    Run `on_elected` in exactly one process and `on_demoted` when that process loses the lock.
+    Callbacks run on the election thread and must not block.
+    """
+
+    def __init__(self, name: str, on_elected, on_demoted, heartbeat: float = None, database_url: str = None):
+        self.name = name
+        self.key = lock_key(name)
+        self.identity = process_identity()
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.heartbeat = heartbeat or settings.LEADER_HEARTBEAT_SECONDS
+        self.database_url = database_url or os.getenv("DATABASE_URL")
+        self.is_leader = False
+        self.leader_since = None
+        self.last_heartbeat = None
+        self.leader = None  # holder seen on the last heartbeat
+        self.leader_observed_at = None
+        self._engine = None
+        self._connection = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -- lock connection -------------------------------------------------------
+
+    def _connect(self):
+        if self._engine is None:
+            timeout_ms = int(self.heartbeat * 1000)
+            self._engine = create_engine(
+                self.database_url,
+                poolclass=NullPool,
+                isolation_level="AUTOCOMMIT",
+                connect_args={
+                    "application_name": f"{APPLICATION_PREFIX} {self.identity}"[:63],
+                    "connect_timeout": max(int(self.heartbeat), 1),
+                    "options": f"-c statement_timeout={timeout_ms}",
+                    # detect a dead leader host within a few heartbeats
+                    "keepalives": 1,
+                    "keepalives_idle": max(int(self.heartbeat), 1),
+                    "keepalives_interval": max(int(self.heartbeat), 1),
+                    "keepalives_count": 3,
+                },
+            )
+        if self._connection is None:
+            self._connection = self._engine.connect()
+        return self._connection
+
+    def _disconnect(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def _try_acquire(self) -> bool:
+        return bool(self._connect().execute(
+            text("SELECT pg_try_advisory_lock(:namespace, :key)"),
+            {"namespace": LOCK_NAMESPACE, "key": self.key},
+        ).scalar())
+
+    def _ping(self):
+        self._connection.execute(text("SELECT 1"))
+
+    def _current_leader(self):
+        return current_leader(self._connection, self.name)
+
+    def _observe_leader(self):
+        if self.is_leader:
+            self.leader = {"identity": self.identity, "since": self.leader_since}
+        else:
+            try:
+                self.leader = self._current_leader()
+            except Exception as e:
+                logger.warning("Leader lookup failed", role=self.name, error=str(e))
+                return
+        self.leader_observed_at = datetime.utcnow()
+
+    def _release(self):
+        if self._connection is not None:
+            self._connection.execute(
+                text("SELECT pg_advisory_unlock(:namespace, :key)"),
+                {"namespace": LOCK_NAMESPACE, "key": self.key},
+            )
+
+    # -- state machine -----------------------------------------------------------
+
+    def _promote(self):
+        self.is_leader = True
+        self.leader_since = datetime.utcnow()
+        logger.info("Elected leader", role=self.name, identity=self.identity)
+        try:
+            self.on_elected()
+        except Exception as e:
+            logger.error("Leader duties failed to start; stepping down", role=self.name, error=str(e))
+            self._demote(release=True)
+
+    def _demote(self, release: bool):
+        was_leader = self.is_leader
+        self.is_leader = False
+        self.leader_since = None
+        if was_leader:
+            logger.warning("Leadership lost", role=self.name, identity=self.identity)
+            try:
+                self.on_demoted()
+            except Exception as e:
+                logger.error("Leader duties failed to stop", role=self.name, error=str(e))
+        if release:
+            try:
+                self._release()
+            except Exception:
+                pass
+        self._disconnect()  # closing the session drops the lock no matter what
+
+    def step(self):
+        """One election/heartbeat round; the loop calls this every `heartbeat` seconds."""
+        try:
+            if self.is_leader:
+                self._ping()
+            elif self._try_acquire():
+                self._promote()
+            self.last_heartbeat = datetime.utcnow()
+            self._observe_leader()
+        except Exception as e:
+            logger.warning("Leader election round failed", role=self.name, error=str(e), was_leader=self.is_leader)
+            self._demote(release=False)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.step()
+            self._stop.wait(max(self.heartbeat - (time.monotonic() - started), 0))
+        self._demote(release=True)
+        if self._engine is not None:
+            self._engine.dispose()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"leader-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """Step down (so a follower can take over immediately) and stop the election thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout or self.heartbeat * 2)
+
+    def status(self) -> dict:
+        return {
+            "role": self.name,
+            "identity": self.identity,
+            "is_leader": self.is_leader,
+            "leader_since": self.leader_since,
+            "last_heartbeat": self.last_heartbeat,
+            "leader": self.leader,
+            "leader_observed_at": self.leader_observed_at,
+        }
@@ -0,0 +1,304 @@
+"""
+Indexed search and live tail over the loguru files in `logs/`.
+
+Each log file (active or rotated) gets a sidecar index in `logs/.index/`:
+  - buckets:    [bucket_start_ts, byte_offset] for every BUCKET_SECONDS window
+  - lines:      byte offset of every entry
+  - levels:     level name -> sorted entry offsets
+  - components: component -> sorted entry offsets
+Queries narrow the byte range with the time buckets, intersect the postings for
+level/component filters and only then read the candidate lines through mmap, so
+a search never scans a whole file. Rotated files are indexed once; the active
+file's index is extended in memory from where it stopped and written back by
+the nightly index_logs_task. Only the INDEX_CACHE_FILES most recently used
+indexes stay in memory; an evicted one is reloaded from its sidecar (and the
+active file re-extended from there) on the next query.
+
+tasuke.log is loguru JSON (serialize=True); openrouter.log, slack_sync.log and
+data_agent_failed.log use loguru's default text format. Both are understood.
+"""
+import asyncio
+import bisect
+import mmap
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+import orjson
+from backend.app.core.logging import LOGS_DIR
+
+LOG_SOURCES = ("tasuke", "openrouter", "slack_sync", "data_agent_failed")
+BUCKET_SECONDS = 300
+INDEX_VERSION = 1
+INDEX_CACHE_FILES = 8  # a few sources' active file plus the rotated ones being searched
+INDEX_DIR = Path(LOGS_DIR) / ".index"
+
+# 2025-06-01 12:00:00.123 | INFO     | backend.app.core.openrouter:chat_completion:43 - OpenRouter call
+_TEXT_LINE = re.compile(rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+) \| (\w+)\s*\| ([^:\s]+):[^ ]* - (.*)$")
+
+_index_cache = OrderedDict()  # file name -> index, least recently used first
+_index_lock = Lock()
+
+
+def parse_line(line: bytes):
+    """
+    Parse one log line into {"time", "level", "component", "message", "extra"}.
+    Returns None for lines that aren't log entries (e.g. traceback continuation lines).
+    """
+    line = line.rstrip(b"\r\n")
+    if not line:
+        return None
+    if line[:1] == b"{":
+        try:
+            record = orjson.loads(line)["record"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            return None
+        extra = record.get("extra") or {}
+        return {
+            "time": record["time"]["timestamp"],
+            "level": record["level"]["name"],
+            "component": extra.get("component") or record.get("name") or "",
+            "message": record.get("message", ""),
+            "extra": extra,
+        }
+    match = _TEXT_LINE.match(line)
+    if not match:
+        return None
+    return {
+        "time": datetime.strptime(match.group(1).decode(), "%Y-%m-%d %H:%M:%S.%f").timestamp(),
+        "level": match.group(2).decode(),
+        "component": match.group(3).decode(),
+        "message": match.group(4).decode(errors="replace"),
+        "extra": {},
+    }
+
+
+def log_files(source: str) -> list:
+    """Active and rotated files of a source, oldest first."""
+    if source not in LOG_SOURCES:
+        raise ValueError(f"Unknown log source: {source}")
+    files = [p for p in Path(LOGS_DIR).glob(f"{source}*.log") if p.is_file()]
+    # rotated names are "<source>.<date>_<time>_<us>.log"; don't let tasuke match tasuke_x
+    files = [p for p in files if p.name == f"{source}.log" or p.name.startswith(f"{source}.")]
+    return sorted(files, key=lambda p: p.stat().st_mtime)
+
+
+def index_path(path: Path) -> Path:
+    return INDEX_DIR / f"{path.name}.idx"
+
+
+def _empty_index(stat) -> dict:
+    return {
+        "version": INDEX_VERSION,
+        "inode": stat.st_ino,
+        "size": 0,
+        "first_ts": None,
+        "last_ts": None,
+        "buckets": [],
+        "lines": [],
+        "levels": {},
+        "components": {},
+    }
+
+
+def _extend_index(path: Path, index: dict, size: int) -> dict:
+    """Index complete lines from index["size"] up to `size`."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        position = index["size"]
+        while position < size:
+            end = mm.find(b"\n", position, size)
+            if end == -1:
+                break  # partial last line; picked up next time
+            entry = parse_line(mm[position:end])
+            if entry is not None:
+                ts = entry["time"]
+                bucket = int(ts // BUCKET_SECONDS) * BUCKET_SECONDS
+                if not index["buckets"] or index["buckets"][-1][0] < bucket:
+                    index["buckets"].append([bucket, position])
+                if index["first_ts"] is None:
+                    index["first_ts"] = ts
+                index["last_ts"] = ts
+                index["lines"].append(position)
+                index["levels"].setdefault(entry["level"], []).append(position)
+                index["components"].setdefault(entry["component"], []).append(position)
+            position = end + 1
+        index["size"] = position
+    return index
+
+
+def _write_index(path: Path, index: dict):
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = index_path(path).with_suffix(".tmp")
+    tmp.write_bytes(orjson.dumps(index))
+    os.replace(tmp, index_path(path))
+
+
+def get_index(path: Path, persist: bool = False) -> dict:
+    """
+    Load, validate and incrementally extend the sidecar index for `path`.
+    Growth of the active file stays in memory; its sidecar is rewritten only with
+    `persist` (the nightly index_logs_task), so a busy log doesn't cost a full
+    index rewrite per query. Rotated files no longer change and are saved once.
+    """
+    stat = path.stat()
+    with _index_lock:
+        index = _index_cache.get(path.name)
+        if index is None and index_path(path).exists():
+            try:
+                index = orjson.loads(index_path(path).read_bytes())
+            except orjson.JSONDecodeError:
+                index = None
+        if index is None or index.get("version") != INDEX_VERSION or index["inode"] != stat.st_ino or index["size"] > stat.st_size:
+            index = _empty_index(stat)
+        if index["size"] < stat.st_size:
+            index = _extend_index(path, index, stat.st_size)
+            index["dirty"] = True
+        rotated = path.name.split(".", 1)[1] != "log"
+        if index.get("dirty") and (persist or rotated):
+            del index["dirty"]
+            _write_index(path, index)
+        _index_cache[path.name] = index
+        _index_cache.move_to_end(path.name)
+        while len(_index_cache) > INDEX_CACHE_FILES:
+            _index_cache.popitem(last=False)
+        return index
+
+
+def build_indexes() -> dict:
+    """Index every log file and drop sidecars whose log was removed by retention."""
+    indexed = 0
+    live = set()
+    for source in LOG_SOURCES:
+        for path in log_files(source):
+            get_index(path, persist=True)
+            live.add(index_path(path).name)
+            indexed += 1
+    removed = 0
+    if INDEX_DIR.exists():
+        for idx in INDEX_DIR.glob("*.idx"):
+            if idx.name not in live:
+                idx.unlink()
+                with _index_lock:
+                    _index_cache.pop(idx.name[:-len(".idx")], None)
+                removed += 1
+    return {"ok": True, "indexed": indexed, "removed": removed}
+
+
+def _candidate_offsets(index: dict, levels, component, start_ts, end_ts) -> list:
+    lo, hi = 0, index["size"]
+    buckets = index["buckets"]
+    bucket_starts = [b[0] for b in buckets]
+    if start_ts is not None and buckets:
+        i = bisect.bisect_right(bucket_starts, start_ts) - 1
+        lo = buckets[i][1] if i >= 0 else 0
+    if end_ts is not None and buckets:
+        i = bisect.bisect_right(bucket_starts, end_ts)
+        hi = buckets[i][1] if i < len(buckets) else index["size"]
+
+    def window(offsets):
+        return offsets[bisect.bisect_left(offsets, lo):bisect.bisect_left(offsets, hi)]
+
+    candidates = None
+    if levels:
+        merged = sorted(o for level in levels for o in window(index["levels"].get(level, [])))
+        candidates = merged
+    if component:
+        matched = sorted(
+            o for name, offsets in index["components"].items()
+            if name == component or name.startswith(component + ".")
+            for o in window(offsets)
+        )
+        candidates = matched if candidates is None else sorted(set(candidates).intersection(matched))
+    return window(index["lines"]) if candidates is None else candidates
+
+
+def _to_ts(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+def search_logs(source: str = "tasuke", levels=None, component=None, start=None, end=None, query=None, limit: int = 200) -> list:
+    """
+    Newest-first log entries of `source` matching every given filter.
+    levels: list of level names; component: module prefix (e.g. "backend.app.agents");
+    start/end: datetime or ISO string; query: case-insensitive substring of the raw line.
+    """
+    start_ts, end_ts = _to_ts(start), _to_ts(end)
+    needle = query.lower().encode() if query else None
+    levels = [level.upper() for level in levels] if levels else None
+    results = []
+    for path in reversed(log_files(source)):
+        index = get_index(path)
+        if index["first_ts"] is None:
+            continue
+        if start_ts is not None and index["last_ts"] < start_ts:
+            break  # older files can only be older still
+        if end_ts is not None and index["first_ts"] > end_ts:
+            continue
+        offsets = _candidate_offsets(index, levels, component, start_ts, end_ts)
+        if not offsets:
+            continue
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in reversed(offsets):
+                end_of_line = mm.find(b"\n", offset)
+                raw = mm[offset:end_of_line if end_of_line != -1 else len(mm)]
+                if needle is not None and needle not in raw.lower():
+                    continue
+                entry = parse_line(raw)
+                if entry is None:
+                    continue
+                if (start_ts is not None and entry["time"] < start_ts) or (end_ts is not None and entry["time"] > end_ts):
+                    continue
+                entry.update(source=source, file=path.name, offset=offset, time=datetime.fromtimestamp(entry["time"]))
+                results.append(entry)
+                if len(results) >= limit:
+                    return results
+    return results
+
+
+def _matches(entry, levels, component) -> bool:
+    if levels and entry["level"] not in levels:
+        return False
+    if component and not (entry["component"] == component or entry["component"].startswith(component + ".")):
+        return False
+    return True
+
+
+async def tail_log(source: str = "tasuke", levels=None, component=None, poll_interval: float = 0.5):
+    """
+    Follow the active file of `source` and yield new matching entries as they are written.
+    Handles loguru's midnight rotation by reopening when the inode changes or the file shrinks.
+    """
+    if source not in LOG_SOURCES:
+        raise ValueError(f"Unknown log source: {source}")
+    levels = [level.upper() for level in levels] if levels else None
+    path = Path(LOGS_DIR) / f"{source}.log"
+    inode, position, pending = None, 0, b""
+    if path.exists():
+        stat = path.stat()
+        inode, position = stat.st_ino, stat.st_size
+    while True:
+        if not path.exists():
+            await asyncio.sleep(poll_interval)
+            continue
+        stat = path.stat()
+        if stat.st_ino != inode or stat.st_size < position:
+            inode, position, pending = stat.st_ino, 0, b""
+        if stat.st_size == position:
+            await asyncio.sleep(poll_interval)
+            continue
+        with open(path, "rb") as f:
+            f.seek(position)
+            chunk = f.read(stat.st_size - position)
+        position += len(chunk)
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            entry = parse_line(line)
+            if entry is not None and _matches(entry, levels, component):
+                entry.update(source=source, time=datetime.fromtimestamp(entry["time"]))
+                yield entry
@@ -1,12 +1,13 @@
 import os
 from loguru import logger
 from dotenv import load_dotenv
+from backend.app.core.tracing import current_trace_id
 
 load_dotenv()
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOGURU_JSON = os.getenv("LOGURU_JSON", "true").lower() == "true"
-LOGS_DIR = "logs"
+LOGS_DIR = os.getenv("LOGS_DIR", "logs")
 
 os.makedirs(LOGS_DIR, exist_ok=True)
 
@@ -18,4 +19,11 @@ logger.add(
     level=LOG_LEVEL,
     serialize=LOGURU_JSON,
     enqueue=True
-) 
\ No newline at end of file
+) 
+
+def _add_trace_id(record):
+    record["extra"].setdefault("trace_id", current_trace_id())
+
+
+# Every log line carries the active trace id so logs and spans can be joined
+logger.configure(patcher=_add_trace_id)
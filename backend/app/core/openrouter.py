@@ -1,13 +1,15 @@
-import openai
 from typing import List, Dict, Any, AsyncIterator
 import os
-from backend.app.core.logging import logger
+from backend.app.core.logging import LOGS_DIR, logger
 from backend.app.core.config import settings
+from backend.app.core.tracing import span
 from loguru import logger as openrouter_logger
 
 class OpenRouterClient:
     """OpenRouter client for LLM interactions."""
     def __init__(self):
+        import openai  # ~0.3s to import; only processes that call an LLM pay for it
+
         self.client = openai.AsyncOpenAI(
             base_url=settings.OPENROUTER_BASE_URL,
             api_key=os.getenv("OPENROUTER_API_KEY"),
@@ -16,7 +18,7 @@ class OpenRouterClient:
             "HTTP-Referer": "https://tasuke.local",
             "X-Title": "Tasuke AI Agent Platform"
         }
-        openrouter_logger.add("logs/openrouter.log", rotation="00:00", retention="90 days", level="INFO", serialize=False)
+        openrouter_logger.add(f"{LOGS_DIR}/openrouter.log", rotation="00:00", retention="90 days", level="INFO", serialize=False)
 
     async def chat_completion(
         self,
@@ -41,7 +43,11 @@ class OpenRouterClient:
                 params["tools"] = tools
                 params["tool_choice"] = "auto"
             openrouter_logger.info("OpenRouter call", model=params["model"], message_count=len(messages), tools=tools)
-            response = await self.client.chat.completions.create(**params)
+            with span("openrouter.chat_completion", model=params["model"], message_count=len(messages)) as call:
+                response = await self.client.chat.completions.create(**params)
+                usage = getattr(response, "usage", None)
+                if usage is not None:
+                    call.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
             openrouter_logger.info("OpenRouter response", model=params["model"], response=str(response))
             return response
         except Exception as e:
@@ -49,4 +55,19 @@ class OpenRouterClient:
             logger.error("OpenRouter API error", error=str(e), model=model)
             raise
 
-openrouter_client = OpenRouterClient() 
\ No newline at end of file
+_client = None
+
+
+def get_openrouter_client() -> OpenRouterClient:
+    """Process-wide client, created on first use (also usable as a FastAPI dependency)."""
+    global _client
+    if _client is None:
+        _client = OpenRouterClient()
+    return _client
+
+
+async def close_openrouter_client():
+    global _client
+    if _client is not None:
+        await _client.client.close()
+    _client = None
@@ -0,0 +1,123 @@
+"""
+On-demand CPU sampling and allocation tracking for a running process.
+
+Nothing runs until asked: the sampler is a thread that only exists for the
+requested window and reads every other thread's stack from
+`sys._current_frames()` at a fixed interval, and `tracemalloc` is only started
+by `start_allocation_tracking`. Profiles come back in the collapsed-stack
+format (`thread;outer;inner count` per line) that flamegraph.pl, speedscope
+and inferno read directly.
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+MAX_PROFILE_SECONDS = 60
+
+_profile_lock = threading.Lock()
+_baseline = None
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # keep paths short and stable across machines
+    for root in sys.path:
+        if root and filename.startswith(root + os.sep):
+            filename = filename[len(root) + 1:]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds: float, interval: float) -> Counter:
+    """Sample every thread except the caller for `seconds`; returns collapsed stack -> samples."""
+    me = threading.get_ident()
+    names = {}
+    stacks = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if thread_id not in names:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            labels.append(f"thread:{names.get(thread_id, thread_id)}")
+            stacks[";".join(reversed(labels))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def collapse(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def profile(seconds: float = 10, interval: float = 0.005) -> dict:
+    """
+    Time-boxed sampling profile of this process. One profile at a time.
+    Returns: {"seconds", "interval", "samples", "collapsed"}
+    """
+    seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+    interval = max(interval, 0.001)
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        stacks = sample_stacks(seconds, interval)
+    finally:
+        _profile_lock.release()
+    return {"seconds": seconds, "interval": interval, "samples": sum(stacks.values()), "collapsed": collapse(stacks)}
+
+
+def start_allocation_tracking(frames: int = 25) -> dict:
+    """Start tracemalloc (if needed) and take the baseline that `allocation_diff` compares against."""
+    global _baseline
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    _baseline = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    return {"tracing": True, "frames": tracemalloc.get_traceback_limit(), "traced_bytes": current, "peak_bytes": peak}
+
+
+def allocation_diff(limit: int = 25, key_type: str = "lineno") -> dict:
+    """Top allocation growth since the baseline, grouped by `lineno`, `filename` or `traceback`."""
+    if _baseline is None or not tracemalloc.is_tracing():
+        raise RuntimeError("Allocation tracking is not running")
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    stats = snapshot.compare_to(_baseline, key_type)[:limit]
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "traced_bytes": current,
+        "peak_bytes": peak,
+        "top": [
+            {
+                "location": str(stat.traceback[0]) if stat.traceback else "",
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+                "traceback": stat.traceback.format() if key_type == "traceback" else None,
+            }
+            for stat in stats
+        ],
+    }
+
+
+def stop_allocation_tracking() -> dict:
+    global _baseline
+    was_tracing = tracemalloc.is_tracing()
+    tracemalloc.stop()
+    _baseline = None
+    return {"tracing": False, "was_tracing": was_tracing}
@@ -0,0 +1,304 @@
+"""
+Lightweight span tracing with a context-propagated trace id.
+
+    with span("tool.write_raw_notes", channel=channel):
+        ...
+
+    @traced("openrouter.chat_completion")
+    async def chat_completion(...): ...
+
+The current span lives in a contextvar, so nested spans (including across
+`await`) get the right parent without passing anything around. Finished spans
+are queued and written by a background thread to TRACING_FILE (JSONL) or POSTed
+as OTLP/HTTP JSON to TRACING_OTLP_ENDPOINT; export is off unless
+TRACING_EXPORTER is set. TRACING_SAMPLE_RATE keeps a share of whole traces: the
+decision is read off the trace id, so every process on a trace agrees without
+passing a flag. Celery tasks continue the publisher's trace through message
+headers; the HTTP middleware honours an incoming X-Trace-Id only if it is 32
+lowercase hex characters. scripts/trace_report.py turns the JSONL into
+per-stage latency breakdowns.
+"""
+import contextvars
+import functools
+import inspect
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+import orjson
+
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")  # jsonl | otlp | none
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+TRACING_FILE = os.getenv("TRACING_FILE", os.path.join(os.getenv("LOGS_DIR", "logs"), "traces.jsonl"))
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "tasuke")
+
+_TRACE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_current_span = contextvars.ContextVar("tasuke_current_span", default=None)
+_export_queue = queue.SimpleQueue()
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start", "end", "status", "error", "token")
+
+    def __init__(self, name: str, trace_id: str = None, parent_id: str = None, attributes: dict = None):
+        self.name = name
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.start = time.time()
+        self.end = None
+        self.status = "ok"
+        self.error = None
+        self.token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+    def as_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": SERVICE_NAME,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+def current_span():
+    return _current_span.get()
+
+
+def current_trace_id():
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def start_span(name: str, trace_id: str = None, parent_id: str = None, **attributes) -> Span:
+    """Start a span and make it current; pair with `finish_span`. Prefer the `span` context manager."""
+    parent = _current_span.get()
+    if parent is not None and trace_id is None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    new_span = Span(name, trace_id, parent_id, attributes)
+    new_span.token = _current_span.set(new_span)
+    return new_span
+
+
+def finish_span(finished: Span, error: BaseException = None):
+    finished.end = time.time()
+    token, finished.token = finished.token, None
+    if error is not None:
+        finished.status = "error"
+        finished.error = f"{type(error).__name__}: {error}"
+    if token is not None:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            _current_span.set(None)  # finished in a different context (e.g. Celery signals)
+    export(finished)
+
+
+@contextmanager
+def span(name: str, trace_id: str = None, parent_id: str = None, **attributes):
+    current = start_span(name, trace_id, parent_id, **attributes)
+    try:
+        yield current
+    except BaseException as e:
+        finish_span(current, e)
+        raise
+    else:
+        finish_span(current)
+
+
+def traced(name: str = None):
+    """Decorator form of `span` for sync and async functions."""
+    def decorator(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# -- export ------------------------------------------------------------------
+
+def valid_trace_id(trace_id) -> bool:
+    return isinstance(trace_id, str) and _TRACE_ID.match(trace_id) is not None
+
+
+def sampled(trace_id: str, rate: float = None) -> bool:
+    """Whether the trace is kept: the first 8 hex digits of the id, read as a fraction, fall below `rate`."""
+    rate = TRACING_SAMPLE_RATE if rate is None else rate
+    if rate >= 1:
+        return True
+    try:
+        return int(trace_id[:8], 16) < rate * 0x100000000
+    except ValueError:
+        return True
+
+
+def export(finished: Span):
+    if TRACING_EXPORTER == "none" or not sampled(finished.trace_id):
+        return
+    _ensure_exporter()
+    _export_queue.put(finished.as_dict())
+
+
+def _ensure_exporter():
+    global _exporter_started
+    if _exporter_started:
+        return
+    with _exporter_lock:
+        if not _exporter_started:
+            threading.Thread(target=_export_loop, name="tracing-exporter", daemon=True).start()
+            _exporter_started = True
+
+
+def _drain(first: dict, limit: int = 512) -> list:
+    batch = [first]
+    while len(batch) < limit:
+        try:
+            batch.append(_export_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _export_loop():
+    while True:
+        batch = _drain(_export_queue.get())
+        try:
+            if TRACING_EXPORTER == "otlp":
+                _export_otlp(batch)
+            else:
+                _export_jsonl(batch)
+        except Exception as e:  # tracing must never take the app down
+            from backend.app.core.logging import logger
+            logger.warning("Span export failed", error=str(e), spans=len(batch))
+
+
+def _export_jsonl(batch: list):
+    path = Path(TRACING_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(b"".join(orjson.dumps(s, default=str) + b"\n" for s in batch))
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(batch: list) -> dict:
+    """OTLP/HTTP JSON payload for a batch of span dicts."""
+    spans = [
+        {
+            "traceId": s["trace_id"],
+            "spanId": s["span_id"],
+            "parentSpanId": s["parent_id"] or "",
+            "name": s["name"],
+            "startTimeUnixNano": str(int(s["start"] * 1e9)),
+            "endTimeUnixNano": str(int((s["start"] + s["duration_ms"] / 1000) * 1e9)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s["attributes"].items()],
+            "status": {"code": 2, "message": s["error"]} if s["status"] == "error" else {"code": 1},
+        }
+        for s in batch
+    ]
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "tasuke.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+def _export_otlp(batch: list):
+    import httpx
+    httpx.post(TRACING_OTLP_ENDPOINT, content=orjson.dumps(to_otlp(batch), default=str), headers={"Content-Type": "application/json"}, timeout=5)
+
+
+# -- integrations --------------------------------------------------------------
+
+def install_celery_tracing(celery_app):
+    """Continue the publisher's trace in Celery tasks via message headers."""
+    from celery.signals import before_task_publish, task_prerun, task_postrun, task_failure
+
+    @before_task_publish.connect(weak=False)
+    def inject_trace(headers=None, **kwargs):
+        parent = current_span()
+        if parent is not None and headers is not None:
+            headers["trace_id"] = parent.trace_id
+            headers["parent_span_id"] = parent.span_id
+
+    @task_prerun.connect(weak=False)
+    def start_task_span(task_id=None, task=None, **kwargs):
+        request = task.request
+        task.request._trace_span = start_span(
+            f"celery.{task.name}",
+            trace_id=getattr(request, "trace_id", None),
+            parent_id=getattr(request, "parent_span_id", None),
+            task_id=task_id,
+        )
+
+    @task_failure.connect(weak=False)
+    def mark_task_failed(task_id=None, exception=None, sender=None, **kwargs):
+        task_span = getattr(sender.request, "_trace_span", None) if sender else None
+        if task_span is not None:
+            task_span.status = "error"
+            task_span.error = f"{type(exception).__name__}: {exception}"
+
+    @task_postrun.connect(weak=False)
+    def finish_task_span(task=None, state=None, **kwargs):
+        task_span = getattr(task.request, "_trace_span", None)
+        if task_span is not None:
+            task_span.set(state=state)
+            finish_span(task_span)
+
+
+async def trace_http_requests(request, call_next):
+    """FastAPI middleware: one span per request, trace id echoed in X-Trace-Id."""
+    incoming = request.headers.get("x-trace-id")
+    route_span = start_span(f"http {request.method}", trace_id=incoming if valid_trace_id(incoming) else None, path=request.url.path)
+    try:
+        response = await call_next(request)
+    except BaseException as e:
+        finish_span(route_span, e)
+        raise
+    route = request.scope.get("route")
+    if route is not None:
+        route_span.name = f"http {request.method} {route.path}"
+    route_span.set(status_code=response.status_code)
+    response.headers["X-Trace-Id"] = route_span.trace_id
+    finish_span(route_span)
+    return response
@@ -0,0 +1,143 @@
+"""
+Content-addressed storage for thread attachments (images and PDFs).
+
+Uploads are streamed chunk by chunk into a temporary file under
+UPLOADS_DIR/tmp while a SHA-256 is computed, then renamed to
+UPLOADS_DIR/<aa>/<bb>/<sha256>. A file that is already stored is not written
+twice: the temporary copy is dropped and the existing blob is reused. Memory
+per upload is bounded by the write buffer, not the file size.
+
+PDF text and a first-page thumbnail are extracted by `extract_upload_task` on
+the uploads queue, never on the request path, and kept by content hash (text
+in `uploads.extracted_text`, the PNG next to the blob), so attaching the same
+file again costs nothing.
+"""
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Optional
+import anyio
+from backend.app.core.config import settings
+
+WRITE_BUFFER_BYTES = 1 << 20
+
+# magic number -> content type; the declared Content-Type is not trusted
+SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UnsupportedUpload(Exception):
+    pass
+
+
+def uploads_dir() -> Path:
+    return Path(settings.UPLOADS_DIR)
+
+
+def blob_path(content_hash: str) -> Path:
+    return uploads_dir() / content_hash[:2] / content_hash[2:4] / content_hash
+
+
+def thumbnail_path(content_hash: str) -> Path:
+    return blob_path(content_hash).with_name(f"{content_hash}.thumb.png")
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    for magic, content_type in SIGNATURES:
+        if head.startswith(magic):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _require_type(head: bytes) -> str:
+    content_type = sniff_content_type(head)
+    if content_type is None:
+        raise UnsupportedUpload("only PDF, PNG, JPEG, GIF and WebP files can be attached")
+    return content_type
+
+
+async def store_stream(chunks: AsyncIterator[bytes], max_bytes: int = None) -> dict:
+    """
+    Write `chunks` to the blob store, hashing as they arrive.
+    Returns {"content_hash", "size", "content_type", "duplicate"}; raises
+    UnsupportedUpload for anything but a PDF or image and UploadTooLarge past `max_bytes`.
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    tmp_dir = uploads_dir() / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp = tmp_dir / f"{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    buffer = bytearray()
+    f = await anyio.to_thread.run_sync(open, tmp, "wb")
+    try:
+        async for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+            buffer += chunk
+            if content_type is None and len(buffer) >= 12:
+                content_type = _require_type(bytes(buffer[:12]))
+            if len(buffer) >= WRITE_BUFFER_BYTES:
+                await anyio.to_thread.run_sync(f.write, bytes(buffer))
+                buffer.clear()
+        if content_type is None:
+            content_type = _require_type(bytes(buffer))
+        if buffer:
+            await anyio.to_thread.run_sync(f.write, bytes(buffer))
+        await anyio.to_thread.run_sync(f.close)
+        content_hash = digest.hexdigest()
+        target = blob_path(content_hash)
+        duplicate = target.exists()
+        if duplicate:
+            tmp.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, target)
+    except BaseException:
+        f.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    return {"content_hash": content_hash, "size": size, "content_type": content_type, "duplicate": duplicate}
+
+
+def extract_pdf(content_hash: str, max_pages: int = None, thumbnail_width: int = None) -> dict:
+    """Text of the first `max_pages` pages and a PNG of page one; pypdf/pypdfium2 load only in the worker."""
+    import pypdf
+    import pypdfium2
+
+    max_pages = max_pages or settings.UPLOAD_EXTRACT_MAX_PAGES
+    thumbnail_width = thumbnail_width or settings.UPLOAD_THUMBNAIL_WIDTH
+    path = blob_path(content_hash)
+    reader = pypdf.PdfReader(path)
+    pages = reader.pages
+    text = "\n\n".join((page.extract_text() or "").strip() for page in pages[:max_pages]).strip()
+    thumbnail = None
+    document = pypdfium2.PdfDocument(path)
+    try:
+        if len(document):
+            page = document[0]
+            scale = thumbnail_width / page.get_width()
+            image = page.render(scale=scale).to_pil()
+            target = thumbnail_path(content_hash)
+            tmp = target.with_suffix(".tmp")
+            image.save(tmp, format="PNG", optimize=True)
+            os.replace(tmp, target)
+            thumbnail = str(target)
+    finally:
+        document.close()
+    return {"text": text, "page_count": len(pages), "thumbnail": thumbnail}
@@ -0,0 +1,234 @@
+"""
+Cold storage for the message history of finished threads.
+
+Once a thread has been success/failed for ARCHIVE_AFTER_DAYS, its messages are
+packed into one zstd-compressed JSON blob in `thread_archives` and the hot rows
+are deleted. Blobs are compressed with the latest dictionary in
+`archive_dictionaries` (trained on our own message records) because individual
+threads are too small for zstd to find much redundancy on its own.
+
+Reads go through `thread_message_dicts`, which merges archived and hot messages
+so callers don't need to know whether a thread has been archived. Decompressed
+archives are kept in a small LRU since archived threads are read in bursts.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+import orjson
+import zstandard as zstd
+from sqlalchemy import select, delete
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+from backend.app.db.models import Thread, Message, ThreadArchive, ArchiveDictionary
+from backend.app.db.partitions import thread_messages_query
+
+FINISHED_STATUSES = ("success", "failed")
+
+
+def message_record(m: Message) -> dict:
+    """Everything we keep about an archived message."""
+    return {
+        "id": m.id,
+        "content": m.content,
+        "role": m.role,
+        "model": m.model,
+        "tokens_used": m.tokens_used,
+        "created_at": m.created_at.isoformat() if m.created_at else None,
+        "content_hash": m.content_hash,
+    }
+
+
+def message_dict(m: Message) -> dict:
+    """Shape a hot message the way the API/tools return it."""
+    return {
+        "id": m.id,
+        "content": m.content,
+        "role": m.role,
+        "model": m.model,
+        "created_at": m.created_at,
+        "tool_call_id": None  # Extend if tool calls are tracked
+    }
+
+
+def archived_message_dict(record: dict) -> dict:
+    """Same shape as `message_dict`, from an archived record."""
+    return {
+        "id": record["id"],
+        "content": record["content"],
+        "role": record["role"],
+        "model": record["model"],
+        "created_at": datetime.fromisoformat(record["created_at"]) if record["created_at"] else None,
+        "tool_call_id": None
+    }
+
+
+def pack_messages(records: list, dict_data: bytes = None, level: int = None) -> bytes:
+    level = settings.ARCHIVE_ZSTD_LEVEL if level is None else level
+    dictionary = zstd.ZstdCompressionDict(dict_data) if dict_data else None
+    return zstd.ZstdCompressor(level=level, dict_data=dictionary).compress(orjson.dumps(records))
+
+
+def unpack_messages(payload: bytes, dict_data: bytes = None) -> list:
+    dictionary = zstd.ZstdCompressionDict(dict_data) if dict_data else None
+    return orjson.loads(zstd.ZstdDecompressor(dict_data=dictionary).decompress(payload))
+
+
+class _LRU:
+    """Tiny thread-safe LRU; functools.lru_cache can't take a db session argument."""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_archive_cache = _LRU(settings.ARCHIVE_CACHE_SIZE)   # (thread_id, message_count) -> [records]
+_dictionary_cache = _LRU(8)                          # dictionary_id -> bytes
+
+
+def _dictionary(db, dictionary_id):
+    if dictionary_id is None:
+        return None
+    dict_data = _dictionary_cache.get(dictionary_id)
+    if dict_data is None:
+        dict_data = db.execute(
+            select(ArchiveDictionary.dict_data).where(ArchiveDictionary.id == dictionary_id)
+        ).scalar_one()
+        _dictionary_cache.put(dictionary_id, dict_data)
+    return dict_data
+
+
+def load_archived_records(db, thread_id: int) -> list:
+    """Archived message records for a thread (empty list if it was never archived)."""
+    # The header lookup is a primary-key read without the payload; keying the
+    # cache on message_count means a re-archived thread is never served stale
+    # by another process's cache.
+    header = db.execute(
+        select(ThreadArchive.message_count, ThreadArchive.dictionary_id).where(ThreadArchive.thread_id == thread_id)
+    ).first()
+    if header is None:
+        return []
+    key = (thread_id, header.message_count)
+    records = _archive_cache.get(key)
+    if records is not None:
+        return records
+    payload = db.execute(select(ThreadArchive.payload).where(ThreadArchive.thread_id == thread_id)).scalar_one()
+    records = unpack_messages(payload, _dictionary(db, header.dictionary_id))
+    _archive_cache.put(key, records)
+    return records
+
+
+def thread_message_dicts(db, thread_id: int) -> list:
+    """All messages of a thread, archived first then hot rows, oldest first."""
+    archived = [archived_message_dict(r) for r in load_archived_records(db, thread_id)]
+    hot = db.execute(thread_messages_query(db, thread_id)).scalars().all()
+    return archived + [message_dict(m) for m in hot]
+
+
+def train_dictionary(db, sample_limit: int = 5000, dict_size: int = None):
+    """
+    Train a zstd dictionary on recent message records and store it.
+    Returns: {"ok": True, "id": id} or {"ok": False, "error": ...}
+    """
+    dict_size = dict_size or settings.ARCHIVE_DICT_SIZE
+    try:
+        messages = db.execute(
+            select(Message).order_by(Message.created_at.desc()).limit(sample_limit)
+        ).scalars().all()
+        samples = [orjson.dumps(message_record(m)) for m in messages]
+        if len(samples) < 100:
+            return {"ok": False, "error": f"Not enough messages to train a dictionary ({len(samples)})"}
+        dict_data = zstd.train_dictionary(dict_size, samples).as_bytes()
+        row = ArchiveDictionary(dict_data=dict_data, sample_count=len(samples))
+        db.add(row)
+        db.commit()
+        logger.info("Archive dictionary trained", id=row.id, samples=len(samples), size=len(dict_data))
+        return {"ok": True, "id": row.id}
+    except Exception as e:
+        db.rollback()
+        logger.error("Error training archive dictionary", error=str(e))
+        return {"ok": False, "error": str(e)}
+
+
+def archive_thread(db, thread_id: int):
+    """
+    Pack a thread's hot messages into thread_archives and delete the rows, in one transaction.
+    Messages archived earlier are merged in, so re-archiving a re-opened thread is safe.
+    Returns: {"ok": True, "thread_id": id, "messages": n, "ratio": x} or {"ok": False, "error": ...}
+    """
+    try:
+        hot = db.execute(thread_messages_query(db, thread_id)).scalars().all()
+        if not hot:
+            return {"ok": True, "thread_id": thread_id, "messages": 0}
+        records = load_archived_records(db, thread_id) + [message_record(m) for m in hot]
+        dictionary = db.execute(
+            select(ArchiveDictionary.id, ArchiveDictionary.dict_data).order_by(ArchiveDictionary.id.desc()).limit(1)
+        ).first()
+        payload = pack_messages(records, dictionary.dict_data if dictionary else None)
+        raw_size = len(orjson.dumps(records))
+        archive = db.get(ThreadArchive, thread_id) or ThreadArchive(thread_id=thread_id)
+        archive.dictionary_id = dictionary.id if dictionary else None
+        archive.payload = payload
+        archive.message_count = len(records)
+        archive.raw_size = raw_size
+        archive.compressed_size = len(payload)
+        archive.archived_at = datetime.utcnow()
+        db.add(archive)
+        # thread_id and the created_at bounds let the delete prune to the partitions the rows live in
+        db.execute(
+            delete(Message).where(
+                Message.thread_id == thread_id,
+                Message.created_at >= hot[0].created_at,
+                Message.created_at <= hot[-1].created_at,
+                Message.id.in_([m.id for m in hot]),
+            )
+        )
+        db.commit()
+        ratio = round(raw_size / len(payload), 2)
+        logger.info("Thread archived", thread_id=thread_id, messages=len(records), raw_size=raw_size, compressed_size=len(payload), ratio=ratio)
+        return {"ok": True, "thread_id": thread_id, "messages": len(records), "ratio": ratio}
+    except Exception as e:
+        db.rollback()
+        logger.error("Error archiving thread", error=str(e), thread_id=thread_id)
+        return {"ok": False, "error": str(e)}
+
+
+def archive_finished_threads(db, older_than_days: int = None, limit: int = 200):
+    """
+    Archive success/failed threads that finished more than `older_than_days` ago and still have hot messages.
+    Returns: {"ok": True, "archived": n, "failed": n}
+    """
+    older_than_days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    thread_ids = db.execute(
+        select(Thread.id)
+        .where(Thread.status.in_(FINISHED_STATUSES), Thread.updated_at < cutoff)
+        .where(select(Message.id).where(Message.thread_id == Thread.id).exists())
+        .order_by(Thread.id)
+        .limit(limit)
+    ).scalars().all()
+    archived = failed = 0
+    for thread_id in thread_ids:
+        if archive_thread(db, thread_id)["ok"]:
+            archived += 1
+        else:
+            failed += 1
+    logger.info("Finished threads archived", archived=archived, failed=failed)
+    return {"ok": True, "archived": archived, "failed": failed}
@@ -0,0 +1,53 @@
+"""
+Pooled asyncio sessions (asyncpg) for processes that live on an event loop,
+e.g. the Slack ingestion worker. The engine is created on first use so the
+sync API processes never load asyncpg.
+"""
+import os
+import re
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from backend.app.core.config import settings
+from backend.app.db.instrumentation import TimedAsyncAdaptedQueuePool, instrument_engine
+
+load_dotenv()
+
+_engine = None
+_sessionmaker = None
+
+
+def async_database_url(url: str) -> str:
+    return re.sub(r"^postgres(ql)?(\+\w+)?://", "postgresql+asyncpg://", url)
+
+
+def asyncpg_dsn(url: str = None) -> str:
+    """Plain DSN for raw asyncpg connections (LISTEN/NOTIFY), without the SQLAlchemy driver suffix."""
+    return re.sub(r"^postgres(ql)?(\+\w+)?://", "postgresql://", url or os.getenv("DATABASE_URL"))
+
+
+def get_async_sessionmaker(pool_size: int = 5) -> async_sessionmaker:
+    global _engine, _sessionmaker
+    if _sessionmaker is None:
+        server_settings = {}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        _engine = create_async_engine(
+            async_database_url(os.getenv("DATABASE_URL")),
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_size=pool_size,
+            max_overflow=0,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args={"server_settings": server_settings},
+        )
+        instrument_engine(_engine.sync_engine, name="async")
+        _sessionmaker = async_sessionmaker(_engine, class_=AsyncSession, expire_on_commit=False)
+    return _sessionmaker
+
+
+async def dispose_async_engine():
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine, _sessionmaker = None, None
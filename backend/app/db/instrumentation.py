@@ -0,0 +1,339 @@
+"""
+Statement timing, slow-query plans and connection-pool telemetry from SQLAlchemy engine events.
+
+  - every statement is timed (before/after_cursor_execute) and folded into
+    per-fingerprint stats: the SQL with literals, placeholders and IN-lists
+    normalised away, so `WHERE id = 1` and `WHERE id = 2` are one entry
+  - a read-only statement slower than SLOW_QUERY_MS gets its plan captured
+    with EXPLAIN (ANALYZE, BUFFERS) on a background thread, at most once per
+    fingerprint every SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS; writes are never
+    re-executed. Sync engines only: an async engine's connections can't be used
+    from the explain thread, and its asyncpg statements ($1 placeholders) don't
+    run on a psycopg2 connection either, so async engines are timed but never
+    explained
+  - the pool classes below time how long each checkout waited for a connection;
+    checkouts/checkins/connects are counted from pool events
+
+Everything lives in memory per process and is served by /api/v1/admin/db/*.
+"""
+import queue
+import re
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+
+SAMPLES_PER_FINGERPRINT = 256
+MAX_FINGERPRINTS = 2000
+MAX_PLANS = 100
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?|__\[POSTCOMPILE_\w+\]")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_VALUES = re.compile(r"\bVALUES\s*(\((?:[^()]|\([^()]*\))*\))(?:\s*,\s*\((?:[^()]|\([^()]*\))*\))+", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+UPDATE|FOR\s+SHARE|NEXTVAL|SETVAL|PG_\w*ADVISORY\w*|PG_NOTIFY)\b", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    sql = _STRING.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip()
+    sql = _IN_LIST.sub("IN (?)", sql)
+    sql = _VALUES.sub(r"VALUES \1", sql)
+    return sql
+
+
+def explainable(statement: str) -> bool:
+    """Only plain reads are safe to run again under EXPLAIN ANALYZE."""
+    return bool(_READ_ONLY.match(statement)) and not _WRITES.search(statement)
+
+
+def _percentile(ordered: list, p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+class QueryStats:
+    __slots__ = ("fingerprint", "count", "errors", "total_ms", "max_ms", "rows", "samples", "last_seen")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=SAMPLES_PER_FINGERPRINT)
+        self.last_seen = None
+
+    def add(self, duration_ms: float, rows: int):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.rows += max(rows, 0)
+        self.samples.append(duration_ms)
+        self.last_seen = time.time()
+
+    def as_dict(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(_percentile(ordered, 50), 3),
+            "p95_ms": round(_percentile(ordered, 95), 3),
+            "p99_ms": round(_percentile(ordered, 99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "last_seen": self.last_seen,
+        }
+
+
+class PoolTelemetry:
+    def __init__(self):
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_samples = deque(maxlen=1024)
+
+    def waited(self, wait_ms: float):
+        self.wait_total_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        self.wait_samples.append(wait_ms)
+
+
+class _TimedCheckout:
+    """Times the wait for a pooled connection (QueuePool blocks in _do_get when the pool is exhausted)."""
+    _telemetry = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self._telemetry is not None:
+                self._telemetry.timeouts += 1
+            raise
+        finally:
+            if self._telemetry is not None:
+                self._telemetry.waited((time.perf_counter() - started) * 1000)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool._telemetry = self._telemetry  # engine.dispose() swaps in a fresh pool
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class EngineInstrumentation:
+    def __init__(self, engine, slow_query_ms: float, explain: bool, explain_cooldown: float):
+        self.engine = engine
+        self.slow_query_ms = slow_query_ms
+        self.explain = explain
+        self.explain_cooldown = explain_cooldown
+        self.queries = {}
+        self.plans = deque(maxlen=MAX_PLANS)
+        self.pool = PoolTelemetry()
+        self._lock = threading.Lock()
+        self._explained_at = {}
+        self._explain_queue = None
+
+    # -- statements ------------------------------------------------------------
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        duration_ms = (time.perf_counter() - started) * 1000
+        key = fingerprint(statement)
+        with self._lock:
+            stats = self.queries.get(key)
+            if stats is None:
+                if len(self.queries) >= MAX_FINGERPRINTS:
+                    self._evict()
+                stats = self.queries[key] = QueryStats(key)
+            stats.add(duration_ms, cursor.rowcount if cursor is not None else 0)
+        if duration_ms >= self.slow_query_ms:
+            self._slow(key, statement, parameters, duration_ms, executemany)
+
+    def handle_error(self, context):
+        conn = context.connection
+        starts = conn.info.get("query_start") if conn is not None else None
+        if starts:
+            starts.pop()
+        if context.statement:
+            key = fingerprint(context.statement)
+            with self._lock:
+                stats = self.queries.setdefault(key, QueryStats(key))
+                stats.errors += 1
+
+    def _evict(self):
+        # drop the least recently seen tenth so one-off statements can't grow the table forever
+        stale = sorted(self.queries.values(), key=lambda s: s.last_seen or 0)[: MAX_FINGERPRINTS // 10]
+        for stats in stale:
+            del self.queries[stats.fingerprint]
+
+    # -- slow queries -------------------------------------------------------------
+
+    def _slow(self, key, statement, parameters, duration_ms, executemany):
+        logger.warning("Slow query", duration_ms=round(duration_ms, 1), fingerprint=key[:500])
+        if not self.explain or executemany or not explainable(statement):
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained_at.get(key, -self.explain_cooldown) < self.explain_cooldown:
+                return
+            self._explained_at[key] = now
+        self._ensure_explainer()
+        self._explain_queue.put((key, statement, parameters, duration_ms))
+
+    def _ensure_explainer(self):
+        with self._lock:
+            if self._explain_queue is None:
+                self._explain_queue = queue.SimpleQueue()
+                threading.Thread(target=self._explain_loop, name="slow-query-explain", daemon=True).start()
+
+    def _explain_loop(self):
+        while True:
+            key, statement, parameters, duration_ms = self._explain_queue.get()
+            try:
+                plan = self.capture_plan(statement, parameters)
+            except Exception as e:
+                logger.warning("EXPLAIN of slow query failed", fingerprint=key[:500], error=str(e))
+                continue
+            top = plan[0] if isinstance(plan, list) and plan else {}
+            summary = {
+                "execution_ms": top.get("Execution Time"),
+                "planning_ms": top.get("Planning Time"),
+                "node": top.get("Plan", {}).get("Node Type"),
+                "shared_hit_blocks": top.get("Plan", {}).get("Shared Hit Blocks"),
+                "shared_read_blocks": top.get("Plan", {}).get("Shared Read Blocks"),
+            }
+            self.plans.append({"fingerprint": key, "duration_ms": round(duration_ms, 3), "captured_at": time.time(), "summary": summary, "plan": plan})
+            logger.warning("Slow query plan captured", fingerprint=key[:500], **summary)
+
+    def capture_plan(self, statement, parameters):
+        """EXPLAIN (ANALYZE, BUFFERS) on a raw DBAPI connection (no engine events), always rolled back."""
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            if settings.DB_STATEMENT_TIMEOUT_MS:
+                cursor.execute(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+            plan = cursor.fetchone()[0]
+            cursor.close()
+            return plan
+        finally:
+            raw.rollback()
+            raw.close()
+
+    # -- pool ------------------------------------------------------------------------
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.pool.checkouts += 1
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        self.pool.checkins += 1
+
+    def on_connect(self, dbapi_connection, connection_record):
+        self.pool.connects += 1
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.pool.invalidations += 1
+
+    # -- export ------------------------------------------------------------------------
+
+    def query_stats(self, order: str = "total_ms", limit: int = 50) -> list:
+        with self._lock:
+            rows = [stats.as_dict() for stats in self.queries.values()]
+        return sorted(rows, key=lambda row: -row[order])[:limit]
+
+    def slow_plans(self, limit: int = 20) -> list:
+        return list(self.plans)[-limit:][::-1]
+
+    def pool_stats(self) -> dict:
+        pool = self.engine.pool
+        waits = sorted(self.pool.wait_samples)
+        stats = {
+            "pool": type(pool).__name__,
+            "checkouts": self.pool.checkouts,
+            "checkins": self.pool.checkins,
+            "connects": self.pool.connects,
+            "invalidations": self.pool.invalidations,
+            "timeouts": self.pool.timeouts,
+            "wait_p50_ms": round(_percentile(waits, 50), 3),
+            "wait_p99_ms": round(_percentile(waits, 99), 3),
+            "wait_max_ms": round(self.pool.wait_max_ms, 3),
+        }
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), checked_out=pool.checkedout(), checked_in=pool.checkedin(), overflow=pool.overflow(), max_overflow=pool._max_overflow)
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self.queries.clear()
+            self.plans.clear()
+            self._explained_at.clear()
+
+
+_instrumented = {}
+
+
+def instrument_engine(engine, name: str = "default", slow_query_ms: float = None, explain: bool = None, explain_cooldown: float = None) -> EngineInstrumentation:
+    """Attach statement and pool listeners to a sync Engine (for AsyncEngine pass `.sync_engine`)."""
+    explain = settings.SLOW_QUERY_EXPLAIN if explain is None else explain
+    instrumentation = EngineInstrumentation(
+        engine,
+        settings.SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms,
+        explain and not engine.dialect.is_async,  # raw_connection() off the event loop raises MissingGreenlet
+        settings.SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS if explain_cooldown is None else explain_cooldown,
+    )
+    event.listen(engine, "before_cursor_execute", instrumentation.before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", instrumentation.after_cursor_execute)
+    event.listen(engine, "handle_error", instrumentation.handle_error)
+    event.listen(engine.pool, "checkout", instrumentation.on_checkout)
+    event.listen(engine.pool, "checkin", instrumentation.on_checkin)
+    event.listen(engine.pool, "connect", instrumentation.on_connect)
+    event.listen(engine.pool, "invalidate", instrumentation.on_invalidate)
+    if isinstance(engine.pool, _TimedCheckout):
+        engine.pool._telemetry = instrumentation.pool
+    _instrumented[name] = instrumentation
+    return instrumentation
+
+
+def get_instrumentation(name: str = "default"):
+    return _instrumented.get(name)
+
+
+def pool_options() -> dict:
+    """create_engine() pool/connection options from Settings (shared by the sync and async engines)."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -1,24 +1,50 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, SmallInteger, Date, Float, ARRAY, UniqueConstraint, func
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, SmallInteger, Date, Float, ARRAY, LargeBinary, UniqueConstraint, Index, DDL, event, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import expression
+from backend.app.db import notify
 
 Base = declarative_base()
 
+# raw_notes and messages are range partitioned by month on their timestamp
+# column (see backend/app/db/partitions.py). Postgres requires the partition
+# key in every primary key / unique constraint, so dedup columns are plain
+# per-partition indexes and uniqueness lives in the small key tables
+# raw_note_keys and message_keys.
 class RawNote(Base):
     __tablename__ = 'raw_notes'
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     source = Column(String, nullable=False)  # "slack", "granola"
-    source_note_id = Column(String, nullable=False, unique=True)
+    source_note_id = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     content_hash = Column(String, nullable=False)
     author = Column(String)
     channel = Column(String)
     content_vector = Column(ARRAY(Float, dimensions=1), nullable=True)  # pgvector placeholder
-    received_at = Column(DateTime, server_default=func.now())
-    __table_args__ = (UniqueConstraint('content_hash', name='uq_raw_notes_content_hash'),)
+    received_at = Column(DateTime, primary_key=True, nullable=False, server_default=func.now())
+    __table_args__ = (
+        Index('ix_raw_notes_content_hash', 'content_hash'),
+        Index('ix_raw_notes_source_note_id', 'source_note_id'),
+        Index('ix_raw_notes_received_at', 'received_at'),
+        {'postgresql_partition_by': 'RANGE (received_at)'},
+    )
     def validate(self):
         pass
 
+class RawNoteKey(Base):
+    """
+    Dedup keys of raw_notes. The partitioned table can only have unique constraints
+    that include received_at, so content_hash / source_note_id uniqueness lives here:
+    writers claim the keys with INSERT ... ON CONFLICT DO NOTHING in the transaction
+    that inserts the note (backend/app/tools/raw_notes_tools.py).
+    """
+    __tablename__ = 'raw_note_keys'
+    content_hash = Column(String, primary_key=True)
+    source_note_id = Column(String, nullable=False)
+    raw_note_id = Column(Integer, nullable=False)
+    __table_args__ = (
+        UniqueConstraint('source_note_id', name='uq_raw_note_keys_source_note_id'),
+    )
+
 class Thread(Base):
     __tablename__ = 'threads'
     id = Column(Integer, primary_key=True)
@@ -26,29 +52,46 @@ class Thread(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     status = Column(String, nullable=False, default="planning")
     completed_at = Column(DateTime, nullable=True)
+    # set by POST /threads/{id}/resume on data_agent threads, cleared when the re-run claims it
+    resume_requested_at = Column(DateTime, nullable=True)
     error_count = Column(Integer, default=0)
     last_error = Column(Text, nullable=True)
     agent = Column(String)
     summary = Column(Text)
     summary_embedding = Column(ARRAY(Float, dimensions=1), nullable=True)  # pgvector placeholder
+    __table_args__ = (
+        Index('ix_threads_updated_at_id', 'updated_at', 'id'),
+        Index('ix_threads_status_updated_at', 'status', 'updated_at'),  # stalled-thread scans
+    )
     def validate(self):
         pass
 
 class Message(Base):
     __tablename__ = 'messages'
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     thread_id = Column(Integer, ForeignKey('threads.id'), nullable=False)
     content = Column(Text, nullable=False)
     content_vector = Column(ARRAY(Float, dimensions=1), nullable=True)  # pgvector placeholder
     role = Column(String, nullable=False)
     model = Column(String)
     tokens_used = Column(Integer)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, primary_key=True, nullable=False, server_default=func.now())
     content_hash = Column(String, nullable=True)
-    __table_args__ = (UniqueConstraint('role', 'content_hash', name='uq_messages_role_content_hash'),)
+    __table_args__ = (
+        Index('ix_messages_thread_id_created_at', 'thread_id', 'created_at'),
+        Index('ix_messages_role_content_hash', 'role', 'content_hash'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
     def validate(self):
         pass
 
+class MessageKey(Base):
+    """(role, content_hash) keys of messages, kept in step by row triggers on messages (migration e2a7c9f4b6d1)."""
+    __tablename__ = 'message_keys'
+    role = Column(String, primary_key=True)
+    content_hash = Column(String, primary_key=True)
+    message_id = Column(Integer, nullable=False)
+
 class Task(Base):
     __tablename__ = 'tasks'
     id = Column(Integer, primary_key=True)
@@ -63,7 +106,10 @@ class Task(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     description_hash = Column(String, nullable=True)
-    __table_args__ = (UniqueConstraint('description_hash', name='uq_tasks_description_hash'),)
+    __table_args__ = (
+        UniqueConstraint('description_hash', name='uq_tasks_description_hash'),
+        Index('ix_tasks_updated_at_id', 'updated_at', 'id'),
+    )
     def validate(self):
         pass
 
@@ -76,4 +122,72 @@ class Project(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     def validate(self):
-        pass 
\ No newline at end of file
+        pass
+
+class ArchiveDictionary(Base):
+    __tablename__ = 'archive_dictionaries'
+    id = Column(Integer, primary_key=True)
+    dict_data = Column(LargeBinary, nullable=False)  # zstd dictionary trained on message records
+    sample_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+class ThreadArchive(Base):
+    __tablename__ = 'thread_archives'
+    thread_id = Column(Integer, ForeignKey('threads.id'), primary_key=True)
+    dictionary_id = Column(Integer, ForeignKey('archive_dictionaries.id'), nullable=True)
+    payload = Column(LargeBinary, nullable=False)  # zstd-compressed JSON array of messages
+    message_count = Column(Integer, nullable=False)
+    raw_size = Column(Integer, nullable=False)
+    compressed_size = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, server_default=func.now())
+
+class AgentWatermark(Base):
+    """High-water mark of the last successful run of a scheduled agent."""
+    __tablename__ = 'agent_watermarks'
+    agent = Column(String, primary_key=True)
+    high_water_mark = Column(DateTime, nullable=True)  # (updated_at, id) of the newest row already processed
+    high_water_id = Column(Integer, nullable=True)
+    last_run_at = Column(DateTime, nullable=True)
+    last_thread_id = Column(Integer, ForeignKey('threads.id'), nullable=True)
+    rows_processed = Column(Integer, default=0)
+    running_since = Column(DateTime, nullable=True)  # set while a run holds the claim (backend/app/agents/scheduled.py)
+
+class Upload(Base):
+    """A stored file, keyed by the SHA-256 of its content (backend/app/core/uploads.py)."""
+    __tablename__ = 'uploads'
+    content_hash = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    extraction_status = Column(String, nullable=False, default="pending")  # pending, running, done, failed, skipped
+    extracted_text = Column(Text, nullable=True)
+    page_count = Column(Integer, nullable=True)
+    thumbnail = Column(String, nullable=True)
+    extraction_error = Column(Text, nullable=True)
+    extracted_at = Column(DateTime, nullable=True)  # claim time while running (backend/app/worker/uploads.py)
+
+class ThreadAttachment(Base):
+    __tablename__ = 'thread_attachments'
+    id = Column(Integer, primary_key=True)
+    thread_id = Column(Integer, ForeignKey('threads.id'), nullable=False)
+    content_hash = Column(String(64), ForeignKey('uploads.content_hash'), nullable=False)
+    filename = Column(String, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    __table_args__ = (
+        UniqueConstraint('thread_id', 'content_hash', name='uq_thread_attachments_thread_hash'),
+    )
+
+# metadata.create_all() (tests, fresh dev databases) only creates the partitioned
+# parents; give each one a DEFAULT partition so inserts work before the monthly
+# partitions are created by the migration / maintenance task.
+for _table in (RawNote.__table__, Message.__table__):
+    event.listen(
+        _table,
+        "after_create",
+        DDL(f"CREATE TABLE IF NOT EXISTS {_table.name}_default PARTITION OF {_table.name} DEFAULT").execute_if(dialect="postgresql"),
+    )
+
+# NOTIFY triggers for event-driven agent dispatch (backend/app/db/notify.py)
+for _table, _statements in ((RawNote.__table__, notify.RAW_NOTES_TRIGGER), (Thread.__table__, notify.THREADS_TRIGGER)):
+    for _statement in _statements:
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,52 @@
+"""
+Postgres NOTIFY triggers that announce new raw notes and thread status changes.
+
+Payloads are small JSON objects (NOTIFY caps them at 8000 bytes), delivered to
+listeners when the writing transaction commits:
+  raw_notes_inserted     {"id", "source", "channel"}
+  thread_status_changed  {"id", "status", "old_status", "agent", "updated_at"}
+The triggers are installed by migration c6f1a8e2d4b9 and, for databases built
+with metadata.create_all(), by the DDL hooks in models.py.
+"""
+
+RAW_NOTES_CHANNEL = "raw_notes_inserted"
+THREADS_CHANNEL = "thread_status_changed"
+CHANNELS = (RAW_NOTES_CHANNEL, THREADS_CHANNEL)
+
+RAW_NOTES_TRIGGER = [
+    f"""
+    CREATE OR REPLACE FUNCTION notify_raw_note_inserted() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{RAW_NOTES_CHANNEL}', json_build_object(
+            'id', NEW.id, 'source', NEW.source, 'channel', NEW.channel
+        )::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS raw_notes_notify_insert ON raw_notes",
+    """
+    CREATE TRIGGER raw_notes_notify_insert AFTER INSERT ON raw_notes
+    FOR EACH ROW EXECUTE FUNCTION notify_raw_note_inserted()
+    """,
+]
+
+THREADS_TRIGGER = [
+    f"""
+    CREATE OR REPLACE FUNCTION notify_thread_status_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{THREADS_CHANNEL}', json_build_object(
+            'id', NEW.id, 'status', NEW.status, 'old_status', OLD.status,
+            'agent', NEW.agent, 'updated_at', NEW.updated_at
+        )::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS threads_notify_status ON threads",
+    """
+    CREATE TRIGGER threads_notify_status AFTER UPDATE OF status ON threads
+    FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION notify_thread_status_changed()
+    """,
+]
@@ -0,0 +1,169 @@
+"""
+Monthly range partitioning for the append-only tables (raw_notes, messages).
+
+Partitions are named ``<table>_pYYYY_MM`` and cover one calendar month of the
+partition key. A ``<table>_default`` partition catches anything outside the
+pre-created range so ingestion never fails; `ensure_partitions` moves such rows
+into a proper monthly partition when it creates one. Retention is applied by
+detaching and dropping whole partitions instead of running large DELETEs.
+"""
+import re
+from datetime import date, datetime
+from sqlalchemy import select, text
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+from backend.app.db.models import Thread, Message
+
+# table -> partition key column
+PARTITIONED_TABLES = {
+    "raw_notes": "received_at",
+    "messages": "created_at",
+}
+
+_PARTITION_RE = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(value) -> date:
+    """First day of the month containing `value` (date or datetime)."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    total = value.year * 12 + (value.month - 1) + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_month(name: str):
+    """Parse the month out of a partition name, or None for non-monthly partitions."""
+    match = _PARTITION_RE.search(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def list_partitions(db, table: str) -> list:
+    """Names of the partitions currently attached to `table`."""
+    rows = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table ORDER BY c.relname"
+        ),
+        {"table": table},
+    )
+    return [row[0] for row in rows]
+
+
+def create_partition(db, table: str, month: date) -> str:
+    """
+    Create the monthly partition of `table` starting at `month`.
+    Rows already sitting in the default partition for that range are moved
+    into the new partition before it is attached.
+    """
+    key = PARTITIONED_TABLES[table]
+    name = partition_name(table, month)
+    params = {"lo": month, "hi": add_months(month, 1)}
+    bounds = f"FROM ('{params['lo']:%Y-%m-%d}') TO ('{params['hi']:%Y-%m-%d}')"
+    stranded = db.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {key} >= :lo AND {key} < :hi)"),
+        params,
+    ).scalar()
+    if not stranded:
+        db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        return name
+    db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {table}_default WHERE {key} >= :lo AND {key} < :hi RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        params,
+    )
+    db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+    logger.warning("Moved rows out of default partition", table=table, partition=name)
+    return name
+
+
+def ensure_partitions(db, table: str, months_ahead: int = None, today: date = None) -> list:
+    """Make sure partitions exist from the current month through `months_ahead` months ahead."""
+    months_ahead = settings.PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+    current = month_start(today or datetime.utcnow())
+    existing = set(list_partitions(db, table))
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(table, month)
+        if name not in existing:
+            create_partition(db, table, month)
+            created.append(name)
+    return created
+
+
+def drop_expired_partitions(db, table: str, keep_months: int, today: date = None) -> list:
+    """
+    Detach and drop monthly partitions entirely older than `keep_months` months.
+    keep_months <= 0 disables retention for the table.
+    """
+    if keep_months <= 0:
+        return []
+    cutoff = add_months(month_start(today or datetime.utcnow()), -keep_months)
+    dropped = []
+    for name in list_partitions(db, table):
+        month = partition_month(name)
+        if month is None or month >= cutoff:
+            continue
+        db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        # DROP fires no delete triggers, so expired rows give up their dedup keys here
+        if table == "raw_notes":
+            db.execute(text(f"DELETE FROM raw_note_keys k USING {name} n WHERE k.raw_note_id = n.id"))
+        elif table == "messages":
+            db.execute(text(f"DELETE FROM message_keys k USING {name} m WHERE k.message_id = m.id"))
+        db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+def maintain_partitions(db, today: date = None):
+    """
+    Pre-create upcoming partitions and apply retention for every partitioned table.
+    Returns: {"ok": True, "created": [...], "dropped": [...]} or {"ok": False, "error": ...}
+    """
+    retention = {
+        "raw_notes": settings.RAW_NOTES_RETENTION_MONTHS,
+        "messages": settings.MESSAGES_RETENTION_MONTHS,
+    }
+    try:
+        created, dropped = [], []
+        for table in PARTITIONED_TABLES:
+            created += ensure_partitions(db, table, today=today)
+            dropped += drop_expired_partitions(db, table, retention[table], today=today)
+        db.commit()
+        logger.info("Partition maintenance done", created=created, dropped=dropped)
+        return {"ok": True, "created": created, "dropped": dropped}
+    except Exception as e:
+        db.rollback()
+        logger.error("Partition maintenance failed", error=str(e))
+        return {"ok": False, "error": str(e)}
+
+
+def thread_messages_since(db, thread_id: int):
+    """
+    Lower bound for a thread's messages on the messages partition key.
+    A message can't predate its thread, so filtering on this lets Postgres
+    prune every partition older than the thread. None if the thread is unknown.
+    """
+    return db.execute(select(Thread.created_at).where(Thread.id == thread_id)).scalar()
+
+
+def thread_messages_query(db, thread_id: int):
+    """Select a thread's messages oldest first, bounded so partition pruning applies."""
+    query = select(Message).where(Message.thread_id == thread_id)
+    since = thread_messages_since(db, thread_id)
+    if since is not None:
+        query = query.where(Message.created_at >= since)
+    return query.order_by(Message.created_at.asc())
@@ -1,14 +1,54 @@
 import os
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from dotenv import load_dotenv
 from contextlib import contextmanager
+from backend.app.core.config import settings
+from backend.app.db.instrumentation import TimedQueuePool, instrument_engine, pool_options
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL, echo=True, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# The engine is built on the first query, not at import, so importing the app (tests,
+# Celery boot, CLI scripts) doesn't need a reachable database or pay for the pool.
+_engine = None
+
+
+def connect_args() -> dict:
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            DATABASE_URL,
+            echo=settings.DB_ECHO,
+            future=True,
+            poolclass=TimedQueuePool,
+            connect_args=connect_args(),
+            **pool_options(),
+        )
+        instrument_engine(_engine)
+    return _engine
+
+
+def dispose_engine():
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+
+
+class LazyEngineSession(Session):
+    def get_bind(self, mapper=None, *, clause=None, bind=None, **kwargs):
+        return bind or self.bind or get_engine()
+
+
+SessionLocal = sessionmaker(class_=LazyEngineSession, autocommit=False, autoflush=False)
 
 def get_db():
     db = SessionLocal()
@@ -1,8 +1,11 @@
 import os
-from slack_bolt import App
-from slack_bolt.adapter.socket_mode import SocketModeHandler
+import asyncio
+import threading
+from backend.app.agents.debounce import BurstDebouncer, debounce_key, enqueue_data_agent, ingest_debouncing
 from backend.app.core.logging import logger
+from backend.app.core.tracing import span
 from backend.app.tools.raw_notes_tools import write_raw_notes
+from backend.app.integrations.slack_events import note_from_event
 
 def get_env_var(name):
     value = os.getenv(name)
@@ -10,38 +13,96 @@ def get_env_var(name):
         logger.error(f"Missing required environment variable: {name}")
     return value
 
-app = App(token=get_env_var("SLACK_BOT_TOKEN"))
-
-@app.message("hello")
 def handle_hello(message, say):
     user = message['user']
     logger.info(f"Received hello from {user}")
     say(f"Hi there, <@{user}>!")
     logger.info(f"Sent reply to {user}")
 
-@app.event("message")
-def handle_message_events(body, event, logger):
-    # Only process user messages (not bot messages, etc.)
-    if event.get("subtype") is not None:
+def handle_message_events(body, event):
+    # Only process user messages (not bot messages, etc.). Bolt injects arguments by
+    # name, so not asking for its stdlib `logger` keeps the loguru one (which takes kwargs).
+    data = note_from_event(event)
+    if data is None:
+        return None
+    with span("slack.handle_message_events", channel=data["channel"], source_note_id=data["source_note_id"]) as event_span:
+        try:
+            # Bolt runs handlers on its own worker threads, which have no event loop
+            result = asyncio.run(write_raw_notes(data))
+            logger.info(f"Wrote Slack message to raw_notes", result=result, data=data)
+            loop, debouncer = _loop, _debouncer
+            if debouncer is not None and result.get("ok") and not result.get("duplicate"):
+                loop.call_soon_threadsafe(debouncer.add, debounce_key(event), result["id"])
+            return result
+        except Exception as e:
+            event_span.status, event_span.error = "error", str(e)
+            logger.error(f"Failed to write Slack message to raw_notes: {e}", data=data)
+            return {"ok": False, "error": str(e)}
+
+_app = None
+_handler = None
+# Debounce windows live on a small event loop of their own while this process is the listener
+_loop = None
+_debouncer = None
+
+def _start_debouncer():
+    global _loop, _debouncer
+    if not ingest_debouncing():
         return
-    content = event.get("text", "")
-    author = event.get("user", "")
-    channel = event.get("channel", "")
-    ts = event.get("ts", "")
-    data = {
-        "source": "slack",
-        "source_note_id": ts,
-        "content": content,
-        "author": author,
-        "channel": channel
-    }
+    _loop = asyncio.new_event_loop()
+    _debouncer = BurstDebouncer(enqueue_data_agent)
+    threading.Thread(target=_loop.run_forever, name="slack-debounce", daemon=True).start()
+
+def _stop_debouncer():
+    global _loop, _debouncer
+    if _loop is None:
+        return
+    loop, debouncer, _loop, _debouncer = _loop, _debouncer, None, None
     try:
-        result = write_raw_notes.__wrapped__(data) if hasattr(write_raw_notes, "__wrapped__") else write_raw_notes(data)
-        logger.info(f"Wrote Slack message to raw_notes", result=result, data=data)
-    except Exception as e:
-        logger.error(f"Failed to write Slack message to raw_notes: {e}", data=data)
+        asyncio.run_coroutine_threadsafe(debouncer.close(), loop).result(timeout=30)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+
+async def _debounce_metrics(debouncer):
+    return debouncer.metrics()
+
+def debounce_metrics():
+    """Debounce window metrics of this process's listener; None when it isn't listening."""
+    loop, debouncer = _loop, _debouncer
+    if debouncer is None:
+        return None
+    return asyncio.run_coroutine_threadsafe(_debounce_metrics(debouncer), loop).result(timeout=1)
+
+def get_slack_app():
+    """The Bolt App, built on first use: App() calls auth.test, so importing this module stays offline."""
+    global _app
+    if _app is None:
+        from slack_bolt import App
+
+        app = App(token=get_env_var("SLACK_BOT_TOKEN"))
+        app.message("hello")(handle_hello)
+        app.event("message")(handle_message_events)
+        _app = app
+    return _app
 
 def start_slack_listener():
-    handler = SocketModeHandler(app, get_env_var("SLACK_APP_TOKEN"))
+    """Open the Socket Mode connection without blocking; only the elected leader calls this."""
+    global _handler
+    if _handler is not None:
+        return
+    from slack_bolt.adapter.socket_mode import SocketModeHandler
+
+    _start_debouncer()
+    _handler = SocketModeHandler(get_slack_app(), get_env_var("SLACK_APP_TOKEN"))
     logger.info("Starting Slack SocketModeHandler")
-    handler.start() 
\ No newline at end of file
+    _handler.connect()
+
+def stop_slack_listener():
+    global _handler
+    if _handler is None:
+        return
+    logger.info("Stopping Slack SocketModeHandler")
+    handler, _handler = _handler, None
+    handler.close()
+    _stop_debouncer()
+ 
\ No newline at end of file
@@ -0,0 +1,14 @@
+from typing import Optional
+
+
+def note_from_event(event: dict) -> Optional[dict]:
+    """raw_notes payload for a Slack `message` event; None for non-user messages (bots, edits, joins)."""
+    if event.get("subtype") is not None:
+        return None
+    return {
+        "source": "slack",
+        "source_note_id": event.get("ts", ""),
+        "content": event.get("text", ""),
+        "author": event.get("user", ""),
+        "channel": event.get("channel", ""),
+    }
@@ -0,0 +1,197 @@
+"""
+Standalone asyncio Slack ingestion worker.
+
+    python -m backend.app.integrations.slack_worker
+
+Bolt's AsyncApp on the async Socket Mode adapter writes message events to
+raw_notes through a pooled asyncpg session, all on one event loop, so
+ingestion no longer shares the API's threads, GIL or sync DB pool. Slack
+spreads events over every open Socket Mode connection of the app, so several
+workers can run side by side; set SLACK_LISTENER_IN_API=false to stop the API
+from opening its own connection.
+
+On SIGTERM/SIGINT the worker closes its Socket Mode connection (no new events)
+and waits up to INGEST_DRAIN_SECONDS for in-flight writes before exiting.
+Throughput (events/sec) is logged every INGEST_REPORT_SECONDS.
+"""
+import asyncio
+import functools
+import os
+import signal
+import time
+from backend.app.agents.debounce import BurstDebouncer, debounce_key, enqueue_data_agent, ingest_debouncing
+from backend.app.core.config import settings
+from backend.app.core.logging import logger
+from backend.app.core.tracing import span
+from backend.app.db.async_session import dispose_async_engine, get_async_sessionmaker
+from backend.app.integrations.slack_events import note_from_event
+from backend.app.tools.raw_notes_tools import claim_note_keys, content_hash, existing_note_id, insert_note
+
+
+async def write_raw_note(session_factory, note: dict) -> dict:
+    """Async twin of write_raw_notes: same raw_note_keys dedup, one pooled session per event."""
+    note_hash = content_hash(note["content"])
+    async with session_factory() as session:
+        note_id = await session.scalar(insert_note(note, note_hash))
+        if (await session.execute(claim_note_keys(note_id, note_hash, note["source_note_id"]))).first() is None:
+            await session.rollback()
+            existing = await session.scalar(existing_note_id(note_hash, note["source_note_id"]))
+            return {"ok": True, "id": existing, "duplicate": True}
+        await session.commit()
+        return {"ok": True, "id": note_id}
+
+
+class IngestStats:
+    def __init__(self):
+        self.received = 0
+        self.written = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._last_at = self.started
+        self._last_done = 0
+
+    @property
+    def done(self) -> int:
+        return self.written + self.duplicates + self.failed
+
+    def rate(self) -> float:
+        """Events/sec finished since the previous call."""
+        now = time.monotonic()
+        elapsed = now - self._last_at
+        rate = (self.done - self._last_done) / elapsed if elapsed > 0 else 0.0
+        self._last_at, self._last_done = now, self.done
+        return rate
+
+    def as_dict(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "received": self.received,
+            "written": self.written,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "events_per_sec_overall": round(self.done / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+class IngestPipeline:
+    """Bounded-concurrency writes with in-flight tracking so shutdown can drain them."""
+
+    def __init__(self, write, concurrency: int):
+        self.write = write
+        self.stats = IngestStats()
+        self.accepting = True
+        self._slots = asyncio.Semaphore(concurrency)
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def submit(self, note: dict) -> dict:
+        self.stats.received += 1
+        if not self.accepting:
+            self.stats.failed += 1
+            logger.warning("Slack event arrived while draining", source_note_id=note["source_note_id"])
+            return {"ok": False, "error": "draining"}
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            async with self._slots:
+                with span("slack.ingest", channel=note["channel"], source_note_id=note["source_note_id"]):
+                    result = await self.write(note)
+        except Exception as e:
+            logger.error("Failed to write Slack message to raw_notes", error=str(e), data=note)
+            result = {"ok": False, "error": str(e)}
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.set()
+        if not result.get("ok"):
+            self.stats.failed += 1
+        elif result.get("duplicate"):
+            self.stats.duplicates += 1
+        else:
+            self.stats.written += 1
+        return result
+
+    async def drain(self, timeout: float) -> bool:
+        """Stop accepting and wait for in-flight writes; False if some were still running at the deadline."""
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def log_report(self, **extra):
+        logger.info(
+            "Slack ingest throughput",
+            events_per_sec=round(self.stats.rate(), 2),
+            in_flight=self._in_flight,
+            **self.stats.as_dict(),
+            **extra,
+        )
+
+    async def report(self, interval: float, extra=None):
+        while True:
+            await asyncio.sleep(interval)
+            self.log_report(**(extra() if extra else {}))
+
+
+def create_app(pipeline: IngestPipeline, debouncer: BurstDebouncer = None):
+    from slack_bolt.async_app import AsyncApp
+
+    app = AsyncApp(token=os.getenv("SLACK_BOT_TOKEN"))
+
+    # Bolt acks the envelope first and then runs the listener as its own task
+    @app.event("message")
+    async def handle_message_events(event):
+        note = note_from_event(event)
+        if note is None:
+            return
+        result = await pipeline.submit(note)
+        if debouncer is not None and result.get("ok") and not result.get("duplicate"):
+            debouncer.add(debounce_key(event), result["id"])
+
+    return app
+
+
+async def run():
+    from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+
+    session_factory = get_async_sessionmaker(pool_size=settings.INGEST_CONCURRENCY)
+    pipeline = IngestPipeline(functools.partial(write_raw_note, session_factory), settings.INGEST_CONCURRENCY)
+    debouncer = BurstDebouncer(enqueue_data_agent) if ingest_debouncing() else None
+    handler = AsyncSocketModeHandler(create_app(pipeline, debouncer), os.getenv("SLACK_APP_TOKEN"))
+    debounce_metrics = (lambda: {"debounce": debouncer.metrics()}) if debouncer else None
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await handler.connect_async()
+    reporter = asyncio.create_task(pipeline.report(settings.INGEST_REPORT_SECONDS, debounce_metrics))
+    logger.info("Slack ingestion worker started", concurrency=settings.INGEST_CONCURRENCY, pid=os.getpid())
+    await stop.wait()
+
+    logger.info("Slack ingestion worker stopping", in_flight=pipeline.in_flight)
+    await handler.close_async()  # no new events from here on
+    drained = await pipeline.drain(settings.INGEST_DRAIN_SECONDS)
+    if debouncer is not None:
+        await debouncer.close()  # open windows still get their agent run
+    reporter.cancel()
+    pipeline.log_report(final=True, drained=drained, **(debounce_metrics() if debounce_metrics else {}))
+    await dispose_async_engine()
+    return 0 if drained else 1
+
+
+def main():
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
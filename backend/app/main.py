@@ -1,10 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from backend.app.api.threads import router as threads_router
-import threading
-from backend.app.integrations.slack import start_slack_listener
+from backend.app.api.logs import router as logs_router
+from backend.app.api.database import router as database_router
+from backend.app.api.admin import router as admin_router
+from backend.app.agents.relevance import relevance_metrics
+from backend.app.core.tracing import trace_http_requests
+from backend.app.core.config import settings
+from backend.app.core.leader import LeaderElection
+from backend.app.core.openrouter import close_openrouter_client
+from backend.app.db.instrumentation import get_instrumentation
+from backend.app.db.session import dispose_engine
+from backend.app.integrations.slack import start_slack_listener, stop_slack_listener, debounce_metrics
 
-app = FastAPI()
+# Every API worker takes part in the election; only the leader holds the Slack
+# Socket Mode connection, so N workers still ingest each event once.
+slack_leader = LeaderElection("slack-listener", on_elected=start_slack_listener, on_demoted=stop_slack_listener)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The Slack App, OpenRouter client and DB engine are created on first use, not at
+    # import; startup only joins the listener election and shutdown releases what was built.
+    if settings.SLACK_LISTENER_IN_API:
+        slack_leader.start()
+    yield
+    slack_leader.stop()
+    await close_openrouter_client()
+    dispose_engine()
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -15,12 +41,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# One span per request; the trace id is returned in X-Trace-Id
+app.middleware("http")(trace_http_requests)
+
 app.include_router(threads_router)
+app.include_router(logs_router)
+app.include_router(database_router)
+app.include_router(admin_router)
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
-
-@app.on_event("startup")
-def startup_event():
-    threading.Thread(target=start_slack_listener, daemon=True).start() 
\ No newline at end of file
+    # Served from this process's state only: the leader is the holder the election
+    # thread saw on its last heartbeat; GET /api/v1/admin/leader looks it up live.
+    instrumentation = get_instrumentation()  # None until something in this process has used the DB
+    process = slack_leader.status()
+    return {
+        "status": "ok",
+        "leader": process["leader"],
+        "process": process,
+        "debounce": debounce_metrics(),
+        "relevance": relevance_metrics(),
+        "db_pool": instrumentation.pool_stats() if instrumentation else None,
+    }
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+from backend.app.schemas.base import RowSchema
+
+class AttachmentResponse(RowSchema):
+    id: int
+    thread_id: int
+    content_hash: str
+    filename: Optional[str] = None
+    created_at: Optional[datetime] = None
+    size: int
+    content_type: str
+    extraction_status: str
+    page_count: Optional[int] = None
+
+class UploadResponse(AttachmentResponse):
+    duplicate: bool  # the file was already stored; nothing new was written or queued for extraction
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, ConfigDict
+
+class RowSchema(BaseModel):
+    """
+    Base for response schemas that mirror a table.
+    Routes select exactly `columns()` with Core and hand the row mappings
+    straight to ORJSONResponse; the schema documents and validates the shape
+    without a per-row Pydantic round-trip on the hot path.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def columns(cls, table):
+        """Core columns of `table` backing this schema (non-column fields are skipped)."""
+        return [table.c[name] for name in cls.model_fields if name in table.c]
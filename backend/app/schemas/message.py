@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import Optional
+from backend.app.schemas.base import RowSchema
+
+class MessageResponse(RowSchema):
+    id: int
+    content: str
+    role: str
+    model: Optional[str] = None
+    created_at: Optional[datetime] = None
+    tool_call_id: Optional[str] = None  # Extend if tool calls are tracked
@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import Optional
+from backend.app.schemas.base import RowSchema
+
+class ProjectResponse(RowSchema):
+    id: int
+    name: str
+    description: Optional[str] = None
+    status: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
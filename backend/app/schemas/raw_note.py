@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import Optional
+from backend.app.schemas.base import RowSchema
+
+class RawNoteResponse(RowSchema):
+    id: int
+    source: str
+    source_note_id: str
+    content: str
+    content_hash: str
+    author: Optional[str] = None
+    channel: Optional[str] = None
+    received_at: Optional[datetime] = None
@@ -0,0 +1,27 @@
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from backend.app.schemas.base import RowSchema
+
+class TaskResponse(RowSchema):
+    id: int
+    description: str
+    assignee: Optional[str] = None
+    status: str
+    priority: Optional[int] = None
+    project_id: Optional[int] = None
+    due_date: Optional[date] = None
+    created_by: str
+    updated_by: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    description_hash: Optional[str] = None
+
+class ExtractedTask(BaseModel):
+    """One task as returned by the extraction LLM call (backend/app/agents/task_extractor.py)."""
+    note_ids: List[int] = []
+    description: str
+    assignee: Optional[str] = None
+    project: Optional[str] = None
+    priority: Optional[int] = Field(None, ge=1, le=5)
+    due_date: Optional[date] = None
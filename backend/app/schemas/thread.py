@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from backend.app.schemas.base import RowSchema
+
+class ThreadResponse(RowSchema):
+    id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    status: str
+    completed_at: Optional[datetime] = None
+    error_count: Optional[int] = None
+    last_error: Optional[str] = None
+    agent: Optional[str] = None
+    summary: Optional[str] = None
+
+class ThreadStatusResponse(BaseModel):
+    ok: bool
+    status: str
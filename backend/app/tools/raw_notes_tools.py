@@ -1,9 +1,42 @@
 import hashlib
 from datetime import datetime
-from backend.app.db.models import RawNote, Message
+from sqlalchemy import insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from backend.app.db.models import RawNote, RawNoteKey, Message
 from backend.app.db.session import get_db
+from backend.app.db.archive import thread_message_dicts
+from backend.app.schemas.raw_note import RawNoteResponse
 from backend.app.core.logging import logger
+from backend.app.core.tracing import traced
 
+def content_hash(content: str) -> str:
+    """Dedup key of a raw note."""
+    return hashlib.md5(content.encode()).hexdigest()
+
+def insert_note(note: dict, note_hash: str):
+    return insert(RawNote).values(**note, content_hash=note_hash, received_at=datetime.utcnow()).returning(RawNote.id)
+
+def claim_note_keys(note_id: int, note_hash: str, source_note_id: str):
+    """
+    Claim the note's dedup keys in the transaction that inserted it. Returns a row only
+    for the first writer; a concurrent writer of the same note waits for that one to
+    commit and gets nothing back, so it must roll its insert back.
+    """
+    return (
+        pg_insert(RawNoteKey)
+        .values(content_hash=note_hash, source_note_id=source_note_id, raw_note_id=note_id)
+        .on_conflict_do_nothing()
+        .returning(RawNoteKey.raw_note_id)
+    )
+
+def existing_note_id(note_hash: str, source_note_id: str):
+    return (
+        select(RawNoteKey.raw_note_id)
+        .where(or_(RawNoteKey.content_hash == note_hash, RawNoteKey.source_note_id == source_note_id))
+        .limit(1)
+    )
+
+@traced("tool.read_raw_notes")
 async def read_raw_notes(filters=None):
     """
     Read raw notes with optional filtering.
@@ -13,7 +46,8 @@ async def read_raw_notes(filters=None):
     try:
         filters = filters or {}
         db = next(get_db())
-        query = db.query(RawNote)
+        # Select only the response columns: no content_vector, no ORM instance state
+        query = db.query(*RawNoteResponse.columns(RawNote.__table__))
         if filters.get("source"):
             query = query.filter(RawNote.source == filters["source"])
         if filters.get("author"):
@@ -25,44 +59,40 @@ async def read_raw_notes(filters=None):
         if filters.get("content_query"):
             query = query.filter(RawNote.content.ilike(f"%{filters['content_query']}%"))
         notes = query.order_by(RawNote.received_at.desc()).limit(50).all()
-        notes_data = [note.__dict__ for note in notes]
+        notes_data = [dict(note._mapping) for note in notes]
         logger.info("Raw notes retrieved", count=len(notes_data), filters=filters)
         return {"ok": True, "data": notes_data}
     except Exception as e:
         logger.error("Error reading raw notes", error=str(e), filters=filters)
         return {"ok": False, "error": str(e)}
 
+@traced("tool.write_raw_notes")
 async def write_raw_notes(data):
     """
-    Write a new raw note, deduplicating by content_hash.
+    Write a new raw note, deduplicating by content_hash and source_note_id (raw_note_keys).
     Args: data: dict
     Returns: {"ok": True, "id": id} or {"ok": False, "error": ...}
     """
     try:
         db = next(get_db())
-        content = data["content"]
-        content_hash = hashlib.md5(content.encode()).hexdigest()
-        existing = db.query(RawNote).filter(RawNote.content_hash == content_hash).first()
-        if existing:
-            return {"ok": True, "id": existing.id}
-        note = RawNote(
-            source=data["source"],
-            source_note_id=data["source_note_id"],
-            content=content,
-            content_hash=content_hash,
-            author=data.get("author"),
-            channel=data.get("channel"),
-            received_at=datetime.utcnow()
-        )
-        db.add(note)
-        db.commit()
-        db.refresh(note)
-        logger.info("Raw note written", id=note.id)
-        return {"ok": True, "id": note.id}
+        note_hash = content_hash(data["content"])
+        note = {k: data.get(k) for k in ("source", "source_note_id", "content", "author", "channel")}
+        try:
+            note_id = db.execute(insert_note(note, note_hash)).scalar()
+            if db.execute(claim_note_keys(note_id, note_hash, note["source_note_id"])).first() is None:
+                db.rollback()
+                existing = db.execute(existing_note_id(note_hash, note["source_note_id"])).scalar()
+                return {"ok": True, "id": existing, "duplicate": True}
+            db.commit()
+        finally:
+            db.close()
+        logger.info("Raw note written", id=note_id)
+        return {"ok": True, "id": note_id}
     except Exception as e:
         logger.error("Error writing raw note", error=str(e), data=data)
         return {"ok": False, "error": str(e)}
 
+@traced("tool.write_message")
 async def write_message(data):
     """
     Write a new message to the messages table.
@@ -86,6 +116,7 @@ async def write_message(data):
         logger.error("Error writing message", error=str(e), data=data)
         return {"ok": False, "error": str(e)}
 
+@traced("tool.read_messages")
 async def read_messages(filters=None):
     """
     Read messages for a thread.
@@ -95,19 +126,7 @@ async def read_messages(filters=None):
     try:
         db = next(get_db())
         thread_id = filters["thread_id"]
-        query = db.query(Message).filter(Message.thread_id == thread_id).order_by(Message.created_at.asc())
-        messages = query.all()
-        messages_data = [
-            {
-                "id": m.id,
-                "content": m.content,
-                "role": m.role,
-                "model": m.model,
-                "created_at": m.created_at,
-                "tool_call_id": None  # Extend if tool calls are tracked
-            }
-            for m in messages
-        ]
+        messages_data = thread_message_dicts(db, thread_id)
         logger.info("Messages retrieved", count=len(messages_data), thread_id=thread_id)
         return {"ok": True, "data": messages_data}
     except Exception as e:
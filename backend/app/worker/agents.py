@@ -0,0 +1,35 @@
+import asyncio
+from backend.app.worker.embeddings import celery_app
+
+# The agent modules pull in LangGraph/LangChain and the OpenAI client (~1.5s); they are
+# imported by the task that runs them, so worker boot and callers of .delay() skip that.
+
+@celery_app.task
+def run_curator_task():
+    """Nightly Curator run over threads changed since its last successful run."""
+    from backend.app.agents.curator_agent import run_curator_agent
+    return asyncio.run(run_curator_agent())
+
+@celery_app.task
+def run_planner_task():
+    """Daily Planner run over tasks changed since its last successful run."""
+    from backend.app.agents.planner_agent import run_planner_agent
+    return asyncio.run(run_planner_agent())
+
+@celery_app.task
+def run_data_agent_task(note_ids, source_key=None):
+    """One Data Agent run over a debounced burst of newly ingested raw notes."""
+    from backend.app.agents.data_agent import run_data_agent_batch
+    return asyncio.run(run_data_agent_batch(note_ids, source_key))
+
+@celery_app.task
+def resume_data_agent_task(thread_id):
+    """Re-run a Data Agent thread that was resumed from the dashboard."""
+    from backend.app.agents.data_agent import resume_data_agent
+    return asyncio.run(resume_data_agent(thread_id))
+
+@celery_app.task
+def extract_tasks_task():
+    """Turn raw notes received since the last run into tasks, many notes per LLM call."""
+    from backend.app.agents.task_extractor import run_task_extractor
+    return asyncio.run(run_task_extractor())
\ No newline at end of file
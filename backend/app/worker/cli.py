@@ -0,0 +1,75 @@
+"""
+Start one Celery worker pool per queue with that queue's prefetch and autoscale bounds.
+
+    python -m backend.app.worker.cli                         # every queue
+    python -m backend.app.worker.cli embeddings agents       # selected queues
+    python -m backend.app.worker.cli agents --autoscale 16,4 # override bounds
+    python -m backend.app.worker.cli --dry-run               # print the commands only
+"""
+import argparse
+import signal
+import subprocess
+import sys
+import time
+from loguru import logger
+from backend.app.worker.queues import QUEUES, autoscale
+
+APP = "backend.app.worker.embeddings.celery_app"
+
+
+def worker_command(queue: str, bounds: tuple = None, loglevel: str = "info") -> list:
+    high, low = bounds or autoscale(queue)
+    return [
+        sys.executable, "-m", "celery", "-A", APP, "worker",
+        "-Q", queue,
+        "-n", f"{queue}@%h",
+        f"--autoscale={high},{low}",
+        f"--prefetch-multiplier={QUEUES[queue]['prefetch']}",
+        f"--loglevel={loglevel}",
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Start per-queue Celery worker pools")
+    parser.add_argument("queues", nargs="*", help=f"queues to serve: {', '.join(QUEUES)} (default: all)")
+    parser.add_argument("--autoscale", help="max,min processes; applies to every selected queue")
+    parser.add_argument("--loglevel", default="info")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    queues = args.queues or list(QUEUES)
+    unknown = [q for q in queues if q not in QUEUES]
+    if unknown:
+        parser.error(f"unknown queue(s): {', '.join(unknown)}")
+    bounds = tuple(int(n) for n in args.autoscale.split(",")) if args.autoscale else None
+    commands = {queue: worker_command(queue, bounds, args.loglevel) for queue in queues}
+    if args.dry_run:
+        for command in commands.values():
+            print(" ".join(command))
+        return 0
+
+    pools = {queue: subprocess.Popen(command) for queue, command in commands.items()}
+    logger.info("Worker pools started", pools={q: p.pid for q, p in pools.items()})
+
+    def stop(signum, frame):
+        logger.info("Stopping worker pools", signal=signum)
+        for pool in pools.values():
+            if pool.poll() is None:
+                pool.send_signal(signal.SIGTERM)  # warm shutdown: finish running tasks
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    exit_code = 0
+    while pools:
+        for queue, pool in list(pools.items()):
+            code = pool.poll()
+            if code is not None:
+                logger.info("Worker pool exited", queue=queue, code=code)
+                exit_code = exit_code or code
+                del pools[queue]
+        time.sleep(0.5)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Celery remote-control commands for live profiling of running workers.
+
+    celery -A backend.app.worker.embeddings.celery_app control profile 10 -d agents@host --timeout 20
+    celery -A backend.app.worker.embeddings.celery_app control memory_start -d agents@host
+    celery -A backend.app.worker.embeddings.celery_app control memory_diff 25 -d agents@host --timeout 10
+    celery -A backend.app.worker.embeddings.celery_app control memory_stop -d agents@host
+
+or `celery_app.control.broadcast("profile", arguments={"seconds": 10}, reply=True, timeout=20)`.
+
+Control commands run in the worker's main process, but prefork pools execute
+tasks in child processes. The main process therefore writes the request to
+PROFILE_DIR/request-<main pid>.json (the worker CLI runs one main process per
+queue on the same host, and a broadcast reaches all of them) and signals each
+child (SIGUSR2); the child reads its parent's request, runs the same
+`backend.app.core.profiling` action on a short-lived thread and writes its
+result next to the request, which the main process merges into the reply.
+Children do nothing until signalled. The main process is blocked for the
+profile window, so keep windows short on busy queues.
+"""
+import os
+import secrets
+import signal
+import threading
+import time
+from pathlib import Path
+import orjson
+from celery.signals import worker_process_init
+from celery.worker.control import control_command
+from backend.app.core import profiling
+from backend.app.core.logging import LOGS_DIR, logger
+
+PROFILE_DIR = Path(LOGS_DIR) / "profiles"
+PROFILE_SIGNAL = getattr(signal, "SIGUSR2", None)
+CHILD_GRACE_SECONDS = 5
+
+
+def run_action(action: str, params: dict) -> dict:
+    if action == "profile":
+        return profiling.profile(params.get("seconds", 10), params.get("interval", 0.005))
+    if action == "memory_start":
+        return profiling.start_allocation_tracking(params.get("frames", 25))
+    if action == "memory_diff":
+        return profiling.allocation_diff(params.get("limit", 25), params.get("key_type", "lineno"))
+    if action == "memory_stop":
+        return profiling.stop_allocation_tracking()
+    raise ValueError(f"Unknown profiling action: {action}")
+
+
+def request_path(main_pid: int) -> Path:
+    return PROFILE_DIR / f"request-{main_pid}.json"
+
+
+def _write_json(path: Path, payload: dict):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(orjson.dumps(payload))
+    os.replace(tmp, path)
+
+
+# -- child side ----------------------------------------------------------------
+
+def _serve_request():
+    try:
+        request = orjson.loads(request_path(os.getppid()).read_bytes())
+        try:
+            result = {"ok": True, **run_action(request["action"], request["params"])}
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+        _write_json(PROFILE_DIR / f"{request['id']}-{os.getpid()}.json", result)
+    except Exception as e:
+        logger.warning("Profiling request failed in pool process", error=str(e))
+
+
+def _on_profile_signal(signum, frame):
+    # signal handlers must return quickly; the work happens on a thread
+    threading.Thread(target=_serve_request, name="profiling", daemon=True).start()
+
+
+@worker_process_init.connect(weak=False)
+def install_profile_handler(**kwargs):
+    if PROFILE_SIGNAL is not None:
+        signal.signal(PROFILE_SIGNAL, _on_profile_signal)
+
+
+# -- main process side -----------------------------------------------------------
+
+def _pool_processes(state) -> list:
+    pool = getattr(state.consumer, "pool", None)
+    info = pool.info if pool is not None else {}
+    return [pid for pid in info.get("processes", []) if pid != os.getpid()]
+
+
+def dispatch(state, action: str, params: dict, wait: float) -> dict:
+    """Run `action` here and in every pool process; returns {"main": result, "<pid>": result}."""
+    children = _pool_processes(state) if PROFILE_SIGNAL is not None else []
+    request_id = secrets.token_hex(4)
+    if children:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        _write_json(request_path(os.getpid()), {"id": request_id, "action": action, "params": params})
+        for pid in children:
+            try:
+                os.kill(pid, PROFILE_SIGNAL)
+            except ProcessLookupError:
+                pass
+    try:
+        results = {"main": {"ok": True, **run_action(action, params)}}
+    except Exception as e:
+        results = {"main": {"ok": False, "error": str(e)}}
+    deadline = time.monotonic() + wait
+    pending = set(children)
+    while pending and time.monotonic() < deadline:
+        for pid in list(pending):
+            path = PROFILE_DIR / f"{request_id}-{pid}.json"
+            if path.exists():
+                results[str(pid)] = orjson.loads(path.read_bytes())
+                path.unlink()
+                pending.discard(pid)
+        if pending:
+            time.sleep(0.1)
+    for pid in pending:
+        results[str(pid)] = {"ok": False, "error": "no reply from pool process"}
+    if children:
+        request_path(os.getpid()).unlink(missing_ok=True)
+    return results
+
+
+def merge_collapsed(results: dict) -> str:
+    """One collapsed-stack file for all processes, each stack rooted at its process."""
+    lines = []
+    for process, result in results.items():
+        root = "process:main" if process == "main" else f"process:{process}"
+        for line in result.get("collapsed", "").splitlines():
+            lines.append(f"{root};{line}\n")
+    return "".join(lines)
+
+
+@control_command(
+    args=[('seconds', float), ('interval_ms', float)],
+    signature='[seconds=10 [interval_ms=5]]',
+)
+def profile(state, seconds=10, interval_ms=5, **kwargs):
+    """Sampling profile of the worker and its pool processes (collapsed stacks)."""
+    seconds = min(float(seconds), profiling.MAX_PROFILE_SECONDS)
+    logger.info("Worker profile started", seconds=seconds, interval_ms=interval_ms)
+    results = dispatch(state, "profile", {"seconds": seconds, "interval": float(interval_ms) / 1000}, CHILD_GRACE_SECONDS)
+    return {
+        "samples": {process: result.get("samples", 0) for process, result in results.items()},
+        "errors": {process: result["error"] for process, result in results.items() if not result.get("ok")},
+        "collapsed": merge_collapsed(results),
+    }
+
+
+@control_command(args=[('frames', int)], signature='[frames=25]')
+def memory_start(state, frames=25, **kwargs):
+    """Start tracemalloc in the worker and its pool processes."""
+    return dispatch(state, "memory_start", {"frames": int(frames)}, CHILD_GRACE_SECONDS)
+
+
+@control_command(args=[('limit', int), ('key_type', str)], signature='[limit=25 [key_type=lineno]]')
+def memory_diff(state, limit=25, key_type="lineno", **kwargs):
+    """Allocation growth since memory_start, per process."""
+    return dispatch(state, "memory_diff", {"limit": int(limit), "key_type": key_type}, CHILD_GRACE_SECONDS)
+
+
+@control_command()
+def memory_stop(state, **kwargs):
+    return dispatch(state, "memory_stop", {}, CHILD_GRACE_SECONDS)
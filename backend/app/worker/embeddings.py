@@ -1,24 +1,73 @@
 from celery import Celery
+from celery.schedules import crontab
 from backend.app.core.config import settings  # Adjust if config is elsewhere
-from backend.app.db.session import get_db  # adjust if needed
 from loguru import logger
+from backend.app.worker.queues import task_queues, route_task, QueueAnnotations, DEFAULT_QUEUE, SERIALIZER
+from backend.app.core.tracing import install_celery_tracing
+import backend.app.worker.control  # noqa: F401  registers the profiling remote-control commands
 
 # Celery app definition
 celery_app = Celery(
     'embeddings',
     broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=['backend.app.worker.maintenance', 'backend.app.worker.agents', 'backend.app.worker.uploads', 'backend.app.worker.sync'],
 )
 
 celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    task_serializer=SERIALIZER,
+    accept_content=[SERIALIZER, 'json'],
+    result_serializer=SERIALIZER,
+    # Nobody reads most results; tasks that need one opt in with ignore_result=False
+    task_ignore_result=True,
+    result_expires=3600,
+    task_queues=task_queues,
+    task_default_queue=DEFAULT_QUEUE,
+    task_routes=(route_task,),
+    task_annotations=(QueueAnnotations(),),
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
     timezone='UTC',
     enable_utc=True,
+    beat_schedule={
+        'curator-agent': {
+            'task': 'backend.app.worker.agents.run_curator_task',
+            'schedule': crontab(hour=0, minute=0),
+        },
+        'planner-agent': {
+            'task': 'backend.app.worker.agents.run_planner_task',
+            'schedule': crontab(hour=3, minute=0),
+        },
+        'extract-tasks': {
+            'task': 'backend.app.worker.agents.extract_tasks_task',
+            'schedule': crontab(minute='*/15'),
+        },
+        'index-logs': {
+            'task': 'backend.app.worker.maintenance.index_logs_task',
+            'schedule': crontab(hour=0, minute=5),
+        },
+        'maintain-partitions': {
+            'task': 'backend.app.worker.maintenance.maintain_partitions_task',
+            'schedule': crontab(hour=1, minute=30),
+        },
+        'train-archive-dictionary': {
+            'task': 'backend.app.worker.maintenance.train_archive_dictionary_task',
+            'schedule': crontab(hour=1, minute=45, day_of_week=0),
+        },
+        'train-relevance-model': {
+            'task': 'backend.app.worker.maintenance.train_relevance_model_task',
+            'schedule': crontab(hour=1, minute=50, day_of_week=0),
+        },
+        'archive-finished-threads': {
+            'task': 'backend.app.worker.maintenance.archive_finished_threads_task',
+            'schedule': crontab(hour=2, minute=0),
+        },
+    },
 )
 
-@celery_app.task
+install_celery_tracing(celery_app)
+
+@celery_app.task(ignore_result=False)
 def test_task(x, y):
     return x + y
 
@@ -0,0 +1,57 @@
+from backend.app.worker.embeddings import celery_app
+from backend.app.db.session import get_db
+from backend.app.db.partitions import maintain_partitions
+from backend.app.db.archive import archive_finished_threads, train_dictionary
+from backend.app.core.log_search import build_indexes
+from backend.app.agents.relevance import train_relevance_model
+from loguru import logger
+
+@celery_app.task
+def maintain_partitions_task():
+    """Pre-create next months' raw_notes/messages partitions and drop expired ones."""
+    db = next(get_db())
+    try:
+        result = maintain_partitions(db)
+    finally:
+        db.close()
+    if not result["ok"]:
+        logger.error('Partition maintenance task failed', error=result["error"])
+    return result
+
+@celery_app.task
+def archive_finished_threads_task():
+    """Move finished threads' messages into compressed cold storage."""
+    db = next(get_db())
+    try:
+        return archive_finished_threads(db)
+    finally:
+        db.close()
+
+@celery_app.task
+def train_archive_dictionary_task():
+    """Retrain the zstd dictionary used for new thread archives."""
+    db = next(get_db())
+    try:
+        result = train_dictionary(db)
+    finally:
+        db.close()
+    if not result["ok"]:
+        logger.warning('Archive dictionary not trained', error=result["error"])
+    return result
+
+@celery_app.task
+def train_relevance_model_task():
+    """Retrain the Data Agent relevance pre-filter from recent agent decisions."""
+    db = next(get_db())
+    try:
+        result = train_relevance_model(db)
+    finally:
+        db.close()
+    if not result["ok"]:
+        logger.warning('Relevance model not trained', error=result["error"])
+    return result
+
+@celery_app.task
+def index_logs_task():
+    """Build sidecar indexes for freshly rotated log files and drop stale ones."""
+    return build_indexes()
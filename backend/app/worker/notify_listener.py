@@ -0,0 +1,259 @@
+"""
+Event-driven agent dispatch over Postgres LISTEN/NOTIFY.
+
+    python -m backend.app.worker.notify_listener
+
+Listens on the channels fed by the triggers in backend/app/db/notify.py and
+dispatches without polling:
+  - raw_notes_inserted:    new notes from any source go through the burst
+                           debouncer, then one Data Agent run per window
+                           (only with AGENT_TRIGGER=notify; otherwise
+                           ingestion launches those runs and notes are only
+                           tracked)
+  - thread_status_changed: a data_agent thread resumed from the dashboard
+                           (paused -> active) is re-run on the agents queue
+
+NOTIFY is fire-and-forget, so the listener remembers the last raw note id and
+thread (updated_at, id) it handled in agent_watermarks. After (re)connecting it
+LISTENs first and then catches up with a keyset scan from those marks, so
+nothing committed while it was away is missed. Replayed thread changes carry
+no old status, so a resume made while the listener was away is recognised by
+the persisted threads.resume_requested_at that POST /threads/{id}/resume sets
+and resume_data_agent clears; a thread replayed for any other change (a run
+finishing, a summary written) is left alone.
+
+Only one listener dispatches at a time: it holds an advisory lock on its
+listening connection, and standby instances retry until the lock frees up.
+"""
+import asyncio
+import signal
+from collections import deque
+from datetime import datetime
+import orjson
+from backend.app.agents.debounce import BurstDebouncer, enqueue_data_agent
+from backend.app.core.config import settings
+from backend.app.core.leader import LOCK_NAMESPACE, lock_key
+from backend.app.core.logging import logger
+from backend.app.db.async_session import asyncpg_dsn
+from backend.app.db.notify import CHANNELS, RAW_NOTES_CHANNEL, THREADS_CHANNEL
+
+LOCK_NAME = "notify-listener"
+RAW_NOTES_MARK = "notify:raw_notes"
+THREADS_MARK = "notify:threads"
+CATCH_UP_PAGE = 1000
+# Ids are handed out at insert but notified at commit, so a lower id can commit after a higher
+# one. A reconnecting listener re-scans this many ids below its mark; its seen-set drops repeats.
+CATCH_UP_OVERLAP = 500
+
+
+def resume_thread(event: dict):
+    resumed = event.get("old_status") == "paused" or event.get("missed_resume")
+    if resumed and event["status"] == "active" and event.get("agent") == "data_agent":
+        from backend.app.worker.agents import resume_data_agent_task
+        resume_data_agent_task.delay(event["id"])
+
+
+class NotifyDispatcher:
+    """Routes decoded notifications to handlers, drops repeats, and tracks the marks to persist."""
+
+    def __init__(self, on_raw_note, on_thread_status, seen: int = 10000):
+        self.on_raw_note = on_raw_note
+        self.on_thread_status = on_thread_status
+        self.last_note_id = None
+        self.thread_mark = None  # (updated_at, id)
+        self.dispatched = {RAW_NOTES_CHANNEL: 0, THREADS_CHANNEL: 0}
+        self.unsaved = {RAW_NOTES_CHANNEL: 0, THREADS_CHANNEL: 0}
+        # ids arrive in commit order, not id order, so repeats (catch-up overlapping live
+        # notifications) are dropped by membership rather than by comparing with the mark
+        self._recent_notes = deque(maxlen=seen)
+        self._recent_note_set = set()
+
+    def _remember_note(self, note_id: int) -> bool:
+        if note_id in self._recent_note_set:
+            return False
+        if len(self._recent_notes) == self._recent_notes.maxlen:
+            self._recent_note_set.discard(self._recent_notes[0])
+        self._recent_notes.append(note_id)
+        self._recent_note_set.add(note_id)
+        return True
+
+    async def raw_note(self, event: dict):
+        self.last_note_id = max(self.last_note_id or 0, event["id"])
+        if not self._remember_note(event["id"]):
+            return
+        self.dispatched[RAW_NOTES_CHANNEL] += 1
+        self.unsaved[RAW_NOTES_CHANNEL] += 1
+        await self.on_raw_note(event)
+
+    async def thread_status(self, event: dict):
+        updated_at = event.get("updated_at")
+        if isinstance(updated_at, str):
+            updated_at = datetime.fromisoformat(updated_at)
+        if updated_at is not None:
+            mark = (updated_at, event["id"])
+            if self.thread_mark is None or mark > self.thread_mark:
+                self.thread_mark = mark
+        self.dispatched[THREADS_CHANNEL] += 1
+        self.unsaved[THREADS_CHANNEL] += 1
+        await self.on_thread_status(event)
+
+    async def notification(self, channel: str, payload: str):
+        event = orjson.loads(payload)
+        if channel == RAW_NOTES_CHANNEL:
+            await self.raw_note(event)
+        elif channel == THREADS_CHANNEL:
+            await self.thread_status(event)
+
+
+async def load_marks(conn, dispatcher: NotifyDispatcher):
+    """Resume from the persisted marks; a first run starts from the current tail instead of replaying history."""
+    rows = {
+        row["agent"]: row
+        for row in await conn.fetch(
+            "SELECT agent, high_water_mark, high_water_id FROM agent_watermarks WHERE agent = ANY($1::text[])",
+            [RAW_NOTES_MARK, THREADS_MARK],
+        )
+    }
+    # after a reconnect the in-memory marks may be ahead of the last save
+    if RAW_NOTES_MARK in rows:
+        dispatcher.last_note_id = max(dispatcher.last_note_id or 0, rows[RAW_NOTES_MARK]["high_water_id"] or 0)
+    elif dispatcher.last_note_id is None:
+        dispatcher.last_note_id = await conn.fetchval("SELECT COALESCE(MAX(id), 0) FROM raw_notes")
+    if THREADS_MARK in rows and rows[THREADS_MARK]["high_water_mark"] is not None:
+        saved = (rows[THREADS_MARK]["high_water_mark"], rows[THREADS_MARK]["high_water_id"])
+        dispatcher.thread_mark = max(dispatcher.thread_mark, saved) if dispatcher.thread_mark else saved
+    elif dispatcher.thread_mark is None:
+        dispatcher.thread_mark = (datetime.utcnow(), 0)
+
+
+async def save_marks(conn, dispatcher: NotifyDispatcher):
+    upsert = (
+        "INSERT INTO agent_watermarks (agent, high_water_mark, high_water_id, last_run_at, rows_processed) "
+        "VALUES ($1, $2, $3, (now() AT TIME ZONE 'utc'), $4) "
+        "ON CONFLICT (agent) DO UPDATE SET high_water_mark = EXCLUDED.high_water_mark, "
+        "high_water_id = EXCLUDED.high_water_id, last_run_at = EXCLUDED.last_run_at, "
+        "rows_processed = COALESCE(agent_watermarks.rows_processed, 0) + EXCLUDED.rows_processed"
+    )
+    if dispatcher.last_note_id is not None:
+        await conn.execute(upsert, RAW_NOTES_MARK, None, dispatcher.last_note_id, dispatcher.unsaved[RAW_NOTES_CHANNEL])
+    if dispatcher.thread_mark is not None:
+        await conn.execute(upsert, THREADS_MARK, dispatcher.thread_mark[0], dispatcher.thread_mark[1], dispatcher.unsaved[THREADS_CHANNEL])
+    dispatcher.unsaved = {RAW_NOTES_CHANNEL: 0, THREADS_CHANNEL: 0}
+
+
+async def catch_up(conn, dispatcher: NotifyDispatcher, overlap: int = 0) -> int:
+    """Dispatch rows committed since the marks (keyset pages); returns how many were replayed."""
+    replayed = 0
+    after = max((dispatcher.last_note_id or 0) - overlap, 0)
+    while True:
+        rows = await conn.fetch(
+            "SELECT id, source, channel FROM raw_notes WHERE id > $1 ORDER BY id LIMIT $2",
+            after, CATCH_UP_PAGE,
+        )
+        for row in rows:
+            await dispatcher.raw_note(dict(row))
+        replayed += len(rows)
+        if len(rows) < CATCH_UP_PAGE:
+            break
+        after = rows[-1]["id"]
+    while dispatcher.thread_mark is not None:
+        rows = await conn.fetch(
+            "SELECT id, status, agent, updated_at, "
+            "(status = 'active' AND agent = 'data_agent' AND resume_requested_at IS NOT NULL) AS missed_resume "
+            "FROM threads WHERE (updated_at, id) > ($1::timestamp, $2::int) "
+            "ORDER BY updated_at, id LIMIT $3",
+            dispatcher.thread_mark[0], dispatcher.thread_mark[1], CATCH_UP_PAGE,
+        )
+        for row in rows:
+            await dispatcher.thread_status({**dict(row), "old_status": None})
+        replayed += len(rows)
+        if len(rows) < CATCH_UP_PAGE:
+            break
+    return replayed
+
+
+async def listen(dispatcher: NotifyDispatcher, stop: asyncio.Event):
+    """One connection's lifetime: lock, LISTEN, catch up, then dispatch until the connection or `stop` ends it."""
+    import asyncpg
+
+    conn = await asyncpg.connect(asyncpg_dsn(), server_settings={"application_name": f"tasuke-{LOCK_NAME}"})
+    try:
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1, $2)", LOCK_NAMESPACE, lock_key(LOCK_NAME)):
+            logger.info("Notify listener on standby; another instance holds the lock")
+            await asyncio.wait_for(stop.wait(), settings.LEADER_HEARTBEAT_SECONDS * 2)
+            return
+        queue = asyncio.Queue()
+        for channel in CHANNELS:
+            await conn.add_listener(channel, lambda _conn, _pid, ch, payload: queue.put_nowait((ch, payload)))
+        # a cold start trusts the persisted mark; a reconnect still has its seen-set and can overlap
+        reconnect = dispatcher.last_note_id is not None
+        await load_marks(conn, dispatcher)
+        replayed = await catch_up(conn, dispatcher, CATCH_UP_OVERLAP if reconnect else 0)
+        await save_marks(conn, dispatcher)
+        logger.info("Notify listener connected", channels=CHANNELS, replayed=replayed, last_note_id=dispatcher.last_note_id)
+        dirty = False
+        while not stop.is_set():
+            try:
+                channel, payload = await asyncio.wait_for(queue.get(), settings.LEADER_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # quiet period: persist marks and make sure the connection is still alive
+                if dirty:
+                    await save_marks(conn, dispatcher)
+                    dirty = False
+                await conn.fetchval("SELECT 1")
+                continue
+            try:
+                await dispatcher.notification(channel, payload)
+                dirty = True
+            except Exception as e:
+                logger.error("Notify dispatch failed", channel=channel, payload=payload, error=str(e))
+        await save_marks(conn, dispatcher)
+    finally:
+        await conn.close()  # also releases the advisory lock
+
+
+async def run():
+    debouncer = BurstDebouncer(enqueue_data_agent)
+    dispatch_notes = settings.AGENT_TRIGGER == "notify"
+    if not dispatch_notes:
+        # ingestion already launches Data Agent runs; dispatching here too would run every burst twice
+        logger.warning("AGENT_TRIGGER is not 'notify'; raw notes are left to ingestion, only thread resumes are dispatched", agent_trigger=settings.AGENT_TRIGGER)
+
+    async def on_raw_note(event):
+        if dispatch_notes:
+            debouncer.add(event.get("channel") or event.get("source") or "", event["id"])
+
+    async def on_thread_status(event):
+        await asyncio.to_thread(resume_thread, event)
+
+    dispatcher = NotifyDispatcher(on_raw_note, on_thread_status)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    backoff = 1
+    while not stop.is_set():
+        try:
+            await listen(dispatcher, stop)
+            backoff = 1
+        except asyncio.TimeoutError:
+            continue  # standby wait elapsed; try for the lock again
+        except Exception as e:
+            logger.warning("Notify listener connection lost", error=str(e), retry_in=backoff)
+            try:
+                await asyncio.wait_for(stop.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, 30)
+    await debouncer.close()
+    logger.info("Notify listener stopped", dispatched=dispatcher.dispatched, debounce=debouncer.metrics())
+    return 0
+
+
+def main():
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
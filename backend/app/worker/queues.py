@@ -0,0 +1,74 @@
+"""
+Celery queue topology.
+
+Each kind of work gets its own queue so a long embedding batch can't hold up an
+agent run, an attachment extraction or a quick sync job. Tasks are routed by
+module; anything without a module of its own (celery's built-in tasks) goes to
+the sync queue with the other short fire-and-forget jobs. Queue profiles set the
+`acks_late` behaviour of their tasks and the prefetch/autoscale bounds the
+worker CLI (backend/app/worker/cli.py) starts each pool with.
+"""
+import os
+from kombu import Exchange, Queue
+from kombu.serialization import register
+import ormsgpack
+
+# queue -> profile. autoscale is (max, min) like celery's --autoscale flag and
+# can be overridden with CELERY_<QUEUE>_AUTOSCALE="max,min".
+#   embeddings   short idempotent batches: prefetch a few to keep the pool busy, redeliver on a crash
+#   agents       long LLM runs: one at a time, and acked on receipt so a lost worker doesn't repeat
+#                the LLM calls (scheduled runs recover through their watermark claim)
+#   uploads      CPU-bound PDF extraction, idempotent through its claim: one at a time, redelivered
+#   sync         quick Slack/API jobs, deduplicated on write: prefetch many, no redelivery needed
+#   maintenance  nightly jobs that must finish: a single process, redelivered on a crash
+QUEUES = {
+    "embeddings": {"modules": ["backend.app.worker.embeddings"], "prefetch": 4, "acks_late": True, "autoscale": (4, 1)},
+    "agents": {"modules": ["backend.app.worker.agents"], "prefetch": 1, "acks_late": False, "autoscale": (4, 1)},
+    "uploads": {"modules": ["backend.app.worker.uploads"], "prefetch": 1, "acks_late": True, "autoscale": (2, 1)},
+    "sync": {"modules": ["backend.app.worker.sync"], "prefetch": 8, "acks_late": False, "autoscale": (8, 2)},
+    "maintenance": {"modules": ["backend.app.worker.maintenance"], "prefetch": 1, "acks_late": True, "autoscale": (1, 1)},
+}
+DEFAULT_QUEUE = "sync"
+
+SERIALIZER = "ormsgpack"
+
+
+def autoscale(queue: str) -> tuple:
+    override = os.getenv(f"CELERY_{queue.upper()}_AUTOSCALE")
+    if override:
+        high, low = (int(part) for part in override.split(","))
+        return high, low
+    return QUEUES[queue]["autoscale"]
+
+
+def queue_for(task_name: str) -> str:
+    for queue, profile in QUEUES.items():
+        if any(task_name.startswith(module + ".") for module in profile["modules"]):
+            return queue
+    return DEFAULT_QUEUE
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """Celery task_routes hook: route by the module the task is defined in."""
+    return {"queue": queue_for(name)}
+
+
+class QueueAnnotations:
+    """Apply the queue profile's acks_late to every task routed to that queue."""
+    def annotate(self, task):
+        return {"acks_late": QUEUES[queue_for(task.name)]["acks_late"]}
+
+
+def _dumps(obj):
+    return ormsgpack.packb(obj, option=ormsgpack.OPT_NON_STR_KEYS)
+
+
+def _loads(data):
+    return ormsgpack.unpackb(data, option=ormsgpack.OPT_NON_STR_KEYS)
+
+
+# ormsgpack is already pinned and serializes datetimes (as ISO strings); register it under
+# its own content type so it can't be confused with kombu's msgpack serializer.
+register(SERIALIZER, _dumps, _loads, content_type="application/x-ormsgpack", content_encoding="binary")
+
+task_queues = [Queue(name, Exchange(name), routing_key=name) for name in QUEUES]
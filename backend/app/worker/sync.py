@@ -0,0 +1,27 @@
+import asyncio
+import os
+from backend.app.worker.embeddings import celery_app
+from backend.app.integrations.slack_events import note_from_event
+from backend.app.tools.raw_notes_tools import write_raw_notes
+from loguru import logger
+
+@celery_app.task
+def sync_slack_history_task(channel, limit=100):
+    """Backfill a channel's recent Slack history into raw_notes; notes already filed are deduplicated."""
+    from slack_sdk import WebClient  # Slack loads only when a sync actually runs
+
+    messages = WebClient(token=os.getenv("SLACK_BOT_TOKEN")).conversations_history(channel=channel, limit=limit).get("messages", [])
+    notes = [note for note in (note_from_event({**msg, "channel": channel}) for msg in messages) if note is not None]
+
+    async def write_all():
+        return [await write_raw_notes(note) for note in notes]
+
+    results = asyncio.run(write_all())
+    stats = {
+        "messages": len(messages),
+        "written": sum(1 for r in results if r["ok"] and not r.get("duplicate")),
+        "duplicates": sum(1 for r in results if r.get("duplicate")),
+        "failed": sum(1 for r in results if not r["ok"]),
+    }
+    logger.info('Slack history synced', channel=channel, **stats)
+    return {"ok": stats["failed"] == 0, **stats}
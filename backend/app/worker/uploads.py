@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, update
+from backend.app.worker.embeddings import celery_app
+from backend.app.core.config import settings
+from backend.app.db.session import get_db
+from backend.app.db.models import Upload
+from backend.app.core.uploads import extract_pdf
+from loguru import logger
+
+def claim_upload(db, content_hash):
+    """
+    Mark the upload 'running' and commit, so no row lock is held while the PDF
+    is read (a lock would block the FK check of every attachment insert).
+    extracted_at holds the claim time until the result is written; a claim
+    older than UPLOAD_EXTRACT_CLAIM_TIMEOUT_MINUTES can be taken over.
+    Returns (claimed_at, content_type), or None if there is nothing to do.
+    """
+    now = datetime.utcnow()
+    expired = now - timedelta(minutes=settings.UPLOAD_EXTRACT_CLAIM_TIMEOUT_MINUTES)
+    row = db.execute(
+        update(Upload)
+        .where(Upload.content_hash == content_hash)
+        .where(or_(
+            Upload.extraction_status.in_(("pending", "failed")),
+            and_(Upload.extraction_status == "running", Upload.extracted_at < expired),
+        ))
+        .values(extraction_status="running", extracted_at=now)
+        .returning(Upload.content_type)
+    ).first()
+    db.commit()
+    return (now, row.content_type) if row else None
+
+def finish_upload(db, content_hash, claimed_at, **values) -> bool:
+    """Write the result if the claim is still ours; False if it expired and was taken over."""
+    result = db.execute(
+        update(Upload)
+        .where(Upload.content_hash == content_hash)
+        .where(Upload.extraction_status == "running", Upload.extracted_at == claimed_at)
+        .values(extracted_at=datetime.utcnow(), **values)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+@celery_app.task
+def extract_upload_task(content_hash):
+    """Extract a stored PDF's text and first-page thumbnail once per content hash."""
+    db = next(get_db())
+    try:
+        claim = claim_upload(db, content_hash)
+        if claim is None:
+            # unknown, already extracted or skipped, or another worker is on it
+            return {"ok": True, "cached": db.get(Upload, content_hash) is not None}
+        claimed_at, content_type = claim
+        if content_type != "application/pdf":
+            finish_upload(db, content_hash, claimed_at, extraction_status="skipped")
+            return {"ok": True, "skipped": True}
+        try:
+            result = extract_pdf(content_hash)
+        except Exception as e:
+            finish_upload(db, content_hash, claimed_at, extraction_status="failed", extraction_error=str(e))
+            logger.error('Upload extraction failed', content_hash=content_hash, error=str(e))
+            return {"ok": False, "error": str(e)}
+        if not finish_upload(
+            db, content_hash, claimed_at,
+            extracted_text=result["text"],
+            page_count=result["page_count"],
+            thumbnail=result["thumbnail"],
+            extraction_status="done",
+            extraction_error=None,
+        ):
+            logger.warning('Upload extraction claim taken over', content_hash=content_hash)
+            return {"ok": False, "error": "claim expired"}
+        logger.info('Upload extracted', content_hash=content_hash, pages=result["page_count"], chars=len(result["text"]))
+        return {"ok": True, "pages": result["page_count"]}
+    finally:
+        db.close()
@@ -0,0 +1 @@
+# Offline micro-benchmarks; run as modules, e.g. python -m backend.benchmarks.bench_serialization
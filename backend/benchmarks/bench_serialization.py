@@ -0,0 +1,75 @@
+"""
+Per-request serialization cost of GET /api/v1/threads/{id}/messages for a 1k-message thread.
+
+Compares FastAPI's default path (response_model validation + jsonable_encoder +
+json.dumps), Pydantic v2 validate + dump_json, and the ORJSONResponse path the
+threads router uses (row dicts straight into orjson). No database needed.
+
+    python -m backend.benchmarks.bench_serialization --messages 1000 --repeat 200
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from backend.app.schemas.message import MessageResponse
+
+def make_messages(n: int) -> list:
+    start = datetime(2025, 6, 1, 9, 0)
+    return [
+        {
+            "id": i,
+            "content": "Pre session doc and deck for this weekend are in the shared drive. " * 4,
+            "role": "assistant" if i % 2 else "user",
+            "model": "anthropic/claude-3-haiku" if i % 2 else None,
+            "created_at": start + timedelta(seconds=i),
+            "tool_call_id": None,
+        }
+        for i in range(n)
+    ]
+
+def fastapi_default(messages):
+    adapter = TypeAdapter(List[MessageResponse])
+    validated = adapter.validate_python(messages)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+def pydantic_dump_json(messages):
+    adapter = TypeAdapter(List[MessageResponse])
+    return adapter.dump_json(adapter.validate_python(messages))
+
+def orjson_direct(messages):
+    return ORJSONResponse(messages).body
+
+def measure(fn, messages, repeat: int) -> dict:
+    fn(messages)  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(messages)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+        "bytes": len(fn(messages)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    messages = make_messages(args.messages)
+    results = {
+        "fastapi_default": measure(fastapi_default, messages, args.repeat),
+        "pydantic_dump_json": measure(pydantic_dump_json, messages, args.repeat),
+        "orjson_direct": measure(orjson_direct, messages, args.repeat),
+    }
+    print(json.dumps({"messages": args.messages, "repeat": args.repeat, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Local stand-ins for OpenRouter and Slack so benchmarks never leave the machine.
+
+FakeOpenAIServer speaks enough of the OpenAI chat completions API for the
+`openai` client (and therefore OpenRouterClient): it waits `latency_ms` before
+the first token, then `completion_tokens / tokens_per_sec` for the rest, and
+answers with a tool call for `tool_call_rate` of the requests that offer tools.
+
+FakeSlackSource produces Slack `message` events (and conversations.history
+pages for scripts/slack_sync.py) with thread replies, bot/edit noise and
+re-delivered duplicates in realistic proportions. Both are seeded, so two runs
+with the same options see the same traffic.
+"""
+import asyncio
+import random
+import threading
+import time
+import uuid
+from aiohttp import web
+
+WORDS = (
+    "deck session weekend doc shared drive codebase notebook review deadline client invoice "
+    "roadmap sprint blocker release meeting notes follow up budget proposal draft feedback "
+    "launch metrics hiring onboarding design sync standup demo contract timeline"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+class FakeOpenAIServer:
+    """OpenAI-compatible /v1/chat/completions on a background event loop; use as a context manager."""
+
+    def __init__(
+        self,
+        latency_ms: float = 400,
+        tokens_per_sec: float = 80,
+        completion_tokens: int = 120,
+        tool_call_rate: float = 0.5,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.completion_tokens = completion_tokens
+        self.tool_call_rate = tool_call_rate
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.tool_call_responses = 0
+        self.prompt_tokens = 0
+        self._rng = random.Random(seed)
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def response_seconds(self) -> float:
+        return self.latency_ms / 1000 + (self.completion_tokens / self.tokens_per_sec if self.tokens_per_sec else 0)
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if body.get("stream"):
+            return web.json_response({"error": {"message": "streaming is not supported by the fake server"}}, status=400)
+        self.requests += 1
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in body.get("messages", [])) // 4
+        self.prompt_tokens += prompt_tokens
+        await asyncio.sleep(self.response_seconds())
+        message = {"role": "assistant", "content": sentence(self._rng, max(self.completion_tokens // 2, 1))}
+        finish_reason = "stop"
+        tools = body.get("tools") or []
+        if tools and self._rng.random() < self.tool_call_rate:
+            tool = self._rng.choice(tools)["function"]["name"]
+            message["tool_calls"] = [
+                {"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function", "function": {"name": tool, "arguments": "{}"}}
+            ]
+            finish_reason = "tool_calls"
+            self.tool_call_responses += 1
+        return web.json_response({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or "fake/model",
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": prompt_tokens + self.completion_tokens,
+            },
+        })
+
+    async def _start(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def start(self) -> "FakeOpenAIServer":
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(timeout=10)
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "tool_call_responses": self.tool_call_responses,
+            "prompt_tokens": self.prompt_tokens,
+            "latency_ms": self.latency_ms,
+            "tokens_per_sec": self.tokens_per_sec,
+            "completion_tokens": self.completion_tokens,
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeSlackSource:
+    """Seeded Slack `message` events across a handful of channels and users."""
+
+    def __init__(
+        self,
+        channels: int = 8,
+        users: int = 25,
+        thread_rate: float = 0.3,
+        noise_rate: float = 0.05,
+        duplicate_rate: float = 0.02,
+        seed: int = 0,
+        prefix: str = "",
+    ):
+        self.prefix = prefix  # lets a run find (and delete) the rows it wrote
+        self.channels = [f"C{n:08d}" for n in range(channels)]
+        self.users = [f"U{n:08d}" for n in range(users)]
+        self.thread_rate = thread_rate
+        self.noise_rate = noise_rate
+        self.duplicate_rate = duplicate_rate
+        self._rng = random.Random(seed)
+        self._ts = 1_750_000_000.0
+        self._roots = {channel: [] for channel in self.channels}
+        self._sent = []
+
+    def _next_ts(self) -> str:
+        self._ts += self._rng.uniform(0.5, 30)
+        return f"{self._ts:.6f}"
+
+    def event(self) -> dict:
+        rng = self._rng
+        if self._sent and rng.random() < self.duplicate_rate:
+            return dict(rng.choice(self._sent))  # Slack retries re-deliver the same event
+        channel = rng.choice(self.channels)
+        event = {
+            "type": "message",
+            "channel": channel,
+            "user": rng.choice(self.users),
+            "text": self.prefix + " ".join(sentence(rng, rng.randint(6, 30)) for _ in range(rng.randint(1, 4))),
+            "ts": self._next_ts(),
+            "client_msg_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        }
+        if rng.random() < self.noise_rate:
+            event["subtype"] = rng.choice(["bot_message", "message_changed", "channel_join"])
+        elif self._roots[channel] and rng.random() < self.thread_rate:
+            event["thread_ts"] = rng.choice(self._roots[channel][-20:])
+        else:
+            self._roots[channel].append(event["ts"])
+        self._sent.append(event)
+        return event
+
+    def events(self, n: int) -> list:
+        return [self.event() for _ in range(n)]
+
+    def web_client(self, history: int = 100) -> "FakeSlackWebClient":
+        return FakeSlackWebClient(self, history)
+
+
+class FakeSlackWebClient:
+    """The slice of slack_sdk.WebClient that scripts/slack_sync.py calls."""
+
+    def __init__(self, source: FakeSlackSource, history: int):
+        self.source = source
+        self.history = history
+        self.calls = 0
+
+    def conversations_history(self, channel: str, limit: int = 100, **kwargs) -> dict:
+        self.calls += 1
+        messages = [{k: v for k, v in e.items() if k != "channel"} for e in self.source.events(min(limit, self.history))]
+        return {"ok": True, "messages": messages, "has_more": False}
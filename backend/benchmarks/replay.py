@@ -0,0 +1,367 @@
+"""
+Replay recorded Slack events into the ingest path at rising rates and chart event-to-commit latency.
+
+    BENCH_DATABASE_URL=postgresql://localhost/tasuke_bench \\
+        python -m backend.benchmarks.replay --events slack_events.jsonl --rates 10 50 100 200 400
+
+Input is a JSONL file (bare `message` events, Events API envelopes or Socket
+Mode envelopes), a Slack export directory (channels.json + one folder of daily
+JSON files per channel), or --synthetic N events from the fake Slack source.
+
+Each rate is an open-loop step: events are released on a schedule (steady,
+poisson, or burst: `--burst-size` events at once, as when a quiet channel wakes
+up) regardless of how far behind ingestion is, and latency is measured from the
+scheduled release to the commit, so a backlog shows up as latency rather than
+being hidden by the generator slowing down. Targets:
+  worker   the asyncio ingestion worker's pipeline (slack_worker.IngestPipeline
+           over write_raw_note), as its Socket Mode listener would feed it
+  threads  slack.handle_message_events on a thread pool, the way Bolt's sync
+           Socket Mode handler calls it (without building the Bolt App)
+
+Per step it reports throughput, latency percentiles, duplicate suppression
+(re-delivered events that must not create rows) and drops: events refused
+because --max-pending were already in flight, failed writes, and commits later
+than --deadline-ms. Committed rows are counted in the database afterwards. The
+saturation point is the first rate that can't be sustained.
+"""
+import argparse
+import asyncio
+import glob
+import os
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from backend.benchmarks import results as bench_results
+from backend.benchmarks.fakes import FakeSlackSource
+
+PROFILES = ("steady", "poisson", "burst")
+TARGETS = ("worker", "threads")
+
+
+# -- input -------------------------------------------------------------------------------
+
+
+def event_from_record(record: dict):
+    """A `message` event from a bare event, an Events API envelope or a Socket Mode envelope."""
+    if "payload" in record:
+        record = record["payload"]
+    if "event" in record:
+        record = record["event"]
+    if record.get("type", "message") != "message":
+        return None
+    return record
+
+
+def load_jsonl(path: str) -> list:
+    events = []
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                event = event_from_record(orjson.loads(line))
+                if event is not None:
+                    events.append(event)
+    return events
+
+
+def load_export(path: str) -> list:
+    """Slack export: messages carry no channel, so it comes from channels.json (by folder name)."""
+    channel_ids = {}
+    channels_file = os.path.join(path, "channels.json")
+    if os.path.exists(channels_file):
+        with open(channels_file, "rb") as f:
+            channel_ids = {c["name"]: c["id"] for c in orjson.loads(f.read())}
+    events = []
+    for day in sorted(glob.glob(os.path.join(path, "*", "*.json"))):
+        name = os.path.basename(os.path.dirname(day))
+        with open(day, "rb") as f:
+            for message in orjson.loads(f.read()):
+                if message.get("type", "message") == "message":
+                    events.append({**message, "channel": channel_ids.get(name, name)})
+    events.sort(key=lambda e: float(e.get("ts", 0)))
+    return events
+
+
+def load_events(args) -> list:
+    if args.events:
+        return load_export(args.events) if os.path.isdir(args.events) else load_jsonl(args.events)
+    return FakeSlackSource(seed=args.seed, duplicate_rate=0).events(args.synthetic)
+
+
+def with_redeliveries(events: list, rate: float, rng: random.Random) -> list:
+    """Re-deliver a share of events shortly after the original, like Slack retrying an unacked event."""
+    out, retries = [], []  # [events still to wait, event]
+    for event in events:
+        out.append(event)
+        for retry in retries:
+            retry[0] -= 1
+        out.extend(e for wait, e in retries if wait <= 0)
+        retries = [retry for retry in retries if retry[0] > 0]
+        if rng.random() < rate:
+            retries.append([rng.randint(1, 5), dict(event)])
+    out.extend(e for _, e in retries)
+    return out
+
+
+# -- schedules ---------------------------------------------------------------------------
+
+
+def schedule(profile: str, rate: float, n: int, rng: random.Random, burst_size: int = 50) -> list:
+    """Release offsets in seconds for n events at a mean of `rate` events/sec."""
+    if profile == "steady":
+        return [i / rate for i in range(n)]
+    if profile == "poisson":
+        offsets, t = [], 0.0
+        for _ in range(n):
+            offsets.append(t)
+            t += rng.expovariate(rate)
+        return offsets
+    if profile == "burst":
+        return [(i // burst_size) * burst_size / rate for i in range(n)]
+    raise ValueError(f"Unknown profile: {profile}")
+
+
+# -- targets -----------------------------------------------------------------------------
+
+
+class WorkerTarget:
+    def __init__(self, concurrency: int):
+        from backend.app.db.async_session import get_async_sessionmaker
+        from backend.app.integrations.slack_worker import IngestPipeline, write_raw_note
+
+        session_factory = get_async_sessionmaker(pool_size=concurrency)
+        self.pipeline = IngestPipeline(lambda note: write_raw_note(session_factory, note), concurrency)
+
+    async def write(self, note: dict) -> dict:
+        return await self.pipeline.submit(note)
+
+    async def close(self):
+        from backend.app.db.async_session import dispose_async_engine
+
+        await dispose_async_engine()
+
+
+class ThreadsTarget:
+    def __init__(self, concurrency: int):
+        from backend.app.integrations.slack import handle_message_events
+
+        self.handle_message_events = handle_message_events
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay")
+
+    def _write(self, note: dict) -> dict:
+        event = {"type": "message", "text": note["content"], "user": note["author"], "channel": note["channel"], "ts": note["source_note_id"]}
+        return self.handle_message_events({"event": event}, event)
+
+    async def write(self, note: dict) -> dict:
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._write, note)
+
+    async def close(self):
+        self.pool.shutdown(wait=True)
+
+
+# -- one step ----------------------------------------------------------------------------
+
+
+def expected_duplicates(notes: list) -> int:
+    from backend.app.tools.raw_notes_tools import content_hash
+
+    seen, duplicates = set(), 0
+    for note in notes:
+        key = content_hash(note["content"])
+        duplicates += key in seen
+        seen.add(key)
+    return duplicates
+
+
+def committed_rows(prefix: str) -> int:
+    from sqlalchemy import func, select
+    from backend.app.db.models import RawNote
+    from backend.app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.count()).select_from(RawNote).where(RawNote.content.startswith(prefix, autoescape=True)))
+    finally:
+        db.close()
+
+
+def delete_rows(prefix: str):
+    from sqlalchemy import delete
+    from backend.app.db.models import RawNote, RawNoteKey
+    from backend.app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        deleted = db.execute(
+            delete(RawNote).where(RawNote.content.startswith(prefix, autoescape=True)).returning(RawNote.id)
+        ).scalars().all()
+        db.execute(delete(RawNoteKey).where(RawNoteKey.raw_note_id.in_(deleted)))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run_step(target, notes: list, offsets: list, max_pending: int, deadline_ms: float) -> dict:
+    latencies = []
+    counts = {"written": 0, "duplicates": 0, "failed": 0, "dropped": 0, "late": 0}
+    pending = 0
+    tasks = []
+
+    async def deliver(note, release_at):
+        nonlocal pending
+        try:
+            result = await target.write(note)
+        except Exception:
+            result = {"ok": False}
+        finally:
+            pending -= 1
+        latency_ms = (time.perf_counter() - release_at) * 1000
+        if not result.get("ok"):
+            counts["failed"] += 1
+            return
+        latencies.append(latency_ms)
+        counts["duplicates" if result.get("duplicate") else "written"] += 1
+        if latency_ms > deadline_ms:
+            counts["late"] += 1
+
+    started = time.perf_counter()
+    for note, offset in zip(notes, offsets):
+        release_at = started + offset
+        delay = release_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if pending >= max_pending:
+            counts["dropped"] += 1
+            continue
+        pending += 1
+        tasks.append(asyncio.create_task(deliver(note, release_at)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    done = counts["written"] + counts["duplicates"]
+    return {
+        **counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_sec": round(done / elapsed, 2) if elapsed > 0 else 0.0,
+        **bench_results.latency_summary(latencies),
+        "p95_ms": round(bench_results.percentile(latencies, 95), 3),
+    }
+
+
+def saturation(curve: list, deadline_ms: float, sustain: float = 0.95):
+    """First offered rate that ingestion couldn't keep up with (throughput, drops or p99 past the deadline)."""
+    for step in curve:
+        if step["dropped"] or step["failed"] or step["p99_ms"] > deadline_ms or step["throughput_per_sec"] < sustain * step["achieved_offer_per_sec"]:
+            return step["rate"]
+    return None
+
+
+def render_curve(curve: list) -> str:
+    lines = [f"{'rate/s':>8} {'thru/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'dropped':>8} {'late':>6} {'failed':>7} {'dup ok':>7} {'dup leak':>8}"]
+    for s in curve:
+        lines.append(
+            f"{s['rate']:>8g} {s['throughput_per_sec']:>8.1f} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} "
+            f"{s['dropped']:>8} {s['late']:>6} {s['failed']:>7} {s['duplicates']:>7} {s['duplicates_leaked']:>8}"
+        )
+    return "\n".join(lines)
+
+
+async def replay(args, events: list) -> list:
+    from backend.app.integrations.slack_events import note_from_event
+
+    target = WorkerTarget(args.concurrency) if args.target == "worker" else ThreadsTarget(args.concurrency)
+    rng = random.Random(args.seed)
+    curve = []
+    try:
+        for step, rate in enumerate(args.rates):
+            prefix = f"[replay {args.run_id}:{step}] "
+            n = min(int(rate * args.duration), len(events))
+            batch = with_redeliveries(events[:n], args.duplicate_rate, rng) if args.duplicate_rate else events[:n]
+            notes = []
+            for event in batch:
+                note = note_from_event(event)
+                if note is not None and note["content"]:
+                    notes.append({**note, "content": prefix + note["content"]})
+            offsets = schedule(args.profile, rate, len(notes), rng, args.burst_size)
+            print(f"rate {rate:g}/s: {len(notes)} events over {offsets[-1] if offsets else 0:.1f}s", file=sys.stderr)
+            result = await run_step(target, notes, offsets, args.max_pending, args.deadline_ms)
+            committed = committed_rows(prefix)
+            injected = expected_duplicates(notes)
+            curve.append({
+                "rate": rate,
+                "events": len(notes),
+                "achieved_offer_per_sec": round(len(notes) / offsets[-1], 2) if len(offsets) > 1 and offsets[-1] > 0 else rate,
+                **result,
+                "committed": committed,
+                "duplicates_injected": injected,
+                # re-deliveries that still became rows
+                "duplicates_leaked": max(committed - (len(notes) - injected), 0),
+                # acknowledged as written but not in the table
+                "lost": max(result["written"] - committed, 0),
+            })
+            if not args.keep:
+                delete_rows(prefix)
+            if args.pause:
+                await asyncio.sleep(args.pause)
+    finally:
+        await target.close()
+    return curve
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", help="JSONL of Slack events/envelopes, or a Slack export directory")
+    parser.add_argument("--synthetic", type=int, default=5000, help="fake events to use when --events is not given")
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 25, 50, 100, 200, 400])
+    parser.add_argument("--duration", type=float, default=10, help="seconds per rate step (fewer if events run out)")
+    parser.add_argument("--profile", choices=PROFILES, default="steady")
+    parser.add_argument("--burst-size", type=int, default=50)
+    parser.add_argument("--target", choices=TARGETS, default="worker")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-pending", type=int, default=1000, help="in-flight events beyond this are dropped")
+    parser.add_argument("--deadline-ms", type=float, default=3000, help="commits later than this count as late")
+    parser.add_argument("--duplicate-rate", type=float, default=0.02, help="share of events re-delivered")
+    parser.add_argument("--pause", type=float, default=2, help="seconds between steps")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="leave the replayed rows in raw_notes")
+    parser.add_argument("--output", default=None, help="default: logs/benchmarks/replay-<run id>.json")
+    args = parser.parse_args(argv)
+    args.run_id = uuid.uuid4().hex[:8]
+    args.output = args.output or os.path.join("logs", "benchmarks", f"replay-{args.run_id}.json")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if not database_url:
+        print("BENCH_DATABASE_URL is not set; point it at a scratch database migrated to head", file=sys.stderr)
+        return 2
+    os.environ["DATABASE_URL"] = database_url  # before any backend.app import builds an engine
+    events = load_events(args)
+    if not events:
+        print("No message events to replay", file=sys.stderr)
+        return 2
+    curve = asyncio.run(replay(args, events))
+    output = {
+        "meta": {
+            "run_id": args.run_id,
+            "target": args.target,
+            "profile": args.profile,
+            "concurrency": args.concurrency,
+            "source": args.events or f"synthetic:{args.synthetic}",
+            "deadline_ms": args.deadline_ms,
+        },
+        "curve": curve,
+        "saturation_rate": saturation(curve, args.deadline_ms),
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    bench_results.save(args.output, output)
+    print(render_curve(curve))
+    print(f"saturation rate: {output['saturation_rate'] or 'not reached'}; results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""
+Benchmark result files and baseline comparison.
+
+A result file is {"meta": {...}, "results": {scenario: {metric: number}}}.
+Metric names carry their direction: *_per_sec is better higher, *_ms and
+*_seconds are better lower; anything else (counts, sizes) is informational
+and never flagged.
+"""
+import orjson
+
+HIGHER_IS_BETTER = ("_per_sec",)
+LOWER_IS_BETTER = ("_ms", "_seconds")
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def latency_summary(samples_ms: list, prefix: str = "") -> dict:
+    return {
+        f"{prefix}p50_ms": round(percentile(samples_ms, 50), 3),
+        f"{prefix}p99_ms": round(percentile(samples_ms, 99), 3),
+        f"{prefix}max_ms": round(max(samples_ms), 3) if samples_ms else 0.0,
+    }
+
+
+def direction(metric: str):
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.10) -> list:
+    """
+    One row per metric present in both runs. `change` is the relative change
+    (current / baseline - 1); a row regresses when it moves the wrong way by more
+    than `tolerance`.
+    """
+    rows = []
+    for scenario, metrics in current.get("results", {}).items():
+        base_metrics = baseline.get("results", {}).get(scenario, {})
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or isinstance(value, bool):
+                continue
+            change = (value / base - 1) if base else 0.0
+            sign = direction(metric)
+            rows.append({
+                "scenario": scenario,
+                "metric": metric,
+                "baseline": base,
+                "current": value,
+                "change": round(change, 4),
+                "regression": sign != 0 and change * sign < -tolerance,
+                "improvement": sign != 0 and change * sign > tolerance,
+            })
+    return rows
+
+
+def render(rows: list) -> str:
+    lines = [f"{'scenario':<20} {'metric':<28} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else "  improved" if row["improvement"] else ""
+        lines.append(
+            f"{row['scenario']:<20} {row['metric']:<28} {row['baseline']:>12.3f} {row['current']:>12.3f} {row['change']:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def load(path: str) -> dict:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def save(path: str, result: dict):
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
@@ -0,0 +1,352 @@
+"""
+End-to-end benchmark suite, fully offline: a local fake OpenRouter and a fake Slack source.
+
+    BENCH_DATABASE_URL=postgresql://localhost/tasuke_bench \\
+        python -m backend.benchmarks.suite --baseline backend/benchmarks/baseline.json
+
+Scenarios (each runs in a fresh interpreter so pools, caches and logging sinks
+don't leak between them):
+  write_raw_notes  notes/sec and per-note latency of the write_raw_notes tool
+  slack_sync       notes/sec of scripts/slack_sync.py against a fake WebClient
+  api_threads      p50/p99 of the threads routes with --threads rows in `threads`
+                   and --messages rows in the thread that is read
+  data_agent       end-to-end run_data_agent latency against the fake LLM; the
+                   `overhead_*` metrics subtract the fake server's fixed response time
+
+BENCH_DATABASE_URL must point at a scratch database migrated to head (alembic
+upgrade head). Every run tags the rows it writes and deletes them afterwards.
+Results go to --output as JSON; with --baseline the run is compared metric by
+metric and the exit code is 1 when something regressed by more than --tolerance.
+"""
+import argparse
+import asyncio
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+import orjson
+from backend.benchmarks import results as bench_results
+from backend.benchmarks.fakes import FakeOpenAIServer, FakeSlackSource, sentence
+
+SCENARIOS = ("write_raw_notes", "slack_sync", "api_threads", "data_agent")
+
+
+def marker(run_id: str) -> str:
+    return f"[bench {run_id}] "
+
+
+def bench_agent(run_id: str) -> str:
+    return f"benchmark:{run_id}"
+
+
+def cleanup(run_id: str):
+    from sqlalchemy import text
+    from backend.app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        params = {"agent": bench_agent(run_id), "marker": marker(run_id) + "%"}
+        db.execute(text("DELETE FROM messages WHERE thread_id IN (SELECT id FROM threads WHERE agent = :agent)"), params)
+        db.execute(text("DELETE FROM threads WHERE agent = :agent"), params)
+        db.execute(text("""
+            WITH deleted AS (DELETE FROM raw_notes WHERE content LIKE :marker RETURNING id)
+            DELETE FROM raw_note_keys WHERE raw_note_id IN (SELECT id FROM deleted)
+        """), params)
+        db.commit()
+    finally:
+        db.close()
+
+
+def create_threads(db, run_id: str, n: int, rng) -> list:
+    from sqlalchemy import insert
+    from backend.app.db.models import Thread
+
+    rows = [
+        {"status": rng.choice(["active", "paused", "success", "failed"]), "agent": bench_agent(run_id), "summary": sentence(rng, 20)}
+        for _ in range(n)
+    ]
+    ids = db.scalars(insert(Thread).returning(Thread.id), rows).all()
+    db.commit()
+    return ids
+
+
+# -- scenarios (run in the child process) -------------------------------------------
+
+
+def bench_write_raw_notes(args) -> dict:
+    from backend.app.integrations.slack_events import note_from_event
+    from backend.app.tools.raw_notes_tools import write_raw_notes
+
+    source = FakeSlackSource(seed=args.seed, prefix=marker(args.run_id))
+    notes = [note for note in map(note_from_event, source.events(args.notes)) if note is not None]
+
+    async def run():
+        timings, outcomes = [], {"written": 0, "duplicates": 0, "failed": 0}
+        for note in notes:
+            started = time.perf_counter()
+            result = await write_raw_notes(note)
+            timings.append((time.perf_counter() - started) * 1000)
+            key = "failed" if not result.get("ok") else "duplicates" if result.get("duplicate") else "written"
+            outcomes[key] += 1
+        return timings, outcomes
+
+    started = time.perf_counter()
+    timings, outcomes = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    return {"notes": len(notes), **outcomes, "notes_per_sec": round(len(notes) / elapsed, 2), **bench_results.latency_summary(timings)}
+
+
+def bench_slack_sync(args) -> dict:
+    import importlib
+    from sqlalchemy import func, select
+    from backend.app.db.models import RawNote
+    from backend.app.db.session import SessionLocal
+
+    slack_sync = importlib.import_module("scripts.slack_sync")
+    source = FakeSlackSource(seed=args.seed + 1, prefix=marker(args.run_id))
+    slack_sync.client = source.web_client(history=100)
+    slack_sync.SLACK_TEST_CHANNEL = source.channels[0]
+    rounds = max(args.notes // 100, 1)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        slack_sync.sync_slack_messages()
+    elapsed = time.perf_counter() - started
+    db = SessionLocal()
+    try:
+        stored = db.scalar(select(func.count()).select_from(RawNote).where(RawNote.content.startswith(marker(args.run_id), autoescape=True)))
+    finally:
+        db.close()
+    fetched = rounds * 100
+    return {"messages": fetched, "stored": stored, "notes_per_sec": round(fetched / elapsed, 2), "elapsed_seconds": round(elapsed, 3)}
+
+
+def bench_api_threads(args) -> dict:
+    import random
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy import insert
+    from backend.app.api.threads import router as threads_router
+    from backend.app.db.models import Message
+    from backend.app.db.session import SessionLocal
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        thread_ids = create_threads(db, args.run_id, args.threads, rng)
+        hot = thread_ids[0]
+        start = datetime.utcnow() - timedelta(seconds=args.messages)
+        db.execute(insert(Message), [
+            {
+                "thread_id": hot,
+                "role": "assistant" if i % 2 else "user",
+                "content": sentence(rng, rng.randint(20, 120)),
+                "model": "fake/model" if i % 2 else None,
+                "created_at": start + timedelta(seconds=i),
+            }
+            for i in range(args.messages)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    app = FastAPI()
+    app.include_router(threads_router)
+    routes = {
+        "list_threads": "/api/v1/threads/",
+        "thread_detail": f"/api/v1/threads/{hot}",
+        "thread_messages": f"/api/v1/threads/{hot}/messages",
+    }
+
+    async def run():
+        metrics = {}
+        async with AsyncClient(base_url="http://bench", transport=ASGITransport(app=app), follow_redirects=True) as client:
+            for name, path in routes.items():
+                response = await client.get(path)  # warm up
+                response.raise_for_status()
+                metrics[f"{name}_bytes"] = len(response.content)
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    response = await client.get(path)
+                    timings.append((time.perf_counter() - started) * 1000)
+                metrics.update(bench_results.latency_summary(timings, prefix=f"{name}_"))
+        return metrics
+
+    return {"threads": args.threads, "messages": args.messages, "repeat": args.repeat, **asyncio.run(run())}
+
+
+def bench_data_agent(args) -> dict:
+    import random
+    from backend.app.agents.data_agent import run_data_agent
+    from backend.app.db.session import SessionLocal
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        thread_ids = create_threads(db, args.run_id, args.agent_runs, rng)
+    finally:
+        db.close()
+    source = FakeSlackSource(seed=args.seed + 2)
+
+    async def run():
+        timings, ok = [], 0
+        for thread_id in thread_ids:
+            context = orjson.dumps({"source": source.channels[0], "notes": source.events(args.batch)}).decode()
+            started = time.perf_counter()
+            result = await run_data_agent(thread_id, context=context)
+            timings.append((time.perf_counter() - started) * 1000)
+            ok += bool(result.get("ok"))
+        return timings, ok
+
+    timings, ok = asyncio.run(run())
+    return {"runs": len(timings), "ok_runs": ok, "batch": args.batch, **bench_results.latency_summary(timings)}
+
+
+BENCHES = {
+    "write_raw_notes": bench_write_raw_notes,
+    "slack_sync": bench_slack_sync,
+    "api_threads": bench_api_threads,
+    "data_agent": bench_data_agent,
+}
+
+
+def run_child(args) -> int:
+    try:
+        result = BENCHES[args.child](args)
+    finally:
+        cleanup(args.run_id)
+    bench_results.save(args.result_file, result)
+    return 0
+
+
+# -- orchestration (parent process) ------------------------------------------------------
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def child_argv(args, scenario: str, result_file: str) -> list:
+    return [
+        sys.executable, "-m", "backend.benchmarks.suite",
+        "--child", scenario, "--result-file", result_file, "--run-id", args.run_id,
+        "--seed", str(args.seed), "--notes", str(args.notes), "--threads", str(args.threads),
+        "--messages", str(args.messages), "--repeat", str(args.repeat),
+        "--agent-runs", str(args.agent_runs), "--batch", str(args.batch),
+    ]
+
+
+def run_suite(args) -> int:
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if not database_url:
+        print("BENCH_DATABASE_URL is not set; point it at a scratch database migrated to head", file=sys.stderr)
+        return 2
+    server = FakeOpenAIServer(
+        latency_ms=args.llm_latency_ms,
+        tokens_per_sec=args.llm_tokens_per_sec,
+        completion_tokens=args.llm_completion_tokens,
+        tool_call_rate=args.llm_tool_call_rate,
+        seed=args.seed,
+    ).start()
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "OPENROUTER_BASE_URL": server.base_url,
+        "OPENROUTER_API_KEY": "benchmark",
+        "SLOW_QUERY_EXPLAIN": "false",
+    }
+    output = {
+        "meta": {
+            "run_id": args.run_id,
+            "started_at": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": {k: v for k, v in vars(args).items() if k not in ("child", "result_file", "baseline", "output", "save_baseline")},
+        },
+        "results": {},
+    }
+    try:
+        for scenario in args.scenarios:
+            before = server.stats()
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+                result_file = f.name
+            print(f"running {scenario} ...", file=sys.stderr)
+            started = time.perf_counter()
+            completed = subprocess.run(child_argv(args, scenario, result_file), env=env)
+            if completed.returncode != 0:
+                output["results"][scenario] = {"error": f"exited with {completed.returncode}"}
+                continue
+            result = bench_results.load(result_file)
+            os.unlink(result_file)
+            after = server.stats()
+            result["wall_seconds"] = round(time.perf_counter() - started, 3)
+            result["llm_requests"] = after["requests"] - before["requests"]
+            result["llm_tool_calls"] = after["tool_call_responses"] - before["tool_call_responses"]
+            if scenario == "data_agent" and result.get("runs"):
+                floor_ms = server.response_seconds() * 1000 * result["llm_requests"] / result["runs"]
+                result["overhead_p50_ms"] = round(result["p50_ms"] - floor_ms, 3)
+                result["overhead_p99_ms"] = round(result["p99_ms"] - floor_ms, 3)
+            output["results"][scenario] = result
+    finally:
+        server.stop()
+    output["meta"]["fake_openai"] = server.stats()
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    bench_results.save(args.output, output)
+    print(orjson.dumps(output["results"], option=orjson.OPT_INDENT_2).decode())
+    print(f"results written to {args.output}", file=sys.stderr)
+    if args.save_baseline:
+        bench_results.save(args.save_baseline, output)
+        print(f"baseline saved to {args.save_baseline}", file=sys.stderr)
+    failed = any("error" in result for result in output["results"].values())
+    if args.baseline:
+        rows = bench_results.compare(output, bench_results.load(args.baseline), args.tolerance)
+        print(bench_results.render(rows))
+        failed = failed or any(row["regression"] for row in rows)
+    return 1 if failed else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--notes", type=int, default=1000, help="notes written by the ingest scenarios")
+    parser.add_argument("--threads", type=int, default=5000, help="rows seeded into threads for api_threads")
+    parser.add_argument("--messages", type=int, default=1000, help="messages in the thread api_threads reads")
+    parser.add_argument("--repeat", type=int, default=200, help="requests per route in api_threads")
+    parser.add_argument("--agent-runs", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=10, help="notes in each data_agent run's context")
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--llm-tokens-per-sec", type=float, default=80)
+    parser.add_argument("--llm-completion-tokens", type=int, default=120)
+    parser.add_argument("--llm-tool-call-rate", type=float, default=0.5)
+    parser.add_argument("--output", default=None, help="default: logs/benchmarks/<run id>.json")
+    parser.add_argument("--baseline", help="result file to compare against")
+    parser.add_argument("--save-baseline", help="also write this run's results here")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="relative change that counts as a regression")
+    parser.add_argument("--run-id", default=None)
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.run_id = args.run_id or uuid.uuid4().hex[:8]
+    args.output = args.output or os.path.join("logs", "benchmarks", f"{args.run_id}.json")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        return run_child(args)
+    return run_suite(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
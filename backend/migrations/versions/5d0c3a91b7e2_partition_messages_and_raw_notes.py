@@ -0,0 +1,162 @@
+"""Partition messages and raw_notes by month
+
+Revision ID: 5d0c3a91b7e2
+Revises: ca1a7577d5e7
+Create Date: 2026-10-19 09:12:41.118530
+
+Existing rows are copied into monthly range partitions: the old heap is renamed
+to <table>_legacy, the partitioned table is created with partitions covering
+the oldest row through PARTITION_PREMAKE_MONTHS ahead, rows are copied across and
+the legacy heap is dropped. The id sequences are re-owned, not recreated, so ids
+keep counting from where they were.
+"""
+import os
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0c3a91b7e2'
+down_revision: Union[str, None] = 'ca1a7577d5e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", "3"))
+
+RAW_NOTES_COLUMNS = "id, source, source_note_id, content, content_hash, author, channel, content_vector, received_at"
+MESSAGES_COLUMNS = "id, thread_id, content, content_vector, role, model, tokens_used, created_at, content_hash"
+
+PARTITIONED = {
+    "raw_notes": {
+        "key": "received_at",
+        "columns": RAW_NOTES_COLUMNS,
+        "create": """
+            CREATE TABLE raw_notes (
+                id INTEGER NOT NULL DEFAULT nextval('raw_notes_id_seq'),
+                source VARCHAR NOT NULL,
+                source_note_id VARCHAR NOT NULL,
+                content TEXT NOT NULL,
+                content_hash VARCHAR NOT NULL,
+                author VARCHAR,
+                channel VARCHAR,
+                content_vector FLOAT[],
+                received_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+                CONSTRAINT raw_notes_pkey PRIMARY KEY (id, received_at)
+            ) PARTITION BY RANGE (received_at)
+        """,
+        "indexes": [
+            "CREATE INDEX ix_raw_notes_content_hash ON raw_notes (content_hash)",
+            "CREATE INDEX ix_raw_notes_source_note_id ON raw_notes (source_note_id)",
+            "CREATE INDEX ix_raw_notes_received_at ON raw_notes (received_at)",
+        ],
+    },
+    "messages": {
+        "key": "created_at",
+        "columns": MESSAGES_COLUMNS,
+        "create": """
+            CREATE TABLE messages (
+                id INTEGER NOT NULL DEFAULT nextval('messages_id_seq'),
+                thread_id INTEGER NOT NULL REFERENCES threads (id),
+                content TEXT NOT NULL,
+                content_vector FLOAT[],
+                role VARCHAR NOT NULL,
+                model VARCHAR,
+                tokens_used INTEGER,
+                created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+                content_hash VARCHAR,
+                CONSTRAINT messages_pkey PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """,
+        "indexes": [
+            "CREATE INDEX ix_messages_thread_id_created_at ON messages (thread_id, created_at)",
+            "CREATE INDEX ix_messages_role_content_hash ON messages (role, content_hash)",
+        ],
+    },
+}
+
+
+def _add_months(value: date, months: int) -> date:
+    total = value.year * 12 + (value.month - 1) + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _partition_table(bind, table: str, spec: dict) -> None:
+    key = spec["key"]
+    columns = spec["columns"]
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    op.execute(f"ALTER TABLE {table}_legacy RENAME CONSTRAINT {table}_pkey TO {table}_legacy_pkey")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute(spec["create"])
+    for statement in spec["indexes"]:
+        op.execute(statement)
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    oldest = bind.execute(sa.text(f"SELECT min({key}) FROM {table}_legacy")).scalar() or datetime.utcnow()
+    month = date(oldest.year, oldest.month, 1)
+    today = datetime.utcnow()
+    last = _add_months(date(today.year, today.month, 1), PREMAKE_MONTHS)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+        )
+        month = upper
+
+    select_columns = columns.replace(key, f"COALESCE({key}, now())")
+    op.execute(f"INSERT INTO {table} ({columns}) SELECT {select_columns} FROM {table}_legacy")
+    op.execute(f"DROP TABLE {table}_legacy")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    for table, spec in PARTITIONED.items():
+        _partition_table(bind, table, spec)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER SEQUENCE raw_notes_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE raw_notes RENAME TO raw_notes_partitioned")
+    op.execute("""
+        CREATE TABLE raw_notes (
+            id INTEGER NOT NULL DEFAULT nextval('raw_notes_id_seq') PRIMARY KEY,
+            source VARCHAR NOT NULL,
+            source_note_id VARCHAR NOT NULL UNIQUE,
+            content TEXT NOT NULL,
+            content_hash VARCHAR NOT NULL,
+            author VARCHAR,
+            channel VARCHAR,
+            content_vector FLOAT[],
+            received_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+            CONSTRAINT uq_raw_notes_content_hash UNIQUE (content_hash)
+        )
+    """)
+    op.execute(f"INSERT INTO raw_notes ({RAW_NOTES_COLUMNS}) SELECT {RAW_NOTES_COLUMNS} FROM raw_notes_partitioned")
+    op.execute("DROP TABLE raw_notes_partitioned")
+    op.execute("ALTER SEQUENCE raw_notes_id_seq OWNED BY raw_notes.id")
+
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE messages RENAME TO messages_partitioned")
+    op.execute("""
+        CREATE TABLE messages (
+            id INTEGER NOT NULL DEFAULT nextval('messages_id_seq') PRIMARY KEY,
+            thread_id INTEGER NOT NULL REFERENCES threads (id),
+            content TEXT NOT NULL,
+            content_vector FLOAT[],
+            role VARCHAR NOT NULL,
+            model VARCHAR,
+            tokens_used INTEGER,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+            content_hash VARCHAR,
+            CONSTRAINT uq_messages_role_content_hash UNIQUE (role, content_hash)
+        )
+    """)
+    op.execute(f"INSERT INTO messages ({MESSAGES_COLUMNS}) SELECT {MESSAGES_COLUMNS} FROM messages_partitioned")
+    op.execute("DROP TABLE messages_partitioned")
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY messages.id")
@@ -0,0 +1,49 @@
+"""Add thread_archives and archive_dictionaries
+
+Revision ID: 8e41f2c6a0d3
+Revises: 5d0c3a91b7e2
+Create Date: 2026-10-19 11:40:05.532117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41f2c6a0d3'
+down_revision: Union[str, None] = '5d0c3a91b7e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archive_dictionaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dict_data', sa.LargeBinary(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('thread_archives',
+    sa.Column('thread_id', sa.Integer(), nullable=False),
+    sa.Column('dictionary_id', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('raw_size', sa.Integer(), nullable=False),
+    sa.Column('compressed_size', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['thread_id'], ['threads.id'], ),
+    sa.ForeignKeyConstraint(['dictionary_id'], ['archive_dictionaries.id'], ),
+    sa.PrimaryKeyConstraint('thread_id')
+    )
+    # payload is already compressed; don't let TOAST try again
+    op.execute("ALTER TABLE thread_archives ALTER COLUMN payload SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('thread_archives')
+    op.drop_table('archive_dictionaries')
@@ -0,0 +1,28 @@
+"""Persist dashboard resumes of Data Agent threads in threads.resume_requested_at
+
+Revision ID: a7d2e5c8f1b3
+Revises: f3c8a1d6e9b2
+Create Date: 2026-10-21 09:14:52.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e5c8f1b3'
+down_revision: Union[str, None] = 'f3c8a1d6e9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('threads', sa.Column('resume_requested_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('threads', 'resume_requested_at')
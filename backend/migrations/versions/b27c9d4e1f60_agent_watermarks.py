@@ -0,0 +1,43 @@
+"""Add agent_watermarks and updated_at indexes for scheduled agents
+
+Revision ID: b27c9d4e1f60
+Revises: 8e41f2c6a0d3
+Create Date: 2026-10-19 15:02:37.904211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b27c9d4e1f60'
+down_revision: Union[str, None] = '8e41f2c6a0d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('agent_watermarks',
+    sa.Column('agent', sa.String(), nullable=False),
+    sa.Column('high_water_mark', sa.DateTime(), nullable=True),
+    sa.Column('high_water_id', sa.Integer(), nullable=True),
+    sa.Column('last_run_at', sa.DateTime(), nullable=True),
+    sa.Column('last_thread_id', sa.Integer(), nullable=True),
+    sa.Column('rows_processed', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['last_thread_id'], ['threads.id'], ),
+    sa.PrimaryKeyConstraint('agent')
+    )
+    op.create_index('ix_threads_updated_at_id', 'threads', ['updated_at', 'id'])
+    op.create_index('ix_threads_status_updated_at', 'threads', ['status', 'updated_at'])
+    op.create_index('ix_tasks_updated_at_id', 'tasks', ['updated_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_updated_at_id', table_name='tasks')
+    op.drop_index('ix_threads_status_updated_at', table_name='threads')
+    op.drop_index('ix_threads_updated_at_id', table_name='threads')
+    op.drop_table('agent_watermarks')
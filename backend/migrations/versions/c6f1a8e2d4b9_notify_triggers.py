@@ -0,0 +1,61 @@
+"""Add NOTIFY triggers on raw_notes inserts and thread status changes
+
+Revision ID: c6f1a8e2d4b9
+Revises: b27c9d4e1f60
+Create Date: 2026-10-19 17:41:09.512377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f1a8e2d4b9'
+down_revision: Union[str, None] = 'b27c9d4e1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A row trigger on the partitioned parent is cloned onto every existing and future partition
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_raw_note_inserted() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('raw_notes_inserted', json_build_object(
+                'id', NEW.id, 'source', NEW.source, 'channel', NEW.channel
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER raw_notes_notify_insert AFTER INSERT ON raw_notes
+        FOR EACH ROW EXECUTE FUNCTION notify_raw_note_inserted()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_thread_status_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('thread_status_changed', json_build_object(
+                'id', NEW.id, 'status', NEW.status, 'old_status', OLD.status,
+                'agent', NEW.agent, 'updated_at', NEW.updated_at
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER threads_notify_status AFTER UPDATE OF status ON threads
+        FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION notify_thread_status_changed()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS threads_notify_status ON threads")
+    op.execute("DROP FUNCTION IF EXISTS notify_thread_status_changed()")
+    op.execute("DROP TRIGGER IF EXISTS raw_notes_notify_insert ON raw_notes")
+    op.execute("DROP FUNCTION IF EXISTS notify_raw_note_inserted()")
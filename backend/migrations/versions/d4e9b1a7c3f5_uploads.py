@@ -0,0 +1,52 @@
+"""Add content-addressed uploads and thread attachments
+
+Revision ID: d4e9b1a7c3f5
+Revises: c6f1a8e2d4b9
+Create Date: 2026-10-19 19:02:44.180233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e9b1a7c3f5'
+down_revision: Union[str, None] = 'c6f1a8e2d4b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('uploads',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('content_type', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('extraction_status', sa.String(), nullable=False),
+    sa.Column('extracted_text', sa.Text(), nullable=True),
+    sa.Column('page_count', sa.Integer(), nullable=True),
+    sa.Column('thumbnail', sa.String(), nullable=True),
+    sa.Column('extraction_error', sa.Text(), nullable=True),
+    sa.Column('extracted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.create_table('thread_attachments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('thread_id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['thread_id'], ['threads.id'], ),
+    sa.ForeignKeyConstraint(['content_hash'], ['uploads.content_hash'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('thread_id', 'content_hash', name='uq_thread_attachments_thread_hash')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('thread_attachments')
+    op.drop_table('uploads')
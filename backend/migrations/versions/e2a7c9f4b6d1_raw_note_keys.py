@@ -0,0 +1,86 @@
+"""Enforce raw_notes dedup keys through raw_note_keys
+
+Revision ID: e2a7c9f4b6d1
+Revises: d4e9b1a7c3f5
+Create Date: 2026-10-20 10:14:52.306118
+
+Partitioning raw_notes (5d0c3a91b7e2) had to drop the unique constraints on
+content_hash and source_note_id, which left dedup to a racy lookup. The keys
+move to a small non-partitioned table that writers claim with
+INSERT ... ON CONFLICT DO NOTHING; existing notes are backfilled oldest first,
+so the first copy of any duplicate that slipped in keeps the keys.
+
+messages lost uq_messages_role_content_hash the same way. Nothing writes
+messages.content_hash yet, so instead of relying on each writer, row triggers
+on the partitioned table keep message_keys in step: an insert whose
+(role, content_hash) is taken fails with a unique violation, as it did before
+partitioning, and a delete (archival) releases the key.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c9f4b6d1'
+down_revision: Union[str, None] = 'd4e9b1a7c3f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('raw_note_keys',
+    sa.Column('content_hash', sa.String(), nullable=False),
+    sa.Column('source_note_id', sa.String(), nullable=False),
+    sa.Column('raw_note_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('content_hash'),
+    sa.UniqueConstraint('source_note_id', name='uq_raw_note_keys_source_note_id')
+    )
+    op.execute("""
+        INSERT INTO raw_note_keys (content_hash, source_note_id, raw_note_id)
+        SELECT content_hash, source_note_id, id FROM raw_notes ORDER BY id
+        ON CONFLICT DO NOTHING
+    """)
+
+    op.create_table('message_keys',
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('content_hash', sa.String(), nullable=False),
+    sa.Column('message_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('role', 'content_hash')
+    )
+    op.execute("""
+        INSERT INTO message_keys (role, content_hash, message_id)
+        SELECT role, content_hash, id FROM messages WHERE content_hash IS NOT NULL ORDER BY id
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute("""
+        CREATE FUNCTION message_keys_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO message_keys (role, content_hash, message_id) VALUES (NEW.role, NEW.content_hash, NEW.id);
+            ELSE
+                DELETE FROM message_keys WHERE role = OLD.role AND content_hash = OLD.content_hash AND message_id = OLD.id;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER messages_keys_insert AFTER INSERT ON messages
+        FOR EACH ROW WHEN (NEW.content_hash IS NOT NULL) EXECUTE FUNCTION message_keys_sync()
+    """)
+    op.execute("""
+        CREATE TRIGGER messages_keys_delete AFTER DELETE ON messages
+        FOR EACH ROW WHEN (OLD.content_hash IS NOT NULL) EXECUTE FUNCTION message_keys_sync()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER messages_keys_delete ON messages")
+    op.execute("DROP TRIGGER messages_keys_insert ON messages")
+    op.execute("DROP FUNCTION message_keys_sync()")
+    op.drop_table('message_keys')
+    op.drop_table('raw_note_keys')
@@ -0,0 +1,28 @@
+"""Claim scheduled agent runs through agent_watermarks.running_since
+
+Revision ID: f3c8a1d6e9b2
+Revises: e2a7c9f4b6d1
+Create Date: 2026-10-20 11:02:18.440193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8a1d6e9b2'
+down_revision: Union[str, None] = 'e2a7c9f4b6d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('agent_watermarks', sa.Column('running_since', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('agent_watermarks', 'running_since')
@@ -1 +1,40 @@
- 
\ No newline at end of file
+import os
+import tempfile
+import pytest
+
+# Log sinks and the trace file are opened at import; keep the suite's output out of the repo's logs/
+os.environ.setdefault("LOGS_DIR", tempfile.mkdtemp(prefix="tasuke-test-logs-"))
+
+_database_available = None
+
+
+def database_available() -> bool:
+    """Whether DATABASE_URL points at a reachable Postgres; checked once per session."""
+    global _database_available
+    if _database_available is None:
+        from sqlalchemy import create_engine, text
+        from backend.app.db.session import DATABASE_URL
+        _database_available = False
+        if DATABASE_URL:
+            engine = create_engine(DATABASE_URL, connect_args={"connect_timeout": 2})
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                _database_available = True
+            except Exception:
+                pass
+            finally:
+                engine.dispose()
+    return _database_available
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "requires_db: needs a reachable Postgres at DATABASE_URL (skipped otherwise)")
+
+
+def pytest_collection_modifyitems(config, items):
+    marked = [item for item in items if item.get_closest_marker("requires_db")]
+    if marked and not database_available():
+        skip = pytest.mark.skip(reason="needs a reachable Postgres at DATABASE_URL")
+        for item in marked:
+            item.add_marker(skip)
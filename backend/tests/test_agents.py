@@ -61,22 +61,21 @@ def test_data_agent_model_and_temperature_override(monkeypatch):
     thread_id = create_thread(status="planning")
     monkeypatch.setenv("DATA_AGENT_MODEL", "test-model-override")
     monkeypatch.setenv("DATA_AGENT_TEMPERATURE", "0.42")
-    # Patch openrouter_client to capture params
-    from backend.app.core.openrouter import openrouter_client
+    # Stand in for the lazily built OpenRouter client to capture params (no AsyncOpenAI needed)
+    from backend.app.core import openrouter
     called = {}
-    orig_chat_completion = openrouter_client.chat_completion
-    async def fake_chat_completion(*args, **kwargs):
-        called["model"] = kwargs.get("model")
-        called["temperature"] = kwargs.get("temperature")
-        class Dummy:
-            choices = [type("obj", (object,), {"message": type("obj", (object,), {"content": "test"})()})]
-        return Dummy()
-    openrouter_client.chat_completion = fake_chat_completion
+    class FakeClient:
+        async def chat_completion(self, *args, **kwargs):
+            called["model"] = kwargs.get("model")
+            called["temperature"] = kwargs.get("temperature")
+            class Dummy:
+                choices = [type("obj", (object,), {"message": type("obj", (object,), {"content": "test"})()})]
+            return Dummy()
+    monkeypatch.setattr(openrouter, "_client", FakeClient())
     # Run agent
     from backend.app.agents.data_agent import run_data_agent
     import asyncio
     asyncio.get_event_loop().run_until_complete(run_data_agent(thread_id))
-    openrouter_client.chat_completion = orig_chat_completion
     assert called["model"] == "test-model-override"
     assert called["temperature"] == 0.42
 
@@ -3,6 +3,7 @@ from httpx import AsyncClient, ASGITransport
 from fastapi import status
 from backend.app.main import app
 
+@pytest.mark.requires_db
 @pytest.mark.asyncio
 async def test_list_threads():
     transport = ASGITransport(app=app)
@@ -11,6 +12,7 @@ async def test_list_threads():
         assert response.status_code == 200
         assert isinstance(response.json(), list)
 
+@pytest.mark.requires_db
 @pytest.mark.asyncio
 async def test_thread_detail():
     transport = ASGITransport(app=app)
@@ -18,6 +20,7 @@ async def test_thread_detail():
         response = await ac.get("/api/v1/threads/1")
         assert response.status_code in (200, 404)
 
+@pytest.mark.requires_db
 @pytest.mark.asyncio
 async def test_pause_resume_thread():
     transport = ASGITransport(app=app)
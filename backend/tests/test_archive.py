@@ -0,0 +1,81 @@
+import pytest
+import orjson
+import zstandard as zstd
+from datetime import datetime, timedelta
+from backend.app.db.archive import (
+    pack_messages, unpack_messages, archived_message_dict, _LRU, archive_thread, thread_message_dicts,
+)
+
+def make_records(n):
+    return [
+        {
+            "id": i,
+            "content": f"Reminder: deck for session {i} is in the shared drive",
+            "role": "assistant" if i % 2 else "user",
+            "model": "anthropic/claude-3-haiku",
+            "tokens_used": 42,
+            "created_at": datetime(2025, 6, 1, 12, i % 60).isoformat(),
+            "content_hash": None,
+        }
+        for i in range(n)
+    ]
+
+def test_pack_roundtrip_without_dictionary():
+    records = make_records(20)
+    assert unpack_messages(pack_messages(records, level=3)) == records
+
+def test_pack_roundtrip_with_trained_dictionary():
+    samples = [orjson.dumps(r) for r in make_records(500)]
+    dict_data = zstd.train_dictionary(4096, samples).as_bytes()
+    records = make_records(5)
+    payload = pack_messages(records, dict_data, level=3)
+    assert unpack_messages(payload, dict_data) == records
+    assert len(payload) < len(pack_messages(records, level=3))
+
+def test_archived_message_dict_matches_api_shape():
+    record = make_records(1)[0]
+    data = archived_message_dict(record)
+    assert set(data) == {"id", "content", "role", "model", "created_at", "tool_call_id"}
+    assert isinstance(data["created_at"], datetime)
+
+def test_lru_evicts_oldest():
+    cache = _LRU(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+
+@pytest.mark.requires_db
+def test_archive_thread_round_trips_through_thread_message_dicts():
+    from sqlalchemy import delete, select
+    from backend.app.db.models import Message, Thread, ThreadArchive
+    from backend.app.db.session import SessionLocal
+    db = SessionLocal()
+    try:
+        start = datetime.utcnow().replace(microsecond=0)
+        thread = Thread(status="success", created_at=start)
+        neighbour = Thread(status="active", created_at=start)
+        db.add_all([thread, neighbour])
+        db.flush()
+        db.add_all([
+            Message(thread_id=thread.id, role="user" if i % 2 else "assistant",
+                    content=f"Archive round trip {i}", created_at=start + timedelta(seconds=i))
+            for i in range(5)
+        ] + [Message(thread_id=neighbour.id, role="user", content="Stays hot", created_at=start)])
+        db.commit()
+        before = thread_message_dicts(db, thread.id)
+        result = archive_thread(db, thread.id)
+        assert result["ok"] and result["messages"] == 5
+        assert db.execute(select(Message.id).where(Message.thread_id == thread.id)).first() is None
+        assert thread_message_dicts(db, thread.id) == before
+        assert [m["content"] for m in thread_message_dicts(db, neighbour.id)] == ["Stays hot"]
+    finally:
+        db.rollback()
+        db.execute(delete(ThreadArchive).where(ThreadArchive.thread_id.in_([thread.id, neighbour.id])))
+        db.execute(delete(Message).where(Message.thread_id.in_([thread.id, neighbour.id])))
+        db.execute(delete(Thread).where(Thread.id.in_([thread.id, neighbour.id])))
+        db.commit()
+        db.close()
@@ -0,0 +1,129 @@
+import importlib.util
+import io
+import os
+import shutil
+import tarfile
+from pathlib import Path
+import orjson
+import pytest
+import zstandard
+
+_spec = importlib.util.spec_from_file_location("backup", Path(__file__).resolve().parents[2] / "scripts" / "backup.py")
+backup = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(backup)
+
+SEGMENT_A = "000000010000000000000001"
+SEGMENT_B = "000000010000000000000002"
+SEGMENT_C = "000000010000000000000003"
+
+
+def test_compress_tree_round_trips_and_removes_sources(tmp_path):
+    src = tmp_path / "dump"
+    src.mkdir()
+    (src / "toc.dat").write_bytes(b"toc" * 100)
+    (src / "3001.dat").write_bytes(os.urandom(10_000) + b"row\n" * 50_000)
+    files = backup.compress_tree(src, tmp_path / "out", jobs=2, level=3)
+    assert sorted(f["name"] for f in files) == ["3001.dat", "toc.dat"]
+    assert list(src.iterdir()) == []
+    assert sum(f["raw_bytes"] for f in files) == 300 + 10_000 + 200_000
+    assert sum(f["compressed_bytes"] for f in files) < 50_000
+    restored = backup.decompress_tree(tmp_path / "out", tmp_path / "restored", jobs=2)
+    assert restored == 210_300
+    assert (tmp_path / "restored" / "toc.dat").read_bytes() == b"toc" * 100
+
+
+def test_archive_wal_is_idempotent_and_restorable(tmp_path):
+    segment = tmp_path / SEGMENT_A
+    segment.write_bytes(b"\0" * 65536 + b"wal")
+    result = backup.archive_wal(str(segment), SEGMENT_A, tmp_path / "backups")
+    assert result["ok"] and result["compressed_bytes"] < result["raw_bytes"]
+    assert backup.archive_wal(str(segment), SEGMENT_A, tmp_path / "backups")["already_archived"] is True
+    segment.write_bytes(b"different")
+    with pytest.raises(backup.BackupError):
+        backup.archive_wal(str(segment), SEGMENT_A, tmp_path / "backups")
+    assert backup.restore_wal(SEGMENT_A, str(tmp_path / "restored"), tmp_path / "backups") is True
+    assert (tmp_path / "restored").read_bytes() == b"\0" * 65536 + b"wal"
+    assert backup.restore_wal(SEGMENT_B, str(tmp_path / "missing"), tmp_path / "backups") is False
+
+
+def _base(backup_dir: Path, name: str, start_wal: str):
+    directory = backup_dir / "base" / name
+    directory.mkdir(parents=True)
+    (directory / "manifest.json").write_bytes(orjson.dumps({"start_wal": start_wal}))
+
+
+def test_prune_keeps_newest_and_wal_needed_by_oldest_base(tmp_path):
+    for name in ("20260101T000000Z", "20260102T000000Z", "20260103T000000Z", ".20260104T000000Z.partial"):
+        (tmp_path / "dumps" / name).mkdir(parents=True)
+    _base(tmp_path, "20260101T000000Z", SEGMENT_A)
+    _base(tmp_path, "20260102T000000Z", SEGMENT_B)
+    (tmp_path / "wal").mkdir()
+    for name in (SEGMENT_A, SEGMENT_B, SEGMENT_C, "00000002.history"):
+        (tmp_path / "wal" / f"{name}.zst").write_bytes(b"x")
+    removed = backup.prune(tmp_path, keep_dumps=2, keep_base=1)
+    assert removed == {"dumps": ["20260101T000000Z"], "base": ["20260101T000000Z"], "wal": 1}
+    assert sorted(p.name for p in (tmp_path / "dumps").iterdir()) == [".20260104T000000Z.partial", "20260102T000000Z", "20260103T000000Z"]
+    assert sorted(p.name for p in (tmp_path / "wal").iterdir()) == [f"{SEGMENT_B}.zst", f"{SEGMENT_C}.zst", "00000002.history.zst"]
+
+
+def _tar_zst(path: Path, names: list):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for name in names:
+            info = tarfile.TarInfo(name)
+            info.size = 3
+            archive.addfile(info, io.BytesIO(b"abc"))
+    path.write_bytes(zstandard.ZstdCompressor().compress(buffer.getvalue()))
+
+
+def test_verify_base_backup_reads_the_whole_archive(tmp_path):
+    _tar_zst(tmp_path / "ok.tar.zst", ["backup_label", "PG_VERSION", "base/1/1259"])
+    assert backup.verify_base_backup(tmp_path / "ok.tar.zst")["files"] == 3
+    _tar_zst(tmp_path / "bad.tar.zst", ["base/1/1259"])
+    with pytest.raises(backup.BackupError):
+        backup.verify_base_backup(tmp_path / "bad.tar.zst")
+
+
+def test_libpq_urls():
+    assert backup.libpq_url("postgresql+psycopg2://u:p@db:5432/tasuke") == "postgresql://u:p@db:5432/tasuke"
+    assert backup._replace_dbname("u:p@db:5432/tasuke?sslmode=require", "scratch") == "u:p@db:5432/scratch?sslmode=require"
+
+
+@pytest.mark.skipif(
+    not os.getenv("BACKUP_TEST_DATABASE_URL") or not shutil.which("pg_dump"),
+    reason="needs BACKUP_TEST_DATABASE_URL (a role with CREATEDB) and the Postgres client tools",
+)
+def test_dump_and_verify_against_local_postgres(tmp_path):
+    import psycopg2
+    url = os.environ["BACKUP_TEST_DATABASE_URL"]
+    conn = psycopg2.connect(backup.libpq_url(url))
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("CREATE TABLE IF NOT EXISTS backup_smoke (id serial PRIMARY KEY, body text)")
+        cur.execute("INSERT INTO backup_smoke (body) SELECT repeat('x', 100) FROM generate_series(1, 1000)")
+    conn.close()
+    manifest = backup.dump(url, tmp_path, jobs=2)
+    assert manifest["compressed_bytes"] < manifest["raw_bytes"]
+    assert manifest["verify"]["ok"] and manifest["verify"]["rows"] >= 1000
+    assert (tmp_path / "dumps" / manifest["name"] / "toc.dat.zst").exists()
+
+
+def test_dump_is_only_renamed_after_it_verifies(tmp_path, monkeypatch):
+    def fake_run(cmd, **kwargs):
+        dump_dir = Path(next(arg for arg in cmd if arg.startswith("--file=")).split("=", 1)[1])
+        dump_dir.mkdir()
+        (dump_dir / "toc.dat").write_bytes(b"toc" * 100)
+
+    def failing_verify(dump_dir, url, jobs, name=None):
+        assert dump_dir.name == f".{name}.partial"
+        raise backup.BackupError("restored dump is missing tables: public.tasks")
+
+    monkeypatch.setattr(backup, "run", fake_run)
+    monkeypatch.setattr(backup, "verify_dump", failing_verify)
+    with pytest.raises(backup.BackupError):
+        backup.dump("postgresql://u:p@db/tasuke", tmp_path, jobs=1)
+    assert list((tmp_path / "dumps").iterdir()) == []
+    monkeypatch.setattr(backup, "verify_dump", lambda dump_dir, url, jobs, name=None: {"ok": True})
+    manifest = backup.dump("postgresql://u:p@db/tasuke", tmp_path, jobs=1)
+    assert [p.name for p in (tmp_path / "dumps").iterdir()] == [manifest["name"]]
+    assert orjson.loads((tmp_path / "dumps" / manifest["name"] / "manifest.json").read_bytes())["verify"] == {"ok": True}
@@ -0,0 +1,57 @@
+import asyncio
+import time
+import openai
+from backend.benchmarks.fakes import FakeOpenAIServer, FakeSlackSource
+from backend.benchmarks.results import compare, latency_summary, percentile
+from backend.app.integrations.slack_events import note_from_event
+
+TOOLS = [{"type": "function", "function": {"name": "read_raw_notes", "parameters": {"type": "object", "properties": {}}}}]
+
+
+def test_fake_openai_server_answers_the_openai_client():
+    with FakeOpenAIServer(latency_ms=50, tokens_per_sec=1000, completion_tokens=100, tool_call_rate=1.0) as server:
+        client = openai.AsyncOpenAI(base_url=server.base_url, api_key="test")
+
+        async def call(tools):
+            started = time.perf_counter()
+            response = await client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x" * 400}], tools=tools)
+            return response, time.perf_counter() - started
+
+        async def both():
+            return await call(TOOLS), await call(None)
+
+        (with_tools, elapsed), (plain, _) = asyncio.run(both())
+    assert elapsed >= server.response_seconds()  # 50ms latency + 100 tokens at 1000/s
+    assert with_tools.choices[0].message.tool_calls[0].function.name == "read_raw_notes"
+    assert with_tools.usage.prompt_tokens == 100
+    assert plain.choices[0].message.tool_calls is None
+    assert server.stats()["requests"] == 2
+    assert server.stats()["tool_call_responses"] == 1
+
+
+def test_fake_slack_source_is_seeded():
+    a = FakeSlackSource(seed=3, prefix="[bench x] ").events(200)
+    b = FakeSlackSource(seed=3, prefix="[bench x] ").events(200)
+    assert a == b
+    notes = [note_from_event(e) for e in a]
+    assert all(n["content"].startswith("[bench x] ") for n in notes if n)
+    assert any(n is None for n in notes)  # bot/edit noise is filtered like real events
+    assert any("thread_ts" in e for e in a)
+    history = FakeSlackSource(seed=3).web_client(history=50).conversations_history(channel="C1", limit=100)
+    assert len(history["messages"]) == 50
+
+
+def test_compare_flags_regressions_by_metric_direction():
+    baseline = {"results": {"ingest": {"notes_per_sec": 100, "p99_ms": 10.0, "notes": 1000}}}
+    current = {"results": {"ingest": {"notes_per_sec": 80, "p99_ms": 8.0, "notes": 5}, "new": {"p50_ms": 1}}}
+    rows = {row["metric"]: row for row in compare(current, baseline, tolerance=0.1)}
+    assert rows["notes_per_sec"]["regression"] is True
+    assert rows["p99_ms"]["improvement"] is True and rows["p99_ms"]["regression"] is False
+    assert rows["notes"]["regression"] is False  # counts are informational
+    assert set(rows) == {"notes_per_sec", "p99_ms", "notes"}
+
+
+def test_latency_summary():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 51
+    assert latency_summary(samples, prefix="x_") == {"x_p50_ms": 51, "x_p99_ms": 99, "x_max_ms": 100}
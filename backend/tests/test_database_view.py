@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+from backend.app.api.database import get_table, list_columns, filter_clauses, encode_cursor, keyset_clause
+
+def test_heavy_columns_hidden_unless_included():
+    table = get_table("messages")
+    assert "content" not in [c.name for c in list_columns(table, None)]
+    assert "content_vector" not in [c.name for c in list_columns(table, ["content"])]
+    assert "content_vector" in [c.name for c in list_columns(table, ["*"])]
+
+def test_filters_are_allowlisted():
+    table = get_table("threads")
+    assert len(filter_clauses(table, {"status": "active", "created_at__gte": "2025-06-01", "limit": "10"})) == 2
+    with pytest.raises(HTTPException):
+        filter_clauses(table, {"summary": "x"})
+    with pytest.raises(HTTPException):
+        filter_clauses(table, {"error_count": "many"})
+
+def test_composite_key_pages_on_the_whole_key():
+    table = get_table("message_keys")
+    cursor = encode_cursor(table, {"role": "user", "content_hash": "ab12", "message_id": 7})
+    clause = keyset_clause(table, cursor)
+    sql = str(clause.compile(compile_kwargs={"literal_binds": True}))
+    assert sql == "(message_keys.role, message_keys.content_hash) < ('user', 'ab12')"
+    assert encode_cursor(get_table("threads"), {"id": 42}) == 42
+    with pytest.raises(HTTPException):
+        keyset_clause(table, "not-a-cursor")
+    with pytest.raises(HTTPException):
+        keyset_clause(table, "WyJ1c2VyIl0=")  # ["user"]: one value for a two-column key
+
+@pytest.mark.requires_db
+@pytest.mark.asyncio
+async def test_browse_threads_keyset():
+    from backend.app.main import app
+    transport = ASGITransport(app=app)
+    async with AsyncClient(base_url="http://test", transport=transport, follow_redirects=True) as ac:
+        response = await ac.get("/api/v1/db/tables/threads", params={"limit": 2})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total_is_estimate"] is True
+        if body["next_cursor"] is not None:
+            page = await ac.get("/api/v1/db/tables/threads", params={"limit": 2, "after": body["next_cursor"]})
+            assert all(row["id"] < body["next_cursor"] for row in page.json()["rows"])
@@ -1,6 +1,8 @@
+import pytest
 from backend.app.db.session import SessionLocal
 from sqlalchemy import text
 
+@pytest.mark.requires_db
 def test_db_connection():
     session = SessionLocal()
     try:
@@ -0,0 +1,114 @@
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from backend.app.db import instrumentation
+from backend.app.db.instrumentation import EngineInstrumentation, TimedQueuePool, explainable, fingerprint, instrument_engine
+
+
+def test_fingerprint_normalises_literals_and_lists():
+    a = fingerprint("SELECT * FROM raw_notes WHERE id = 1 AND source = 'slack'")
+    b = fingerprint("select * from raw_notes\n  where id = 42   AND source = 'it''s'")
+    assert a == "SELECT * FROM raw_notes WHERE id = ? AND source = ?"
+    assert b.lower() == a.lower()
+    assert fingerprint("SELECT 1 FROM t WHERE id IN (1, 2, 3)") == fingerprint("SELECT 1 FROM t WHERE id IN (%(id_1)s)")
+    assert fingerprint("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y')") == "INSERT INTO t (a, b) VALUES (?, ?)"
+
+
+def test_only_plain_reads_are_explained():
+    assert explainable("SELECT id FROM threads WHERE status = 'active'")
+    assert explainable("WITH x AS (SELECT 1) SELECT * FROM x")
+    assert not explainable("UPDATE threads SET status = 'paused'")
+    assert not explainable("WITH d AS (DELETE FROM t RETURNING id) SELECT * FROM d")
+    assert not explainable("SELECT * FROM threads FOR UPDATE")
+    assert not explainable("SELECT pg_try_advisory_lock(1, 2)")
+
+
+def _engine(**kwargs):
+    engine = create_engine("sqlite://", poolclass=TimedQueuePool, pool_size=1, max_overflow=0, **kwargs)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY, content TEXT)"))
+    return engine
+
+
+def test_statements_are_timed_per_fingerprint():
+    engine = _engine()
+    stats = instrument_engine(engine, name="test", slow_query_ms=10_000, explain=False)
+    with engine.begin() as conn:
+        for i in range(5):
+            conn.execute(text("INSERT INTO notes (id, content) VALUES (:id, :c)"), {"id": i, "c": f"n{i}"})
+        conn.execute(text("SELECT * FROM notes WHERE id = 3"))
+        conn.execute(text("SELECT * FROM notes WHERE id = 4"))
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing"))
+    rows = {row["fingerprint"]: row for row in stats.query_stats(limit=100)}
+    assert rows["INSERT INTO notes (id, content) VALUES (?, ?)"]["count"] == 5
+    assert rows["SELECT * FROM notes WHERE id = ?"]["count"] == 2
+    assert rows["SELECT * FROM missing"]["errors"] == 1
+    assert instrumentation.get_instrumentation("test") is stats
+
+
+
+def test_async_engines_are_never_explained():
+    from sqlalchemy.ext.asyncio import create_async_engine
+    engine = create_async_engine("postgresql+asyncpg://u:p@localhost/x")
+    assert instrument_engine(engine.sync_engine, name="test-async", explain=True).explain is False
+    assert instrument_engine(_engine(), name="test", explain=True).explain is True
+
+def test_slow_read_gets_one_plan_per_cooldown(monkeypatch):
+    engine = _engine()
+    stats = instrument_engine(engine, name="test", slow_query_ms=0, explain=True, explain_cooldown=60)
+    captured = []
+
+    def fake_plan(statement, parameters):
+        captured.append(statement)
+        return [{"Execution Time": 1.5, "Planning Time": 0.1, "Plan": {"Node Type": "Seq Scan", "Shared Read Blocks": 3}}]
+
+    monkeypatch.setattr(stats, "capture_plan", fake_plan)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE notes SET content = 'x'"))
+        conn.execute(text("SELECT * FROM notes WHERE id = 1"))
+        conn.execute(text("SELECT * FROM notes WHERE id = 2"))
+    deadline = time.monotonic() + 2
+    while not stats.plans and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert captured == ["SELECT * FROM notes WHERE id = 1"]
+    plan = stats.slow_plans()[0]
+    assert plan["summary"]["node"] == "Seq Scan"
+    assert plan["summary"]["shared_read_blocks"] == 3
+
+
+def test_pool_wait_and_timeouts_are_recorded():
+    engine = _engine(pool_timeout=0.2)
+    stats = instrument_engine(engine, name="test", explain=False)
+    held = engine.connect()
+    released = threading.Event()
+
+    def release():
+        time.sleep(0.1)
+        held.close()
+        released.set()
+
+    threading.Thread(target=release).start()
+    with engine.connect() as conn:  # waits for the held connection
+        assert engine.pool.checkedout() == 1
+    released.wait(1)
+    pool = stats.pool_stats()
+    assert pool["size"] == 1
+    assert pool["wait_max_ms"] >= 50
+    assert pool["checkouts"] >= 2
+
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    held.close()
+    assert stats.pool_stats()["timeouts"] == 1
+
+
+def test_dispose_keeps_pool_telemetry():
+    engine = _engine()
+    stats = instrument_engine(engine, name="test", explain=False)
+    engine.dispose()
+    assert engine.pool._telemetry is stats.pool
+    assert isinstance(stats, EngineInstrumentation)
@@ -0,0 +1,57 @@
+import asyncio
+from backend.app.agents.debounce import BurstDebouncer, debounce_key
+
+def test_debounce_key():
+    assert debounce_key({"channel": "C1", "ts": "1.0"}) == "C1"
+    assert debounce_key({"channel": "C1", "ts": "2.0", "thread_ts": "1.0"}) == "C1:1.0"
+
+def run_scenario(scenario, **options):
+    launches = []
+
+    async def launch(key, note_ids):
+        launches.append((key, list(note_ids)))
+
+    async def main():
+        debouncer = BurstDebouncer(launch, **options)
+        await scenario(debouncer)
+        await debouncer.close()
+        return debouncer.metrics()
+
+    return launches, asyncio.run(main())
+
+def test_burst_becomes_one_launch_after_quiet_period():
+    async def burst(debouncer):
+        for i in range(30):
+            debouncer.add("C1", i)
+            await asyncio.sleep(0.001)
+        debouncer.add("C2:9.0", 100)
+        await asyncio.sleep(0.1)
+
+    launches, metrics = run_scenario(burst, quiet_seconds=0.03, max_wait_seconds=5, max_batch=100)
+    assert sorted(launches) == [("C1", list(range(30))), ("C2:9.0", [100])]
+    assert metrics["batches"] == 2
+    assert metrics["agent_runs_saved"] == 29
+    assert metrics["flush_reasons"] == {"quiet": 2}
+    assert metrics["largest_batch"] == 30
+
+def test_max_wait_caps_a_channel_that_never_goes_quiet():
+    async def chatter(debouncer):
+        for i in range(20):
+            debouncer.add("C1", i)
+            await asyncio.sleep(0.01)  # always inside the quiet period
+
+    launches, metrics = run_scenario(chatter, quiet_seconds=0.05, max_wait_seconds=0.08, max_batch=100)
+    assert len(launches) >= 2
+    assert [n for _, ids in launches for n in ids] == list(range(20))
+    assert metrics["flush_reasons"]["max_wait"] >= 1
+
+def test_max_batch_and_shutdown_flush():
+    async def flood(debouncer):
+        for i in range(25):
+            debouncer.add("C1", i)
+        await asyncio.sleep(0)
+
+    launches, metrics = run_scenario(flood, quiet_seconds=10, max_wait_seconds=60, max_batch=10)
+    assert [len(ids) for _, ids in launches] == [10, 10, 5]
+    assert metrics["flush_reasons"] == {"max_batch": 2, "shutdown": 1}
+    assert metrics["open_windows"] == 0
@@ -5,4 +5,10 @@ def test_health():
     client = TestClient(app)
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"} 
\ No newline at end of file
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["leader"] is None  # cached by the election thread, which doesn't run here
+    assert body["process"]["role"] == "slack-listener"
+    # None until this process has used the DB (always the case offline)
+    assert "relevance" in body  # None until this process has filtered a batch
+    assert body["db_pool"] is None or "checked_out" in body["db_pool"]
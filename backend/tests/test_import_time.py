@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import pytest
+
+# Cumulative import time (python -X importtime) of each entry point, in ms. Measured
+# around 0.6s (API) and 0.25-0.35s (worker modules); the slack leaves room for slower
+# machines. IMPORT_TIME_BUDGET_SCALE stretches every budget, e.g. on a loaded CI runner.
+BUDGETS_MS = {
+    "backend.app.main": 1500,
+    "backend.app.worker.embeddings": 800,
+    "backend.app.worker.agents": 800,
+    "backend.app.worker.maintenance": 1000,
+}
+# Integrations that must only load when something actually uses them
+LAZY_MODULES = ("slack_bolt", "slack_sdk", "openai", "langgraph", "langchain_core", "pypdf", "pypdfium2")
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def import_profile(module: str) -> dict:
+    """{module: cumulative microseconds} for a fresh interpreter importing `module`, offline."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SLACK_")}
+    env.setdefault("DATABASE_URL", "postgresql://tasuke@127.0.0.1:1/unreachable")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    profile = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                profile[name.strip()] = int(cumulative)
+    return profile
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_entry_point_import_budget(module):
+    scale = float(os.getenv("IMPORT_TIME_BUDGET_SCALE", "1"))
+    # best of three: the budget is about what the import does, not scheduler noise
+    profiles = [import_profile(module) for _ in range(3)]
+    loaded = set(profiles[0])
+    assert not loaded.intersection(LAZY_MODULES), f"{module} imports {sorted(loaded.intersection(LAZY_MODULES))} eagerly"
+    best_ms = min(p[module] for p in profiles) / 1000
+    assert best_ms <= BUDGETS_MS[module] * scale, f"{module} took {best_ms:.0f}ms to import (budget {BUDGETS_MS[module] * scale:.0f}ms)"
+
+
+def test_importing_the_api_creates_no_clients():
+    code = (
+        "import backend.app.main, backend.app.db.session as s, backend.app.core.openrouter as o, backend.app.integrations.slack as sl;"
+        "print(s._engine is None, o._client is None, sl._app is None)"
+    )
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SLACK_")}
+    env.setdefault("DATABASE_URL", "postgresql://tasuke@127.0.0.1:1/unreachable")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.split() == ["True", "True", "True"]
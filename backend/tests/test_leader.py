@@ -0,0 +1,85 @@
+from backend.app.core.leader import LeaderElection, lock_key
+
+class FakeLock:
+    """Stands in for the advisory lock: one holder, released when its session drops."""
+    def __init__(self):
+        self.holder = None
+
+def elector(lock, name, events):
+    election = LeaderElection(
+        "slack-listener",
+        on_elected=lambda: events.append(("elected", name)),
+        on_demoted=lambda: events.append(("demoted", name)),
+        heartbeat=0.01,
+        database_url="postgresql://unused",
+    )
+    election.alive = True
+
+    def try_acquire():
+        if not election.alive:
+            raise ConnectionError("server closed the connection")
+        if lock.holder in (None, name):
+            lock.holder = name
+            return True
+        return False
+
+    def ping():
+        if not election.alive:
+            raise ConnectionError("server closed the connection")
+
+    def disconnect():
+        if lock.holder == name:
+            lock.holder = None
+
+    election._try_acquire = try_acquire
+    election._ping = ping
+    election._current_leader = lambda: {"identity": lock.holder} if lock.holder else None
+    election._release = lambda: None
+    election._disconnect = disconnect
+    return election
+
+def test_lock_key_is_stable_int4():
+    assert lock_key("slack-listener") == lock_key("slack-listener")
+    assert 0 <= lock_key("slack-listener") < 2 ** 31
+    assert lock_key("slack-listener") != lock_key("other")
+
+def test_single_leader_and_failover():
+    lock, events = FakeLock(), []
+    a, b = elector(lock, "a", events), elector(lock, "b", events)
+    a.step(); b.step()
+    assert a.is_leader and not b.is_leader
+    assert events == [("elected", "a")]
+    a.step(); b.step()
+    assert events == [("elected", "a")]  # heartbeats don't re-run duties
+    assert a.status()["leader"]["identity"] == a.identity
+    assert b.status()["leader"] == {"identity": "a"}  # cached from the follower's heartbeat
+
+    a.alive = False  # leader's session dies
+    a.step()
+    assert not a.is_leader and lock.holder is None
+    b.step()
+    assert b.is_leader
+    assert events == [("elected", "a"), ("demoted", "a"), ("elected", "b")]
+
+def test_failed_duties_step_down():
+    lock, events = FakeLock(), []
+    a = elector(lock, "a", events)
+    def broken():
+        raise RuntimeError("no SLACK_APP_TOKEN")
+    a.on_elected = broken
+    a.step()
+    assert not a.is_leader
+    assert lock.holder is None
+
+def test_stop_releases_leadership():
+    lock, events = FakeLock(), []
+    a = elector(lock, "a", events)
+    a.start()
+    for _ in range(100):
+        if a.is_leader:
+            break
+        a._stop.wait(0.01)
+    a.stop()
+    assert not a.is_leader
+    assert lock.holder is None
+    assert events == [("elected", "a"), ("demoted", "a")]
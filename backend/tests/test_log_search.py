@@ -0,0 +1,78 @@
+import orjson
+from datetime import datetime
+from backend.app.core import log_search
+
+def json_line(ts, level, name, message):
+    record = {"time": {"timestamp": ts}, "level": {"name": level}, "name": name, "message": message, "extra": {}}
+    return orjson.dumps({"text": message, "record": record}) + b"\n"
+
+def use_logs_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(log_search, "LOGS_DIR", str(tmp_path))
+    monkeypatch.setattr(log_search, "INDEX_DIR", tmp_path / ".index")
+    monkeypatch.setattr(log_search, "_index_cache", log_search.OrderedDict())
+
+def test_parse_text_line():
+    entry = log_search.parse_line(b"2025-06-01 12:00:00.123 | ERROR    | backend.app.core.openrouter:chat_completion:43 - OpenRouter API error\n")
+    assert entry["level"] == "ERROR"
+    assert entry["component"] == "backend.app.core.openrouter"
+    assert entry["message"] == "OpenRouter API error"
+
+def test_search_filters_level_component_and_time(monkeypatch, tmp_path):
+    use_logs_dir(monkeypatch, tmp_path)
+    base = datetime(2025, 6, 1, 12, 0).timestamp()
+    with open(tmp_path / "tasuke.log", "wb") as f:
+        for i in range(1000):
+            level = "ERROR" if i % 100 == 0 else "INFO"
+            name = "backend.app.agents.data_agent" if i % 2 == 0 else "backend.app.api.threads"
+            f.write(json_line(base + i * 10, level, name, f"event {i}"))
+    errors = log_search.search_logs("tasuke", levels=["error"], component="backend.app.agents")
+    assert [e["message"] for e in errors][:2] == ["event 900", "event 800"]
+    window = log_search.search_logs("tasuke", start=datetime.fromtimestamp(base + 5000), end=datetime.fromtimestamp(base + 5090), query="EVENT 50")
+    assert [e["message"] for e in window] == ["event 509", "event 508", "event 507", "event 506", "event 505", "event 504", "event 503", "event 502", "event 501", "event 500"]
+    assert not (tmp_path / ".index" / "tasuke.log.idx").exists()  # active file: in memory until the nightly build
+    log_search.build_indexes()
+    assert (tmp_path / ".index" / "tasuke.log.idx").exists()
+
+def test_index_extends_incrementally(monkeypatch, tmp_path):
+    use_logs_dir(monkeypatch, tmp_path)
+    path = tmp_path / "tasuke.log"
+    path.write_bytes(json_line(1000.0, "INFO", "a", "first"))
+    assert len(log_search.get_index(path)["lines"]) == 1
+    with open(path, "ab") as f:
+        f.write(json_line(1001.0, "WARNING", "a", "second"))
+    index = log_search.get_index(path)
+    assert len(index["lines"]) == 2
+    assert "WARNING" in index["levels"]
+
+def test_active_index_persists_only_from_the_nightly_build(monkeypatch, tmp_path):
+    use_logs_dir(monkeypatch, tmp_path)
+    active = tmp_path / "tasuke.log"
+    rotated = tmp_path / "tasuke.2025-06-01_00-00-00_000000.log"
+    rotated.write_bytes(json_line(900.0, "INFO", "a", "old"))
+    active.write_bytes(json_line(1000.0, "INFO", "a", "first"))
+    log_search.search_logs("tasuke")
+    assert (tmp_path / ".index" / f"{rotated.name}.idx").exists()
+    assert not (tmp_path / ".index" / "tasuke.log.idx").exists()
+    log_search.build_indexes()
+    with open(active, "ab") as f:
+        f.write(json_line(1001.0, "INFO", "a", "second"))
+    assert len(log_search.get_index(active)["lines"]) == 2
+    on_disk = orjson.loads((tmp_path / ".index" / "tasuke.log.idx").read_bytes())
+    assert len(on_disk["lines"]) == 1 and "dirty" not in on_disk
+    log_search.build_indexes()
+    assert len(orjson.loads((tmp_path / ".index" / "tasuke.log.idx").read_bytes())["lines"]) == 2
+
+def test_index_cache_keeps_only_recent_files(monkeypatch, tmp_path):
+    use_logs_dir(monkeypatch, tmp_path)
+    monkeypatch.setattr(log_search, "INDEX_CACHE_FILES", 2)
+    active = tmp_path / "tasuke.log"
+    active.write_bytes(json_line(1000.0, "INFO", "a", "first"))
+    log_search.get_index(active)
+    for day in (1, 2, 3):
+        rotated = tmp_path / f"tasuke.2025-06-0{day}_00-00-00_000000.log"
+        rotated.write_bytes(json_line(900.0 + day, "INFO", "a", "old"))
+        log_search.get_index(rotated)
+    assert list(log_search._index_cache) == ["tasuke.2025-06-02_00-00-00_000000.log", "tasuke.2025-06-03_00-00-00_000000.log"]
+    with open(active, "ab") as f:
+        f.write(json_line(1001.0, "INFO", "a", "second"))
+    assert len(log_search.get_index(active)["lines"]) == 2  # rebuilt after eviction
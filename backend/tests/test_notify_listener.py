@@ -0,0 +1,155 @@
+import pytest
+import asyncio
+from datetime import datetime
+import orjson
+from backend.app.db.notify import RAW_NOTES_CHANNEL, THREADS_CHANNEL
+from backend.app.worker import notify_listener
+from backend.app.worker.notify_listener import NotifyDispatcher, catch_up
+
+class FakeConnection:
+    """Serves the catch-up keyset queries from in-memory rows."""
+    def __init__(self, notes, threads):
+        self.notes = notes
+        self.threads = threads
+
+    async def fetch(self, sql, *args):
+        if "FROM raw_notes" in sql:
+            after, limit = args
+            return [n for n in self.notes if n["id"] > after][:limit]
+        if "FROM threads" in sql:
+            updated_at, thread_id, limit = args
+            return [t for t in self.threads if (t["updated_at"], t["id"]) > (updated_at, thread_id)][:limit]
+        raise AssertionError(sql)
+
+def recording_dispatcher():
+    notes, threads = [], []
+
+    async def on_note(event):
+        notes.append(event["id"])
+
+    async def on_thread(event):
+        threads.append(event)
+
+    return NotifyDispatcher(on_note, on_thread, seen=100), notes, threads
+
+def test_notifications_route_and_drop_repeats():
+    dispatcher, notes, threads = recording_dispatcher()
+
+    async def scenario():
+        await dispatcher.notification(RAW_NOTES_CHANNEL, orjson.dumps({"id": 5, "source": "slack", "channel": "C1"}))
+        await dispatcher.notification(RAW_NOTES_CHANNEL, orjson.dumps({"id": 4, "source": "slack", "channel": "C1"}))
+        await dispatcher.notification(RAW_NOTES_CHANNEL, orjson.dumps({"id": 5, "source": "slack", "channel": "C1"}))
+        await dispatcher.notification(THREADS_CHANNEL, orjson.dumps({
+            "id": 9, "status": "active", "old_status": "paused", "agent": "data_agent", "updated_at": "2026-10-19T10:00:00.5",
+        }))
+
+    asyncio.run(scenario())
+    assert notes == [5, 4]  # commit order, each once
+    assert dispatcher.last_note_id == 5
+    assert threads[0]["old_status"] == "paused"
+    assert dispatcher.thread_mark == (datetime(2026, 10, 19, 10, 0, 0, 500000), 9)
+    assert dispatcher.unsaved == {RAW_NOTES_CHANNEL: 2, THREADS_CHANNEL: 1}
+
+def test_catch_up_replays_from_marks_in_pages(monkeypatch):
+    monkeypatch.setattr(notify_listener, "CATCH_UP_PAGE", 3)
+    base = datetime(2026, 10, 19, 9, 0)
+    conn = FakeConnection(
+        notes=[{"id": i, "source": "slack", "channel": "C1"} for i in range(1, 11)],
+        threads=[
+            {"id": i, "status": "active", "agent": "data_agent", "updated_at": base.replace(minute=i), "missed_resume": i == 4}
+            for i in range(1, 5)
+        ],
+    )
+    dispatcher, notes, threads = recording_dispatcher()
+    dispatcher.thread_mark = (base.replace(minute=2), 2)
+
+    async def scenario():
+        for i in (1, 2, 3, 6):  # handled live before the connection dropped; 4 and 5 committed late
+            await dispatcher.raw_note({"id": i, "source": "slack", "channel": "C1"})
+        return await catch_up(conn, dispatcher, overlap=5)
+
+    replayed = asyncio.run(scenario())
+    assert notes == [1, 2, 3, 6, 4, 5, 7, 8, 9, 10]
+    assert dispatcher.last_note_id == 10
+    assert [t["id"] for t in threads] == [3, 4]
+    assert all(t["old_status"] is None for t in threads)
+    assert [t["missed_resume"] for t in threads] == [False, True]
+    assert replayed == 9 + 2  # ids 2..10 re-scanned from the overlap floor, plus two threads
+
+def test_only_resumed_data_agent_threads_are_rerun(monkeypatch):
+    queued = []
+    class FakeTask:
+        @staticmethod
+        def delay(thread_id):
+            queued.append(thread_id)
+    import backend.app.worker.agents as agents
+    monkeypatch.setattr(agents, "resume_data_agent_task", FakeTask)
+    notify_listener.resume_thread({"id": 1, "status": "active", "old_status": "paused", "agent": "data_agent"})
+    notify_listener.resume_thread({"id": 2, "status": "active", "old_status": None, "agent": "data_agent"})
+    notify_listener.resume_thread({"id": 3, "status": "active", "old_status": "paused", "agent": "curator"})
+    notify_listener.resume_thread({"id": 4, "status": "failed", "old_status": "active", "agent": "data_agent"})
+    notify_listener.resume_thread({"id": 5, "status": "active", "old_status": None, "agent": "data_agent", "missed_resume": True})
+    assert queued == [1, 5]
+
+@pytest.mark.requires_db
+def test_catch_up_replays_requested_resumes_but_not_finished_runs(monkeypatch):
+    import asyncpg
+    from datetime import timedelta
+    from fastapi.testclient import TestClient
+    from backend.app.agents.data_agent import resume_data_agent, run_data_agent
+    from backend.app.core import openrouter
+    from backend.app.db.async_session import asyncpg_dsn
+    from backend.app.db.models import Thread
+    from backend.app.db.session import get_db
+    from backend.app.main import app
+    import backend.app.worker.agents as agents
+
+    class FakeClient:
+        async def chat_completion(self, *args, **kwargs):
+            message = type("obj", (object,), {"role": "assistant", "content": "Nothing to store here."})()
+            return type("obj", (object,), {"choices": [type("obj", (object,), {"message": message})()]})()
+
+    queued = []
+    class FakeTask:
+        @staticmethod
+        def delay(thread_id):
+            queued.append(thread_id)
+    monkeypatch.setattr(openrouter, "_client", FakeClient())
+    monkeypatch.setattr(agents, "resume_data_agent_task", FakeTask)
+
+    db = next(get_db())
+    try:
+        thread = Thread(status="active", agent="data_agent")
+        db.add(thread)
+        db.commit()
+        db.refresh(thread)
+        thread_id, since = thread.id, thread.created_at - timedelta(seconds=1)
+    finally:
+        db.close()
+
+    async def replay():
+        async def on_thread(event):
+            notify_listener.resume_thread(event)
+
+        async def on_note(event):
+            pass
+
+        dispatcher = NotifyDispatcher(on_note, on_thread)
+        dispatcher.last_note_id = 2 ** 31 - 1  # threads only
+        dispatcher.thread_mark = (since, 0)
+        conn = await asyncpg.connect(asyncpg_dsn())
+        try:
+            await catch_up(conn, dispatcher)
+        finally:
+            await conn.close()
+        return [t for t in queued if t == thread_id]
+
+    result = asyncio.run(run_data_agent(thread_id, context="lunch anyone?"))
+    assert result["ok"] is True and result["status"] == "success"
+    assert asyncio.run(replay()) == []  # a finished run is not a missed resume
+    assert TestClient(app).post(f"/api/v1/threads/{thread_id}/resume").status_code == 200
+    assert asyncio.run(replay()) == [thread_id]
+    assert asyncio.run(resume_data_agent(thread_id))["status"] == "success"
+    assert asyncio.run(resume_data_agent(thread_id)) == {"ok": True, "skipped": True}  # claimed once
+    queued.clear()
+    assert asyncio.run(replay()) == []
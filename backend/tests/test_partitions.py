@@ -0,0 +1,27 @@
+import pytest
+from datetime import date
+from backend.app.db.partitions import add_months, partition_name, partition_month, maintain_partitions, list_partitions
+
+def test_add_months_wraps_year():
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+
+def test_partition_name_roundtrip():
+    name = partition_name("raw_notes", date(2025, 6, 1))
+    assert name == "raw_notes_p2025_06"
+    assert partition_month(name) == date(2025, 6, 1)
+    assert partition_month("raw_notes_default") is None
+
+@pytest.mark.requires_db
+def test_maintain_partitions_premakes_months():
+    from backend.app.db.session import SessionLocal
+    db = SessionLocal()
+    try:
+        result = maintain_partitions(db, today=date.today())
+        assert result["ok"] is True
+        current = partition_name("messages", date.today().replace(day=1))
+        assert current in list_partitions(db, "messages")
+        # Second run is a no-op
+        assert maintain_partitions(db, today=date.today())["created"] == []
+    finally:
+        db.close()
@@ -0,0 +1,110 @@
+import multiprocessing
+import signal
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.app.api import admin
+from backend.app.core import profiling
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def test_profile_samples_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+    worker.start()
+    try:
+        result = profiling.profile(seconds=0.3, interval=0.002)
+    finally:
+        stop.set()
+        worker.join()
+    assert result["samples"] > 0
+    busy = [line for line in result["collapsed"].splitlines() if line.startswith("thread:busy;")]
+    assert busy and "busy_loop (" in busy[0]
+    stack, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+def test_only_one_profile_at_a_time():
+    assert profiling._profile_lock.acquire(blocking=False)
+    try:
+        try:
+            profiling.profile(seconds=0.1)
+            assert False, "expected ProfilerBusy"
+        except profiling.ProfilerBusy:
+            pass
+    finally:
+        profiling._profile_lock.release()
+
+leaked = []
+
+def leak(n):
+    leaked.extend(bytearray(1024) for _ in range(n))
+
+def test_allocation_diff_finds_growth():
+    profiling.start_allocation_tracking(frames=5)
+    try:
+        leak(500)
+        diff = profiling.allocation_diff(limit=5)
+    finally:
+        profiling.stop_allocation_tracking()
+        leaked.clear()
+    assert diff["top"][0]["size_diff"] >= 500 * 1024
+    assert "test_profiling.py" in diff["top"][0]["location"]
+
+def admin_client():
+    app = FastAPI()
+    app.include_router(admin.router)
+    return TestClient(app)
+
+def test_admin_routes_are_guarded(monkeypatch):
+    client = admin_client()
+    monkeypatch.setattr(admin.settings, "ADMIN_TOKEN", "")
+    assert client.post("/api/v1/admin/profile?seconds=0.1").status_code == 404
+    monkeypatch.setattr(admin.settings, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/v1/admin/profile?seconds=0.1", headers={"X-Admin-Token": "nope"}).status_code == 403
+    response = client.post("/api/v1/admin/profile?seconds=0.1&format=json", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["samples"] > 0
+
+def _pool_child(ready):
+    from backend.app.worker import control
+    control.install_profile_handler()
+    ready.set()
+    while True:
+        time.sleep(0.05)
+
+def _main_process(profile_dir, start, replies):
+    # stands in for one per-queue Celery main process with a single pool child
+    from backend.app.worker import control
+    control.PROFILE_DIR = profile_dir
+    ctx = multiprocessing.get_context("fork")
+    ready = ctx.Event()
+    child = ctx.Process(target=_pool_child, args=(ready,), daemon=True)
+    child.start()
+    ready.wait(5)
+    state = SimpleNamespace(consumer=SimpleNamespace(pool=SimpleNamespace(info={"processes": [child.pid]})))
+    start.wait(5)
+    try:
+        results = control.dispatch(state, "profile", {"seconds": 0.2, "interval": 0.01}, wait=5)
+    finally:
+        child.kill()
+    replies.put({process: result["ok"] for process, result in results.items()})
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR2"), reason="pool processes are signalled with SIGUSR2")
+def test_concurrent_dispatchers_get_their_own_replies(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    start, replies = ctx.Barrier(2), ctx.Queue()
+    mains = [ctx.Process(target=_main_process, args=(tmp_path, start, replies)) for _ in range(2)]
+    for main in mains:
+        main.start()
+    results = [replies.get(timeout=20) for _ in mains]
+    for main in mains:
+        main.join(5)
+    for result in results:
+        assert len(result) == 2 and all(result.values()), result
+    assert not list(tmp_path.glob("request-*.json"))
+
@@ -0,0 +1,127 @@
+import asyncio
+import random
+import uuid
+import pytest
+from backend.app.agents.relevance import (
+    RelevanceFilter, RelevanceModel, features, label_thread, rule_reason, training_examples,
+)
+
+WORK = [
+    "Send the revised deck to Bharat before the client review on Friday",
+    "Codebase needs to be tested on Mac before the weekend session",
+    "Invoice for the May sprint is pending, please follow up with finance",
+    "Draft the hiring proposal and share the budget numbers with the team",
+    "Release blocked on the onboarding flow, design sync moved to Tuesday",
+]
+CHATTER = [
+    "haha that was a fun standup everyone",
+    "lunch anyone? the cafe downstairs is open",
+    "happy birthday have a great day",
+    "that meme in random was hilarious",
+    "coffee break in five minutes people",
+]
+
+
+def _examples(rng, n):
+    examples = []
+    for _ in range(n):
+        examples.append((features(rng.choice(WORK), "slack"), True, 1.0))
+        examples.append((features(rng.choice(CHATTER), "slack"), False, 1.0))
+    return examples
+
+
+def test_rules_catch_acks_emoji_and_short_notes():
+    assert rule_reason("   ") == "empty"
+    assert rule_reason(":+1: :tada:") == "emoji"
+    assert rule_reason("🙏🙏") == "emoji"
+    assert rule_reason("Thanks so much! 🙏") == "ack"
+    assert rule_reason("ok :thumbsup:") == "ack"
+    assert rule_reason("+1") == "ack"
+    assert rule_reason("lol", min_chars=0) == "ack"
+    assert rule_reason("on it", min_chars=12) == "short"
+    for status in ("done", "Done!", "yes", "no", "noted.", "will do", "nope :x:"):
+        assert rule_reason(status, min_chars=12) is None  # a thread reply closing or answering a task
+    assert rule_reason("see <@U123>", min_chars=12) is None
+    assert rule_reason("https://x.io", min_chars=20) is None
+    assert rule_reason(WORK[0], min_chars=12) is None
+
+
+def test_channel_allowlist_only_applies_to_slack():
+    allowlist = frozenset({"C1"})
+    assert rule_reason(WORK[0], "C2", "slack", 12, allowlist) == "channel"
+    assert rule_reason(WORK[0], "C1", "slack", 12, allowlist) is None
+    assert rule_reason(WORK[0], None, "granola", 12, allowlist) is None
+
+
+def test_model_separates_work_from_chatter_and_round_trips(tmp_path):
+    model = RelevanceModel.train(_examples(random.Random(0), 200))
+    assert model.predict(features("Please send the deck to the client by Friday", "slack")) > 0.8
+    assert model.predict(features("anyone up for coffee and lunch", "slack")) < 0.2
+    path = tmp_path / "model.json"
+    model.save(path)
+    loaded = RelevanceModel.load(path)
+    sample = features(WORK[1], "slack")
+    assert abs(loaded.predict(sample) - model.predict(sample)) < 1e-3
+
+
+def test_filter_skips_noise_and_counts_avoided_calls(tmp_path):
+    path = tmp_path / "model.json"
+    relevance = RelevanceFilter(model_path=path, threshold=0.5, min_chars=12, allowlist=())
+    assert relevance.filter([{"content": "coffee break in five minutes people", "source": "slack"}])  # no model yet
+    RelevanceModel.train(_examples(random.Random(1), 200)).save(path)
+    relevance = RelevanceFilter(model_path=path, threshold=0.5, min_chars=12, allowlist=())
+    assert relevance.filter([{"content": "thanks!"}, {"content": "lunch anyone? the cafe is open", "source": "slack"}]) == []
+    kept = relevance.filter([{"content": "ok"}, {"content": WORK[2], "source": "slack"}])
+    assert [n["content"] for n in kept] == [WORK[2]]
+    metrics = relevance.metrics()
+    assert metrics["model_loaded"] is True
+    assert metrics["notes"] == 4 and metrics["passed"] == 1
+    assert metrics["skipped_by_reason"] == {"ack": 2, "classifier": 1}
+    assert metrics["batches"] == 2 and metrics["llm_calls_avoided"] == 1
+    assert metrics["avg_decide_us"] < 1000
+
+
+def test_threads_labelled_from_agent_replies():
+    assert label_thread([]) is None
+    assert label_thread(["These messages are chatter and can be ignored."]) is False
+    assert label_thread(["Not relevant.", "Nothing to store here."]) is False
+    assert label_thread(["Not relevant.", "Who owns the Mac testing?"]) is True
+    assert label_thread([""]) is True  # tool call, no text
+
+
+@pytest.mark.requires_db
+def test_training_reads_threads_as_data_agent_batches_leave_them(monkeypatch):
+    from backend.app.agents import data_agent
+    from backend.app.core import openrouter
+    from backend.app.db.models import Thread
+    from backend.app.db.session import get_db
+    from backend.app.tools.raw_notes_tools import write_raw_notes
+
+    replies = iter(["Stored the task for Bharat.", "These messages are chatter and can be ignored.", "Stored it."])
+
+    class FakeClient:
+        async def chat_completion(self, *args, **kwargs):
+            message = type("obj", (object,), {"role": "assistant", "content": next(replies)})()
+            return type("obj", (object,), {"choices": [type("obj", (object,), {"message": message})()]})()
+
+    monkeypatch.setattr(openrouter, "_client", FakeClient())
+    monkeypatch.setattr(data_agent.settings, "RELEVANCE_FILTER_ENABLED", False)
+    run = uuid.uuid4().hex
+    texts = [f"{WORK[0]} {run}", f"{CHATTER[0]} {run}", f"{WORK[1]} {run}"]
+    threads = []
+    for i, text in enumerate(texts):
+        note = asyncio.run(write_raw_notes({"source": "slack", "source_note_id": f"{run}-{i}", "content": text, "channel": "C1"}))
+        result = asyncio.run(data_agent.run_data_agent_batch([note["id"]], source_key=f"slack:{run}"))
+        threads.append(result["thread_id"])
+    db = next(get_db())
+    try:
+        # the first as runs before the success status left it, the last as a failed run
+        db.query(Thread).filter(Thread.id == threads[0]).update({"status": "active"})
+        db.query(Thread).filter(Thread.id == threads[2]).update({"status": "failed"})
+        db.commit()
+        examples = {frozenset(feats): label for feats, label, _ in training_examples(db, limit=50)}
+    finally:
+        db.close()
+    assert examples.get(frozenset(features(texts[0], "slack"))) is True
+    assert examples.get(frozenset(features(texts[1], "slack"))) is False
+    assert frozenset(features(texts[2], "slack")) not in examples
@@ -0,0 +1,101 @@
+import asyncio
+import random
+import orjson
+from backend.benchmarks.replay import event_from_record, load_export, load_jsonl, run_step, saturation, schedule, with_redeliveries
+
+
+def test_loads_bare_events_and_envelopes(tmp_path):
+    path = tmp_path / "events.jsonl"
+    records = [
+        {"type": "message", "channel": "C1", "text": "bare", "ts": "1.0"},
+        {"event": {"type": "message", "channel": "C1", "text": "events api", "ts": "2.0"}},
+        {"payload": {"event": {"type": "message", "channel": "C1", "text": "socket mode", "ts": "3.0"}}},
+        {"event": {"type": "reaction_added", "reaction": "eyes"}},
+    ]
+    path.write_bytes(b"\n".join(orjson.dumps(r) for r in records) + b"\n")
+    assert [e["text"] for e in load_jsonl(str(path))] == ["bare", "events api", "socket mode"]
+    assert event_from_record({"type": "app_mention"}) is None
+
+
+def test_loads_slack_export(tmp_path):
+    (tmp_path / "channels.json").write_bytes(orjson.dumps([{"id": "C42", "name": "general"}]))
+    (tmp_path / "general").mkdir()
+    (tmp_path / "general" / "2025-06-02.json").write_bytes(orjson.dumps([{"type": "message", "text": "later", "ts": "20.0"}]))
+    (tmp_path / "general" / "2025-06-01.json").write_bytes(orjson.dumps([{"type": "message", "text": "first", "ts": "10.0"}]))
+    events = load_export(str(tmp_path))
+    assert [(e["channel"], e["text"]) for e in events] == [("C42", "first"), ("C42", "later")]
+
+
+def test_schedules_keep_the_mean_rate():
+    rng = random.Random(1)
+    assert schedule("steady", 10, 5, rng) == [0.0, 0.1, 0.2, 0.3, 0.4]
+    burst = schedule("burst", 100, 120, rng, burst_size=50)
+    assert burst[:50] == [0.0] * 50 and burst[50] == 0.5 and burst[100] == 1.0
+    poisson = schedule("poisson", 100, 5000, rng)
+    assert 45 < poisson[-1] < 55
+
+
+def test_redeliveries_follow_their_original():
+    events = [{"ts": str(i)} for i in range(1000)]
+    replayed = with_redeliveries(events, 0.1, random.Random(2))
+    assert 50 < len(replayed) - len(events) < 150
+    first = {}
+    for i, event in enumerate(replayed):
+        if event["ts"] in first:
+            assert 0 < i - first[event["ts"]] <= 11
+        first.setdefault(event["ts"], i)
+
+
+class SlowTarget:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.seen = set()
+
+    async def write(self, note):
+        await asyncio.sleep(self.seconds)
+        duplicate = note["content"] in self.seen
+        self.seen.add(note["content"])
+        return {"ok": True, "duplicate": duplicate}
+
+
+def test_run_step_counts_drops_duplicates_and_late_commits():
+    notes = [{"content": str(i % 8)} for i in range(10)]
+    result = asyncio.run(run_step(SlowTarget(0.05), notes, [0.0] * 10, max_pending=6, deadline_ms=20))
+    assert result["dropped"] == 4
+    assert result["written"] + result["duplicates"] == 6
+    assert result["late"] == 6
+    assert result["p50_ms"] >= 50
+
+
+def test_saturation_is_first_unsustained_rate():
+    curve = [
+        {"rate": 10, "dropped": 0, "failed": 0, "p99_ms": 40, "throughput_per_sec": 10, "achieved_offer_per_sec": 10},
+        {"rate": 50, "dropped": 0, "failed": 0, "p99_ms": 3500, "throughput_per_sec": 49, "achieved_offer_per_sec": 50},
+        {"rate": 100, "dropped": 9, "failed": 0, "p99_ms": 9000, "throughput_per_sec": 60, "achieved_offer_per_sec": 100},
+    ]
+    assert saturation(curve, deadline_ms=3000) == 50
+    assert saturation(curve[:1], deadline_ms=3000) is None
+
+
+def test_threads_target_goes_through_the_slack_handler(monkeypatch):
+    from backend.app.integrations import slack
+    from backend.benchmarks.replay import ThreadsTarget
+    written = []
+
+    async def fake_write(data):
+        written.append(data)
+        return {"ok": True, "id": len(written)}
+
+    monkeypatch.setattr(slack, "write_raw_notes", fake_write)
+    note = {"source": "slack", "source_note_id": "1700000000.000100", "content": "ship it", "author": "U1", "channel": "C1"}
+
+    async def scenario():
+        target = ThreadsTarget(concurrency=2)
+        try:
+            return await target.write(note)
+        finally:
+            await target.close()
+
+    assert asyncio.run(scenario()) == {"ok": True, "id": 1}
+    assert written == [note]
+    assert slack._app is None  # the Bolt App is never built
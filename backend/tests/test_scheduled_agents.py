@@ -0,0 +1,37 @@
+import pytest
+from backend.app.db.models import Thread, AgentWatermark
+from backend.app.db.session import get_db
+from backend.app.agents.curator_agent import run_curator_agent
+
+def fake_openrouter(monkeypatch, calls):
+    # Stand in for the lazily built client so no AsyncOpenAI (or OPENROUTER_API_KEY) is needed
+    from backend.app.core import openrouter
+    class FakeClient:
+        async def chat_completion(self, *args, **kwargs):
+            calls.append(kwargs["messages"])
+            class Dummy:
+                choices = [type("obj", (object,), {"message": type("obj", (object,), {"content": "all good"})()})]
+            return Dummy()
+    monkeypatch.setattr(openrouter, "_client", FakeClient())
+
+@pytest.mark.requires_db
+@pytest.mark.asyncio
+async def test_curator_only_sees_changes_since_watermark(monkeypatch):
+    monkeypatch.setattr("backend.app.core.config.settings.SCHEDULED_AGENT_LAG_SECONDS", 0)
+    calls = []
+    fake_openrouter(monkeypatch, calls)
+    db = next(get_db())
+    db.add(Thread(status="active", agent="data_agent"))
+    db.commit()
+
+    first = await run_curator_agent()
+    assert first["ok"] is True
+    assert len(calls) >= 1
+    watermark = db.get(AgentWatermark, "curator")
+    db.refresh(watermark)
+    assert watermark.high_water_mark is not None
+
+    calls.clear()
+    second = await run_curator_agent()
+    assert second["ok"] is True
+    assert second["rows"] == 0
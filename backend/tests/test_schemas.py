@@ -0,0 +1,19 @@
+import orjson
+from datetime import datetime
+from fastapi.responses import ORJSONResponse
+from backend.app.db.models import Thread, RawNote
+from backend.app.schemas.thread import ThreadResponse
+from backend.app.schemas.message import MessageResponse
+from backend.app.schemas.raw_note import RawNoteResponse
+
+def test_schema_columns_skip_vectors():
+    thread_columns = [c.name for c in ThreadResponse.columns(Thread.__table__)]
+    assert "summary_embedding" not in thread_columns
+    assert thread_columns[0] == "id"
+    note_columns = [c.name for c in RawNoteResponse.columns(RawNote.__table__)]
+    assert "content_vector" not in note_columns
+
+def test_orjson_body_matches_schema():
+    row = {"id": 1, "content": "hi", "role": "user", "model": None, "created_at": datetime(2025, 6, 1, 9, 30), "tool_call_id": None}
+    body = orjson.loads(ORJSONResponse([row]).body)
+    assert MessageResponse.model_validate(body[0]).created_at == row["created_at"]
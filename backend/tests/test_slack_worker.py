@@ -0,0 +1,108 @@
+import pytest
+import asyncio
+import functools
+import uuid
+from backend.app.db.async_session import async_database_url
+from backend.app.integrations.slack_events import note_from_event
+from backend.app.integrations.slack_worker import IngestPipeline, write_raw_note
+
+def test_note_from_event_skips_subtypes():
+    assert note_from_event({"subtype": "bot_message", "text": "hi"}) is None
+    note = note_from_event({"text": "ship it", "user": "U1", "channel": "C1", "ts": "1700000000.000100"})
+    assert note == {"source": "slack", "source_note_id": "1700000000.000100", "content": "ship it", "author": "U1", "channel": "C1"}
+
+def test_async_database_url():
+    assert async_database_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert async_database_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+def note(i):
+    return {"source": "slack", "source_note_id": str(i), "content": f"m{i}", "author": "U1", "channel": "C1"}
+
+def test_pipeline_bounds_concurrency_and_counts():
+    seen, active, peak = set(), [0], [0]
+
+    async def write(n):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        if n["content"] in seen:
+            return {"ok": True, "id": 1, "duplicate": True}
+        seen.add(n["content"])
+        if n["source_note_id"] == "7":
+            raise RuntimeError("db down")
+        return {"ok": True, "id": len(seen)}
+
+    async def scenario():
+        pipeline = IngestPipeline(write, concurrency=3)
+        await asyncio.gather(*(pipeline.submit(note(i % 10)) for i in range(20)))
+        return pipeline
+
+    pipeline = asyncio.run(scenario())
+    assert peak[0] == 3
+    assert pipeline.stats.as_dict()["received"] == 20
+    assert (pipeline.stats.written, pipeline.stats.duplicates, pipeline.stats.failed) == (9, 10, 1)
+    assert pipeline.in_flight == 0
+
+def test_drain_waits_for_in_flight_writes():
+    finished = []
+
+    async def slow_write(n):
+        await asyncio.sleep(0.05)
+        finished.append(n["source_note_id"])
+        return {"ok": True, "id": 1}
+
+    async def scenario():
+        pipeline = IngestPipeline(slow_write, concurrency=8)
+        tasks = [asyncio.create_task(pipeline.submit(note(i))) for i in range(5)]
+        await asyncio.sleep(0)
+        drained = await pipeline.drain(timeout=1)
+        late = await pipeline.submit(note(99))
+        await asyncio.gather(*tasks)
+        return drained, late
+
+    drained, late = asyncio.run(scenario())
+    assert drained
+    assert sorted(finished) == ["0", "1", "2", "3", "4"]
+    assert late == {"ok": False, "error": "draining"}
+
+def test_drain_times_out():
+    async def stuck(n):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        pipeline = IngestPipeline(stuck, concurrency=1)
+        task = asyncio.create_task(pipeline.submit(note(1)))
+        await asyncio.sleep(0)
+        drained = await pipeline.drain(timeout=0.05)
+        task.cancel()
+        return drained
+
+    assert asyncio.run(scenario()) is False
+
+@pytest.mark.requires_db
+def test_concurrent_duplicates_write_one_row():
+    from sqlalchemy import delete, func, select
+    from backend.app.db.async_session import dispose_async_engine, get_async_sessionmaker
+    from backend.app.db.models import RawNote, RawNoteKey
+    marker = uuid.uuid4().hex
+    duplicated = {"source": "slack", "source_note_id": marker, "content": f"race {marker}", "author": "U1", "channel": "C1"}
+
+    async def scenario():
+        session_factory = get_async_sessionmaker(pool_size=8)
+        pipeline = IngestPipeline(functools.partial(write_raw_note, session_factory), concurrency=8)
+        try:
+            results = await asyncio.gather(*(pipeline.submit(dict(duplicated)) for _ in range(32)))
+            async with session_factory() as session:
+                rows = await session.scalar(select(func.count()).select_from(RawNote).where(RawNote.source_note_id == marker))
+                await session.execute(delete(RawNoteKey).where(RawNoteKey.source_note_id == marker))
+                await session.execute(delete(RawNote).where(RawNote.source_note_id == marker))
+                await session.commit()
+            return pipeline, results, rows
+        finally:
+            await dispose_async_engine()
+
+    pipeline, results, rows = asyncio.run(scenario())
+    assert rows == 1
+    assert (pipeline.stats.written, pipeline.stats.duplicates, pipeline.stats.failed) == (1, 31, 0)
+    assert len({result["id"] for result in results}) == 1
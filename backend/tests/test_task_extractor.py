@@ -0,0 +1,87 @@
+from datetime import date
+from sqlalchemy.dialects import postgresql
+from backend.app.agents.task_extractor import (
+    ProjectCache, dedupe_tasks, description_hash, normalize_description, pack_notes, parse_extraction, upsert_tasks,
+)
+from backend.app.schemas.task import ExtractedTask
+
+
+def test_description_hash_ignores_case_punctuation_and_spacing():
+    assert normalize_description("  Send the DECK to Bharat!! ") == "send the deck to bharat"
+    assert description_hash("Send the deck to Bharat.") == description_hash("send  the deck, to bharat")
+    assert description_hash("Send the deck to Bharat") != description_hash("Send the notes to Bharat")
+
+
+def test_pack_notes_respects_count_and_size():
+    notes = [{"id": i, "content": "x" * 100} for i in range(10)]
+    assert [len(b) for b in pack_notes(notes, max_notes=4, max_chars=10_000)] == [4, 4, 2]
+    assert [len(b) for b in pack_notes(notes, max_notes=50, max_chars=350)] == [3, 3, 3, 1]
+    huge = [{"id": 0, "content": "x" * 1000}, {"id": 1, "content": "y"}]
+    assert [len(b) for b in pack_notes(huge, max_notes=50, max_chars=500)] == [1, 1]
+
+
+def test_parse_extraction_clears_invalid_fields_and_drops_tasks_without_description():
+    content = (
+        '{"tasks": ['
+        '{"note_ids": [1], "description": "Review the deck", "assignee": "sid", "project": "Cohort", "priority": 2, "due_date": "2025-06-07"},'
+        '{"note_ids": [2], "description": "Bad priority", "assignee": null, "project": null, "priority": 9, "due_date": null},'
+        '{"note_ids": [3], "description": "Vague date", "assignee": "vishnu", "project": null, "priority": 0, "due_date": "next Friday"},'
+        '{"note_ids": [4], "description": "  ", "assignee": null, "project": null, "priority": null, "due_date": null},'
+        '{"note_ids": [5], "assignee": "sid", "project": null, "priority": 1, "due_date": null}'
+        ']}'
+    )
+    tasks = parse_extraction(content)
+    assert [t.description for t in tasks] == ["Review the deck", "Bad priority", "Vague date"]
+    assert tasks[0].due_date == date(2025, 6, 7)
+    assert tasks[1].priority is None and tasks[1].note_ids == [2]
+    assert (tasks[2].priority, tasks[2].due_date, tasks[2].assignee) == (None, None, "vishnu")
+    assert parse_extraction("not json") == []
+
+
+def test_dedupe_merges_note_ids_and_fills_gaps():
+    tasks = [
+        ExtractedTask(note_ids=[1], description="Share the codebase", priority=None),
+        ExtractedTask(note_ids=[4, 2], description="share the codebase.", assignee="vishnu", priority=3),
+        ExtractedTask(note_ids=[5], description="Test on Mac"),
+    ]
+    deduped = dict(dedupe_tasks(tasks))
+    assert len(deduped) == 2
+    merged = deduped[description_hash("Share the codebase")]
+    assert merged.note_ids == [1, 2, 4]
+    assert merged.assignee == "vishnu" and merged.priority == 3
+
+
+class FakeDB:
+    def __init__(self, projects):
+        self.projects = projects
+        self.statements = []
+        self.project_loads = 0
+
+    def execute(self, statement):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        if sql.startswith("SELECT projects.id"):
+            self.project_loads += 1
+            return list(self.projects.items())
+        self.statements.append(sql)
+        return [(1, True), (2, False)]
+
+
+def test_project_cache_loads_once_and_matches_loosely():
+    db = FakeDB({7: "GenAI Cohort", 8: "Tasuke"})
+    cache = ProjectCache(ttl=300)
+    assert cache.resolve(db, "genai cohort") == 7
+    assert cache.resolve(db, "Tasuke!") == 8
+    assert cache.resolve(db, "Unknown") is None
+    assert cache.resolve(db, None) is None
+    assert db.project_loads == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_upsert_is_one_statement_with_conflict_on_description_hash():
+    db = FakeDB({7: "Cohort"})
+    tasks = dedupe_tasks([ExtractedTask(description="Review deck", project="cohort"), ExtractedTask(description="Ship notebooks")])
+    counts = upsert_tasks(db, tasks, ProjectCache())
+    assert counts == {"inserted": 1, "merged": 1}
+    assert len(db.statements) == 1
+    assert "ON CONFLICT ON CONSTRAINT uq_tasks_description_hash DO UPDATE" in db.statements[0]
+    assert upsert_tasks(db, [], ProjectCache()) == {"inserted": 0, "merged": 0}
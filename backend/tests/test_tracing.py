@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from backend.app.core import tracing
+
+@pytest.fixture(autouse=True)
+def collect_spans(monkeypatch):
+    exported = []
+    monkeypatch.setattr(tracing, "export", lambda s: exported.append(s.as_dict()))
+    return exported
+
+def test_nested_spans_share_trace_and_parent(collect_spans):
+    with tracing.span("outer") as outer:
+        with tracing.span("inner", step=1) as inner:
+            assert tracing.current_span() is inner
+        assert tracing.current_span() is outer
+    assert tracing.current_span() is None
+    inner_dict, outer_dict = collect_spans
+    assert inner_dict["trace_id"] == outer_dict["trace_id"]
+    assert inner_dict["parent_id"] == outer_dict["span_id"]
+    assert inner_dict["attributes"] == {"step": 1}
+
+def test_traced_async_records_errors(collect_spans):
+    @tracing.traced("tool.fails")
+    async def fails():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(fails())
+    assert collect_spans[0]["name"] == "tool.fails"
+    assert collect_spans[0]["status"] == "error"
+    assert fails.__name__ == "fails"
+
+def test_explicit_trace_id_continues_remote_trace(collect_spans):
+    with tracing.span("celery.task", trace_id="a" * 32, parent_id="b" * 16):
+        pass
+    assert collect_spans[0]["trace_id"] == "a" * 32
+    assert collect_spans[0]["parent_id"] == "b" * 16
+
+def test_to_otlp_shape(collect_spans):
+    with tracing.span("openrouter.chat_completion", model="m", prompt_tokens=10):
+        pass
+    payload = tracing.to_otlp(collect_spans)
+    otlp_span = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert otlp_span["name"] == "openrouter.chat_completion"
+    assert {"key": "prompt_tokens", "value": {"intValue": "10"}} in otlp_span["attributes"]
+    assert int(otlp_span["endTimeUnixNano"]) >= int(otlp_span["startTimeUnixNano"])
+
+def test_sampling_keeps_whole_traces():
+    assert tracing.sampled("0" * 32, rate=0.1) is True
+    assert tracing.sampled("f" * 32, rate=0.1) is False
+    assert tracing.sampled("f" * 32, rate=1.0) is True
+    ids = [f"{i * 0x01000000:08x}" + "0" * 24 for i in range(256)]
+    assert sum(tracing.sampled(trace_id, rate=0.25) for trace_id in ids) == 64
+
+@pytest.mark.asyncio
+async def test_http_middleware_only_accepts_hex_trace_ids(collect_spans):
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+    app = FastAPI()
+    app.middleware("http")(tracing.trace_http_requests)
+    app.get("/ping")(lambda: {"ok": True})
+    async with AsyncClient(base_url="http://test", transport=ASGITransport(app=app)) as ac:
+        kept = await ac.get("/ping", headers={"X-Trace-Id": "c" * 32})
+        replaced = await ac.get("/ping", headers={"X-Trace-Id": "../../etc/passwd\nforged"})
+    assert kept.headers["X-Trace-Id"] == "c" * 32
+    assert tracing.valid_trace_id(replaced.headers["X-Trace-Id"])
+    assert replaced.headers["X-Trace-Id"] != "../../etc/passwd\nforged"
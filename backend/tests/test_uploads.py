@@ -0,0 +1,108 @@
+import hashlib
+import pytest
+from httpx import AsyncClient, ASGITransport
+from backend.app.core import uploads
+from backend.app.core.config import settings
+from backend.app.core.uploads import UnsupportedUpload, UploadTooLarge, blob_path, extract_pdf, store_stream
+from backend.app.main import app
+
+
+def _pdf(text: str) -> bytes:
+    """A one-page PDF with `text` in Helvetica and a correct xref table."""
+    stream = f"BT /F1 24 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % n + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.fixture
+def uploads_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOADS_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_store_stream_hashes_and_dedupes(uploads_dir, monkeypatch):
+    monkeypatch.setattr(uploads, "WRITE_BUFFER_BYTES", 1024)
+    data = _pdf("Quarterly plan") + b"\n" * 5000
+    first = await store_stream(_chunks(data, 7))  # first chunk is too short to sniff on its own
+    assert first == {
+        "content_hash": hashlib.sha256(data).hexdigest(),
+        "size": len(data),
+        "content_type": "application/pdf",
+        "duplicate": False,
+    }
+    assert blob_path(first["content_hash"]).read_bytes() == data
+    second = await store_stream(_chunks(data, 4096))
+    assert second["duplicate"] is True and second["content_hash"] == first["content_hash"]
+    assert list((uploads_dir / "tmp").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_store_stream_rejects_unknown_and_oversized_files(uploads_dir):
+    with pytest.raises(UnsupportedUpload):
+        await store_stream(_chunks(b"#!/bin/sh\nrm -rf /\n", 4))
+    with pytest.raises(UploadTooLarge):
+        await store_stream(_chunks(b"\x89PNG\r\n\x1a\n" + b"\0" * 100, 16), max_bytes=64)
+    assert list((uploads_dir / "tmp").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_declared_oversize_before_reading(uploads_dir):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(base_url="http://test", transport=transport) as ac:
+        response = await ac.post(
+            "/api/v1/threads/1/attachments",
+            content=b"%PDF-",
+            headers={"content-length": str(settings.UPLOAD_MAX_BYTES + 1)},
+        )
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("extraction_status, enqueued", [("pending", True), ("failed", True), ("done", False), ("skipped", False)])
+async def test_reattaching_retries_unfinished_extraction(uploads_dir, monkeypatch, extraction_status, enqueued):
+    from backend.app.api import threads
+    from backend.app.worker import uploads as upload_tasks
+    queued = []
+    monkeypatch.setattr(threads, "_thread_exists", lambda db, thread_id: True)
+    monkeypatch.setattr(
+        threads, "_attach",
+        lambda db, thread_id, filename, stored: ({"content_hash": stored["content_hash"], "extraction_status": extraction_status}, False),
+    )
+    monkeypatch.setattr(upload_tasks.extract_upload_task, "delay", queued.append)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(base_url="http://test", transport=transport) as ac:
+        response = await ac.post("/api/v1/threads/1/attachments", content=_pdf("Retry me"))
+    assert response.status_code == 201 and response.json()["duplicate"] is True
+    assert queued == ([response.json()["content_hash"]] if enqueued else [])
+
+
+@pytest.mark.asyncio
+async def test_extract_pdf_text_and_thumbnail(uploads_dir):
+    pytest.importorskip("pypdf")
+    pytest.importorskip("pypdfium2")
+    stored = await store_stream(_chunks(_pdf("Send the deck to Bharat"), 1024))
+    result = extract_pdf(stored["content_hash"], thumbnail_width=120)
+    assert result["page_count"] == 1
+    assert "Send the deck to Bharat" in result["text"]
+    assert open(result["thumbnail"], "rb").read(8) == b"\x89PNG\r\n\x1a\n"
@@ -0,0 +1,23 @@
+from kombu.serialization import dumps, loads
+from backend.app.worker.queues import QUEUES, queue_for, autoscale, SERIALIZER, DEFAULT_QUEUE
+from backend.app.worker.cli import worker_command
+
+def test_tasks_route_by_module():
+    assert queue_for("backend.app.worker.embeddings.dummy_embedding_task") == "embeddings"
+    assert queue_for("backend.app.worker.maintenance.maintain_partitions_task") == "maintenance"
+    assert queue_for("backend.app.worker.sync.sync_slack_history_task") == "sync"
+    assert queue_for("celery.backend_cleanup") == DEFAULT_QUEUE == "sync"
+
+def test_queue_profiles_follow_the_workload():
+    assert QUEUES["agents"]["acks_late"] is False  # a redelivered run would repeat its LLM calls
+    assert QUEUES["maintenance"]["acks_late"] is True
+    assert QUEUES["sync"]["prefetch"] > QUEUES["embeddings"]["prefetch"] > QUEUES["agents"]["prefetch"]
+
+def test_autoscale_env_override(monkeypatch):
+    monkeypatch.setenv("CELERY_AGENTS_AUTOSCALE", "16,4")
+    assert autoscale("agents") == (16, 4)
+    assert "--autoscale=16,4" in worker_command("agents")
+
+def test_ormsgpack_serializer_roundtrip():
+    content_type, encoding, data = dumps([[1, 2], {"thread_id": 7}, {}], serializer=SERIALIZER)
+    assert loads(data, content_type, encoding) == [[1, 2], {"thread_id": 7}, {}]
@@ -0,0 +1,459 @@
+"""
+Database backups (the PRD's Archive workflow), compressed with zstandard.
+
+    python scripts/backup.py dump [--jobs 4] [--no-verify]   # nightly logical backup
+    python scripts/backup.py base                            # physical base backup for WAL replay
+    python scripts/backup.py archive-wal %p %f               # postgresql.conf archive_command
+    python scripts/backup.py restore-wal %f %p               # restore_command when recovering
+    python scripts/backup.py verify <BACKUP_DIR>/dumps/<stamp>
+    python scripts/backup.py prune
+
+dump      pg_dump --format=directory --jobs N writes one file per table into a
+          staging directory; every file is then streamed through zstandard by
+          N threads (a directory dump can't go to a pipe) into
+          BACKUP_DIR/dumps/.<stamp>.partial/, and the staging copy is removed.
+          The dump is verified there by restoring it with pg_restore --jobs N
+          into a scratch database (created next to the source and dropped
+          afterwards, or BACKUP_VERIFY_DATABASE_URL), and renamed to
+          BACKUP_DIR/dumps/<stamp>/ only once it restores, so prune never keeps
+          an unrestorable dump in place of a good one.
+base      pg_basebackup's tar stream is piped straight through zstandard into
+          BACKUP_DIR/base/<stamp>/base.tar.zst; nothing uncompressed touches disk.
+WAL       archive_command compresses each finished segment into BACKUP_DIR/wal/,
+          so the latest base backup plus the archived WAL can be replayed to any
+          point between full backups. Archiving is idempotent: a segment that
+          is already archived with the same content succeeds, a different one fails.
+prune     keeps the newest BACKUP_KEEP_DUMPS dumps and BACKUP_KEEP_BASE base
+          backups, and drops WAL older than the oldest base backup kept.
+
+Each backup writes a manifest.json (duration per phase, raw and compressed
+size, throughput) and prints it. Connection: DATABASE_URL, or --database-url.
+"""
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import orjson
+import psycopg2
+import zstandard
+from loguru import logger
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.app.core.config import settings
+
+CHUNK_BYTES = 1 << 20
+WAL_NAME = re.compile(r"^[0-9A-F]{24}$")
+
+
+class BackupError(Exception):
+    pass
+
+
+def libpq_url(url: str) -> str:
+    """pg_dump and friends take a libpq URI, without SQLAlchemy's driver suffix."""
+    return re.sub(r"^postgres(ql)?(\+\w+)?://", "postgresql://", url)
+
+
+def stamp() -> str:
+    return datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+
+
+def run(cmd: list, **kwargs) -> subprocess.CompletedProcess:
+    result = subprocess.run(cmd, capture_output=True, text=True, **kwargs)
+    if result.returncode != 0:
+        raise BackupError(f"{cmd[0]} exited with {result.returncode}: {result.stderr.strip()[-2000:]}")
+    return result
+
+
+def mb_per_sec(size: int, seconds: float) -> float:
+    return round(size / 1e6 / seconds, 2) if seconds > 0 else 0.0
+
+
+def write_manifest(directory: Path, manifest: dict):
+    tmp = directory / "manifest.json.tmp"
+    tmp.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, directory / "manifest.json")
+
+
+# -- zstd streams --------------------------------------------------------------
+
+def compress_file(src: Path, dst: Path, level: int = None) -> tuple:
+    """Stream `src` into `dst` (zstd, with a content checksum); returns (raw bytes, compressed bytes)."""
+    compressor = zstandard.ZstdCompressor(level=level or settings.BACKUP_ZSTD_LEVEL, write_checksum=True)
+    tmp = dst.with_name(dst.name + ".tmp")
+    with open(src, "rb") as fin, open(tmp, "wb") as fout:
+        raw, compressed = compressor.copy_stream(fin, fout, read_size=CHUNK_BYTES, write_size=CHUNK_BYTES)
+        fout.flush()
+        os.fsync(fout.fileno())
+    os.replace(tmp, dst)
+    return raw, compressed
+
+
+def decompress_file(src: Path, dst: Path) -> int:
+    decompressor = zstandard.ZstdDecompressor()
+    tmp = dst.with_name(dst.name + ".tmp")
+    with open(src, "rb") as fin, open(tmp, "wb") as fout:
+        _, written = decompressor.copy_stream(fin, fout, read_size=CHUNK_BYTES, write_size=CHUNK_BYTES)
+    os.replace(tmp, dst)
+    return written
+
+
+def compress_tree(src_dir: Path, dst_dir: Path, jobs: int, level: int = None) -> list:
+    """Compress every file of a pg_dump directory in parallel, largest first; zstandard releases the GIL."""
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    files = sorted(src_dir.iterdir(), key=lambda p: -p.stat().st_size)
+
+    def one(path):
+        raw, compressed = compress_file(path, dst_dir / f"{path.name}.zst", level)
+        path.unlink()
+        return {"name": path.name, "raw_bytes": raw, "compressed_bytes": compressed}
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        return list(pool.map(one, files))
+
+
+def decompress_tree(src_dir: Path, dst_dir: Path, jobs: int) -> int:
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    files = [p for p in src_dir.iterdir() if p.name.endswith(".zst")]
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        return sum(pool.map(lambda p: decompress_file(p, dst_dir / p.name[:-len(".zst")]), files))
+
+
+# -- logical dumps ---------------------------------------------------------------
+
+def dump(url: str, backup_dir: Path, jobs: int, verify: bool = True, level: int = None) -> dict:
+    name = stamp()
+    dumps = backup_dir / "dumps"
+    staging = dumps / f".{name}.staging"
+    partial = dumps / f".{name}.partial"
+    target = dumps / name
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    started = time.perf_counter()
+    try:
+        run(["pg_dump", "--format=directory", f"--jobs={jobs}", "--compress=0", f"--file={staging / 'dump'}", f"--dbname={libpq_url(url)}"])
+        dumped = time.perf_counter()
+        files = compress_tree(staging / "dump", partial, jobs, level)
+        compressed = time.perf_counter()
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    raw = sum(f["raw_bytes"] for f in files)
+    size = sum(f["compressed_bytes"] for f in files)
+    manifest = {
+        "kind": "dump",
+        "name": name,
+        "jobs": jobs,
+        "zstd_level": level or settings.BACKUP_ZSTD_LEVEL,
+        "dump_seconds": round(dumped - started, 3),
+        "compress_seconds": round(compressed - dumped, 3),
+        "duration_seconds": round(compressed - started, 3),
+        "raw_bytes": raw,
+        "compressed_bytes": size,
+        "ratio": round(raw / size, 2) if size else None,
+        "throughput_mb_per_sec": mb_per_sec(raw, compressed - started),
+        "files": files,
+    }
+    write_manifest(partial, manifest)
+    logger.info("Database dumped", path=str(partial), **{k: v for k, v in manifest.items() if k != "files"})
+    if verify:
+        try:
+            manifest["verify"] = verify_dump(partial, url, jobs, name=name)
+        except BaseException:
+            shutil.rmtree(partial, ignore_errors=True)
+            raise
+        write_manifest(partial, manifest)
+    os.replace(partial, target)  # only complete, verified dumps carry a plain stamp name
+    return manifest
+
+
+def scratch_database(url: str, name: str):
+    """Create `name` on the source's server; returns (its URL, a callable that drops it)."""
+    def admin(statement):
+        conn = psycopg2.connect(libpq_url(url))
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(statement)
+        finally:
+            conn.close()
+
+    quoted = '"' + name.replace('"', '""') + '"'
+    admin(f"CREATE DATABASE {quoted}")
+    scratch_url = "postgresql://" + _replace_dbname(libpq_url(url).split("://", 1)[1], name)
+    return scratch_url, lambda: admin(f"DROP DATABASE IF EXISTS {quoted} WITH (FORCE)")
+
+
+def _replace_dbname(rest: str, name: str) -> str:
+    """user:pass@host:port/db?opts -> same with db replaced."""
+    authority, _, tail = rest.partition("/")
+    _, query_sep, query = tail.partition("?")
+    return f"{authority}/{name}{query_sep}{query}"
+
+
+def table_counts(url: str) -> dict:
+    """Exact row counts of every user table (leaf partitions included, parents excluded)."""
+    conn = psycopg2.connect(libpq_url(url))
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT quote_ident(n.nspname) || '.' || quote_ident(c.relname)
+                FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relkind = 'r' AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+                  AND n.nspname NOT LIKE 'pg_toast%'
+                ORDER BY 1
+            """)
+            tables = [row[0] for row in cur.fetchall()]
+            counts = {}
+            for table in tables:
+                cur.execute(f"SELECT count(*) FROM {table}")
+                counts[table] = cur.fetchone()[0]
+        return counts
+    finally:
+        conn.close()
+
+
+def dumped_tables(dump_dir: Path) -> set:
+    """Tables that have a TABLE DATA entry in the dump's table of contents."""
+    listing = run(["pg_restore", "--list", str(dump_dir)]).stdout
+    tables = set()
+    for line in listing.splitlines():
+        match = re.match(r"^\d+; \d+ \d+ TABLE DATA (\S+) (\S+) ", line)
+        if match:
+            tables.add(f"{match.group(1)}.{match.group(2)}")
+    return tables
+
+
+def verify_dump(dump_dir: Path, source_url: str = None, jobs: int = None, scratch_url: str = None, name: str = None) -> dict:
+    """Restore a dump into a scratch database and check every dumped table came back; `name` defaults to the directory's."""
+    jobs = jobs or settings.BACKUP_JOBS
+    name = name or dump_dir.name
+    scratch_url = scratch_url or settings.BACKUP_VERIFY_DATABASE_URL or None
+    drop = None
+    if scratch_url is None:
+        if source_url is None:
+            raise BackupError("verify needs the source DATABASE_URL or BACKUP_VERIFY_DATABASE_URL")
+        scratch_url, drop = scratch_database(source_url, f"backup_verify_{name.lower()}")
+    restore_dir = dump_dir.parent / f".{name}.verify"
+    shutil.rmtree(restore_dir, ignore_errors=True)
+    started = time.perf_counter()
+    try:
+        raw = decompress_tree(dump_dir, restore_dir, jobs)
+        decompressed = time.perf_counter()
+        run([
+            "pg_restore", f"--jobs={jobs}", "--no-owner", "--no-privileges", "--exit-on-error",
+            f"--dbname={libpq_url(scratch_url)}", str(restore_dir),
+        ])
+        restored = time.perf_counter()
+        expected = dumped_tables(restore_dir)
+        counts = table_counts(scratch_url)
+    finally:
+        shutil.rmtree(restore_dir, ignore_errors=True)
+        if drop is not None:
+            drop()
+    missing = sorted(expected - set(counts))
+    result = {
+        "ok": not missing,
+        "decompress_seconds": round(decompressed - started, 3),
+        "restore_seconds": round(restored - decompressed, 3),
+        "duration_seconds": round(time.perf_counter() - started, 3),
+        "restore_mb_per_sec": mb_per_sec(raw, restored - started),
+        "tables": len(counts),
+        "rows": sum(counts.values()),
+        "missing_tables": missing,
+    }
+    if missing:
+        logger.error("Backup verification failed", path=str(dump_dir), missing=missing)
+        raise BackupError(f"restored dump is missing tables: {', '.join(missing)}")
+    logger.info("Backup verified", path=str(dump_dir), **{k: v for k, v in result.items() if k != "missing_tables"})
+    return result
+
+
+# -- base backups and WAL ----------------------------------------------------------
+
+def current_wal_file(url: str) -> str:
+    conn = psycopg2.connect(libpq_url(url))
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_walfile_name(pg_current_wal_lsn())")
+            return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def base_backup(url: str, backup_dir: Path, level: int = None) -> dict:
+    """Pipe pg_basebackup's tar stream through zstandard; WAL from before it starts is not needed to restore it."""
+    name = stamp()
+    partial = backup_dir / "base" / f".{name}.partial"
+    target = backup_dir / "base" / name
+    partial.mkdir(parents=True)
+    start_wal = current_wal_file(url)
+    compressor = zstandard.ZstdCompressor(level=level or settings.BACKUP_ZSTD_LEVEL, write_checksum=True, threads=-1)
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        ["pg_basebackup", "--pgdata=-", "--format=tar", "--wal-method=fetch", "--checkpoint=fast",
+         f"--label=tasuke {name}", f"--dbname={libpq_url(url)}"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    try:
+        with open(partial / "base.tar.zst", "wb") as fout:
+            raw, size = compressor.copy_stream(proc.stdout, fout, read_size=CHUNK_BYTES, write_size=CHUNK_BYTES)
+            fout.flush()
+            os.fsync(fout.fileno())
+        stderr = proc.stderr.read().decode(errors="replace")
+        if proc.wait() != 0:
+            raise BackupError(f"pg_basebackup exited with {proc.returncode}: {stderr.strip()[-2000:]}")
+        elapsed = time.perf_counter() - started
+        verify = verify_base_backup(partial / "base.tar.zst")
+    except BaseException:
+        proc.kill()
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    manifest = {
+        "kind": "base",
+        "name": name,
+        "start_wal": start_wal,
+        "duration_seconds": round(elapsed, 3),
+        "raw_bytes": raw,
+        "compressed_bytes": size,
+        "ratio": round(raw / size, 2) if size else None,
+        "throughput_mb_per_sec": mb_per_sec(raw, elapsed),
+        "verify": verify,
+    }
+    write_manifest(partial, manifest)
+    os.replace(partial, target)
+    logger.info("Base backup taken", path=str(target), **{k: v for k, v in manifest.items() if k != "verify"})
+    return manifest
+
+
+def verify_base_backup(path: Path) -> dict:
+    """Read the whole archive back (zstd checksums, tar headers) and check it is a data directory."""
+    started = time.perf_counter()
+    with open(path, "rb") as fin, zstandard.ZstdDecompressor().stream_reader(fin) as reader:
+        with tarfile.open(fileobj=reader, mode="r|") as archive:
+            members = [member.name for member in archive]
+    for required in ("backup_label", "PG_VERSION"):
+        if required not in members:
+            raise BackupError(f"base backup {path} has no {required}")
+    return {"ok": True, "files": len(members), "duration_seconds": round(time.perf_counter() - started, 3)}
+
+
+def file_sha256(path: Path, decompress: bool = False) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        stream = zstandard.ZstdDecompressor().stream_reader(f) if decompress else f
+        while chunk := stream.read(CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def archive_wal(path: str, name: str, backup_dir: Path, level: int = None) -> dict:
+    """archive_command: must only succeed once the segment is durably stored, and must be safe to repeat."""
+    wal_dir = backup_dir / "wal"
+    wal_dir.mkdir(parents=True, exist_ok=True)
+    target = wal_dir / f"{name}.zst"
+    if target.exists():
+        if file_sha256(target, decompress=True) == file_sha256(Path(path)):
+            return {"ok": True, "name": name, "already_archived": True}
+        raise BackupError(f"{name} is already archived with different content")
+    started = time.perf_counter()
+    raw, size = compress_file(Path(path), target, level)
+    fd = os.open(wal_dir, os.O_RDONLY)
+    try:
+        os.fsync(fd)  # the rename itself must survive a crash before Postgres recycles the segment
+    finally:
+        os.close(fd)
+    return {"ok": True, "name": name, "raw_bytes": raw, "compressed_bytes": size, "duration_seconds": round(time.perf_counter() - started, 4)}
+
+
+def restore_wal(name: str, path: str, backup_dir: Path) -> bool:
+    """restore_command: False (a non-zero exit) tells recovery the segment does not exist."""
+    source = backup_dir / "wal" / f"{name}.zst"
+    if not source.exists():
+        return False
+    decompress_file(source, Path(path))
+    return True
+
+
+def prune(backup_dir: Path, keep_dumps: int = None, keep_base: int = None) -> dict:
+    keep_dumps = settings.BACKUP_KEEP_DUMPS if keep_dumps is None else keep_dumps
+    keep_base = settings.BACKUP_KEEP_BASE if keep_base is None else keep_base
+    removed = {"dumps": [], "base": [], "wal": 0}
+    for kind, keep in (("dumps", keep_dumps), ("base", keep_base)):
+        directory = backup_dir / kind
+        if not directory.exists():
+            continue
+        complete = sorted(p for p in directory.iterdir() if p.is_dir() and not p.name.startswith("."))
+        for old in complete[:-keep] if keep else complete:
+            shutil.rmtree(old)
+            removed[kind].append(old.name)
+    base_dir, wal_dir = backup_dir / "base", backup_dir / "wal"
+    kept_base = sorted(p for p in base_dir.iterdir() if p.is_dir() and not p.name.startswith(".")) if base_dir.exists() else []
+    if kept_base and wal_dir.exists():
+        oldest = orjson.loads((kept_base[0] / "manifest.json").read_bytes())["start_wal"]
+        for segment in wal_dir.glob("*.zst"):
+            wal_name = segment.name[:-len(".zst")]
+            # segment names sort by timeline, then position; history and .backup files are kept
+            if WAL_NAME.match(wal_name) and wal_name < oldest:
+                segment.unlink()
+                removed["wal"] += 1
+    logger.info("Backups pruned", dumps=len(removed["dumps"]), base=len(removed["base"]), wal=removed["wal"])
+    return removed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python scripts/backup.py")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--backup-dir", default=settings.BACKUP_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    dump_parser = sub.add_parser("dump", help="parallel pg_dump, zstd-compressed and verified")
+    dump_parser.add_argument("--jobs", type=int, default=settings.BACKUP_JOBS)
+    dump_parser.add_argument("--no-verify", dest="verify", action="store_false")
+    sub.add_parser("base", help="pg_basebackup streamed through zstd")
+    verify_parser = sub.add_parser("verify", help="restore a dump into a scratch database")
+    verify_parser.add_argument("path")
+    verify_parser.add_argument("--jobs", type=int, default=settings.BACKUP_JOBS)
+    archive_parser = sub.add_parser("archive-wal", help="archive_command = 'python scripts/backup.py archive-wal %%p %%f'")
+    archive_parser.add_argument("path")
+    archive_parser.add_argument("name")
+    restore_parser = sub.add_parser("restore-wal", help="restore_command = 'python scripts/backup.py restore-wal %%f %%p'")
+    restore_parser.add_argument("name")
+    restore_parser.add_argument("path")
+    sub.add_parser("prune", help="apply BACKUP_KEEP_DUMPS / BACKUP_KEEP_BASE")
+    args = parser.parse_args(argv)
+    backup_dir = Path(args.backup_dir)
+    try:
+        if args.command == "restore-wal":
+            return 0 if restore_wal(args.name, args.path, backup_dir) else 1
+        if args.command == "archive-wal":
+            result = archive_wal(args.path, args.name, backup_dir)
+        elif args.command == "prune":
+            result = prune(backup_dir)
+        elif not args.database_url and args.command in ("dump", "base"):
+            parser.error("DATABASE_URL or --database-url is required")
+        elif args.command == "dump":
+            result = dump(args.database_url, backup_dir, args.jobs, args.verify)
+        elif args.command == "base":
+            result = base_backup(args.database_url, backup_dir)
+        else:
+            result = verify_dump(Path(args.path), args.database_url, args.jobs)
+    except BackupError as e:
+        logger.error("Backup failed", command=args.command, error=str(e))
+        print(f"backup {args.command} failed: {e}", file=sys.stderr)
+        return 1
+    if args.command != "archive-wal":  # archive_command output lands in the server log
+        print(orjson.dumps({k: v for k, v in result.items() if k != "files"}, option=orjson.OPT_INDENT_2).decode())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Latency breakdown from the span JSONL written by backend/app/core/tracing.py
+(run the app with TRACING_EXPORTER=jsonl to produce it).
+
+    python scripts/trace_report.py                       # per-span percentiles
+    python scripts/trace_report.py --root slack.handle_message_events
+    python scripts/trace_report.py --trace <trace_id>    # one trace as a tree
+"""
+import argparse
+import os
+import sys
+from collections import defaultdict
+import orjson
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.app.core.tracing import TRACING_FILE
+
+
+def load_spans(path: str, since: float = None) -> list:
+    spans = []
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                s = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue  # partially written last line
+            if since is None or s["start"] >= since:
+                spans.append(s)
+    return spans
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def summarize(spans: list) -> list:
+    """[(name, count, errors, p50, p90, p99, max)] ordered by total time spent."""
+    durations, errors = defaultdict(list), defaultdict(int)
+    for s in spans:
+        durations[s["name"]].append(s["duration_ms"])
+        errors[s["name"]] += s["status"] == "error"
+    rows = [
+        (name, len(d), errors[name], percentile(d, 50), percentile(d, 90), percentile(d, 99), max(d))
+        for name, d in durations.items()
+    ]
+    return sorted(rows, key=lambda r: -sum(durations[r[0]]))
+
+
+def stage_breakdown(spans: list, root: str) -> list:
+    """For traces rooted at `root`: share of the root's time spent in each descendant span name."""
+    by_trace = defaultdict(list)
+    for s in spans:
+        by_trace[s["trace_id"]].append(s)
+    stage_ms, root_ms, traces = defaultdict(float), 0.0, 0
+    for trace in by_trace.values():
+        roots = [s for s in trace if s["name"] == root]
+        if not roots:
+            continue
+        traces += 1
+        root_ms += sum(r["duration_ms"] for r in roots)
+        for s in trace:
+            if s["name"] != root:
+                stage_ms[s["name"]] += s["duration_ms"]
+    if not traces:
+        return []
+    return [(name, ms / traces, ms / root_ms * 100 if root_ms else 0.0) for name, ms in sorted(stage_ms.items(), key=lambda i: -i[1])]
+
+
+def render_tree(spans: list, trace_id: str) -> str:
+    trace = sorted((s for s in spans if s["trace_id"] == trace_id), key=lambda s: s["start"])
+    ids = {s["span_id"] for s in trace}
+    children = defaultdict(list)
+    for s in trace:
+        children[s["parent_id"] if s["parent_id"] in ids else None].append(s)
+    if not trace:
+        return f"No spans for trace {trace_id}"
+    t0 = trace[0]["start"]
+    lines = []
+
+    def walk(s, depth):
+        marker = " !" if s["status"] == "error" else ""
+        lines.append(f"{(s['start'] - t0) * 1000:9.1f}ms {'  ' * depth}{s['name']} {s['duration_ms']:.1f}ms{marker}")
+        for child in children[s["span_id"]]:
+            walk(child, depth + 1)
+
+    for s in children[None]:
+        walk(s, 0)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency report from tracing JSONL")
+    parser.add_argument("--file", default=TRACING_FILE)
+    parser.add_argument("--root", help="break traces rooted at this span name down by stage")
+    parser.add_argument("--trace", help="print one trace as a tree")
+    parser.add_argument("--since", type=float, help="only spans started after this unix timestamp")
+    args = parser.parse_args()
+
+    spans = load_spans(args.file, args.since)
+    if args.trace:
+        print(render_tree(spans, args.trace))
+        return
+    if args.root:
+        print(f"{'stage':<48} {'avg ms/trace':>12} {'% of root':>9}")
+        for name, avg_ms, share in stage_breakdown(spans, args.root):
+            print(f"{name:<48} {avg_ms:>12.1f} {share:>8.1f}%")
+        return
+    print(f"{'span':<48} {'count':>7} {'errors':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for name, count, errs, p50, p90, p99, peak in summarize(spans):
+        print(f"{name:<48} {count:>7} {errs:>6} {p50:>9.1f} {p90:>9.1f} {p99:>9.1f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()